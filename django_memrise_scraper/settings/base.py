@@ -198,7 +198,86 @@ USER_AGENT: str = (
     "Chrome/60.0.3112.113 Safari/537.36"
 )
 
-MEMRISE_HOST = "https://app.memrise.com"
+# Адрес memrise, для нагрузочных замеров подменяется адресом подставного сервера.
+MEMRISE_HOST = os.environ.setdefault("MEMRISE_HOST", "https://app.memrise.com")
+
+# <editor-fold desc="Memrise crawler">
+# Количество курсов на странице dashboard и количество страниц, которые запрашиваются одновременно.
+# 1 - страницы запрашиваются по одной.
+MEMRISE_DASHBOARD_PAGE_SIZE = int(os.environ.setdefault("MEMRISE_DASHBOARD_PAGE_SIZE", "4"))
+MEMRISE_DASHBOARD_PREFETCH = int(os.environ.setdefault("MEMRISE_DASHBOARD_PREFETCH", "4"))
+# Максимальное количество одновременных запросов при обходе уровней.
+MEMRISE_CONCURRENCY = int(os.environ.setdefault("MEMRISE_CONCURRENCY", "20"))
+# Ограничение количества keep-alive соединений к одному хосту.
+MEMRISE_LIMIT_PER_HOST = int(os.environ.setdefault("MEMRISE_LIMIT_PER_HOST", "10"))
+# Количество процессов для парсинга страниц уровней, 0 - парсинг в event loop.
+MEMRISE_PARSE_WORKERS = int(os.environ.setdefault("MEMRISE_PARSE_WORKERS", "0"))
+# Минимальное количество уровней в обходе, начиная с которого поднимается пул процессов.
+MEMRISE_PARSE_POOL_THRESHOLD = int(
+    os.environ.setdefault("MEMRISE_PARSE_POOL_THRESHOLD", "50")
+)
+# Через сколько часов уровни курса стягиваются заново, даже если метаданные курса не изменились.
+# 0 - уровни всех курсов стягиваются при каждом обновлении.
+MEMRISE_FULL_CRAWL_INTERVAL = int(
+    os.environ.setdefault("MEMRISE_FULL_CRAWL_INTERVAL", "24")
+)
+# Повторы запросов на 429 и 5xx (асинхронных - и на обрывах соединения и таймаутах): количество
+# повторов, базовая задержка экспоненциального backoff и предельная задержка в секундах.
+MEMRISE_REQUEST_RETRIES = int(os.environ.setdefault("MEMRISE_REQUEST_RETRIES", "3"))
+MEMRISE_RETRY_BACKOFF = float(os.environ.setdefault("MEMRISE_RETRY_BACKOFF", "0.5"))
+MEMRISE_RETRY_MAX_DELAY = float(os.environ.setdefault("MEMRISE_RETRY_MAX_DELAY", "30"))
+# Файл кассеты, в который записываются ответы memrise для проигрывания подставным сервером.
+# Пустое значение - запись выключена.
+MEMRISE_CASSETTE = os.environ.setdefault("MEMRISE_CASSETTE", "")
+# Адаптивное ограничение скорости запросов: начальная, минимальная и максимальная скорость в запросах
+# в секунду и задержка ответа в секундах, после которой скорость снижается. 0 - без ограничения.
+MEMRISE_RATE_LIMIT = float(os.environ.setdefault("MEMRISE_RATE_LIMIT", "0"))
+MEMRISE_RATE_LIMIT_MIN = float(os.environ.setdefault("MEMRISE_RATE_LIMIT_MIN", "1"))
+MEMRISE_RATE_LIMIT_MAX = float(os.environ.setdefault("MEMRISE_RATE_LIMIT_MAX", "100"))
+MEMRISE_RATE_LIMIT_LATENCY = float(
+    os.environ.setdefault("MEMRISE_RATE_LIMIT_LATENCY", "5")
+)
+# ETag, Last-Modified и разобранные уровни для условных запросов, хранятся отдельно от кеша страниц.
+MEMRISE_CONDITIONAL_REQUESTS = (
+    os.environ.setdefault("MEMRISE_CONDITIONAL_REQUESTS", "1") == "1"
+)
+MEMRISE_PAGE_VALIDATORS_DIR = Path(
+    os.environ.setdefault("MEMRISE_PAGE_VALIDATORS_DIR", str(STORAGE / "page_validators"))
+)
+# Кеш HTML страниц уровней на диске: каталог, время жизни записи в часах и предельный размер в MiB.
+MEMRISE_HTML_CACHE = os.environ.setdefault("MEMRISE_HTML_CACHE", "0") == "1"
+MEMRISE_HTML_CACHE_DIR = Path(
+    os.environ.setdefault("MEMRISE_HTML_CACHE_DIR", str(STORAGE / "html_cache"))
+)
+MEMRISE_HTML_CACHE_TTL = int(os.environ.setdefault("MEMRISE_HTML_CACHE_TTL", "24"))
+MEMRISE_HTML_CACHE_MAX_SIZE = int(
+    os.environ.setdefault("MEMRISE_HTML_CACHE_MAX_SIZE", "512")
+)
+# Контрольная точка обхода уровней: прерванный обход продолжается с уже стянутых уровней.
+MEMRISE_CRAWL_CHECKPOINT = os.environ.setdefault("MEMRISE_CRAWL_CHECKPOINT", "0") == "1"
+MEMRISE_CRAWL_CHECKPOINT_PATH = Path(
+    os.environ.setdefault(
+        "MEMRISE_CRAWL_CHECKPOINT_PATH", str(STORAGE / "crawl_checkpoint.jsonl")
+    )
+)
+# Часы от начала обхода, после которых контрольная точка считается устаревшей.
+MEMRISE_CRAWL_CHECKPOINT_TTL = int(
+    os.environ.setdefault("MEMRISE_CRAWL_CHECKPOINT_TTL", "24")
+)
+# Количество повторных попыток стянуть уровень, после чего уровень пропускается, а не обрывает обход.
+MEMRISE_LEVEL_RETRIES = int(os.environ.setdefault("MEMRISE_LEVEL_RETRIES", "1"))
+# </editor-fold>
+
+# <editor-fold desc="Memrise DB">
+# Размер пачки записей в одном запросе к БД: проверки существования по `id__in`, bulk_create и
+# применение расхождений данных в DBRep.
+MEMRISE_DB_BATCH_SIZE = int(os.environ.setdefault("MEMRISE_DB_BATCH_SIZE", "500"))
+# Запись изменений в БД: `db` - bulk_create/bulk_update, `upsert` - INSERT ... ON CONFLICT DO UPDATE,
+# `copy` - новые записи через COPY FROM STDIN (первичный импорт на PostgreSQL), изменения через upsert.
+MEMRISE_ACTIONS_BATCH = os.environ.setdefault("MEMRISE_ACTIONS_BATCH", "db")
+# Слова уровней на dashboard хранятся колонками `WordColumns` вместо списков WordEntity.
+MEMRISE_COLUMNAR_WORDS = os.environ.setdefault("MEMRISE_COLUMNAR_WORDS", "0") == "1"
+# </editor-fold>
 
 # <editor-fold desc="Redis">
 REDIS_HOST = "0.0.0.0"
@@ -0,0 +1,116 @@
+"""
+Бенчмарки
+=========
+
+Замеры производительности отдельных модулей приложения на реальных fixtures и синтетических данных.
+Каждый набор замеров регистрируется через `register_suite` и запускается management командой.
+
+HOW TO USE IT:
+    python manage.py benchmark parsers --repeat 50
+    python manage.py benchmark --list
+"""
+from __future__ import annotations
+
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+from django.db import connection
+
+MIB = 1024 * 1024
+
+# Набор замеров отдает результаты по мере готовности, долгие замеры видны сразу.
+SuiteT = Callable[[int, Optional[int]], Iterable["Measure"]]
+SUITES: Dict[str, SuiteT] = {}
+
+
+def register_suite(name: str) -> Callable[[SuiteT], SuiteT]:
+    """Регистрация набора замеров под именем `name`"""
+
+    def wrapper(func: SuiteT) -> SuiteT:
+        if name in SUITES:
+            raise ValueError(f"`{name}` набор замеров уже зарегистрирован")
+
+        SUITES[name] = func
+        return func
+
+    return wrapper
+
+
+@dataclass
+class Measure:
+    name: str
+    seconds: float
+    calls: int
+    peak_memory: int = 0
+    # Количество обработанных элементов за один вызов, например: {"pages": 1, "words": 20}.
+    counters: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def per_call(self) -> float:
+        return self.seconds / self.calls
+
+    def rate(self, counter: str) -> float:
+        """Количество элементов `counter` в секунду"""
+        return self.counters[counter] * self.calls / self.seconds if self.seconds else 0.0
+
+
+def measure(
+    name: str,
+    func: Callable[[], object],
+    repeat: int = 1,
+    trace_memory: bool = True,
+    setup: Optional[Callable[[], object]] = None,
+    **counters: int,
+) -> Measure:
+    """Замер времени выполнения `func` за `repeat` вызовов.
+
+    Пиковая память снимается отдельным вызовом под tracemalloc, чтобы трассировка не влияла на время.
+    `setup` вызывается перед каждым вызовом `func` и в замер не попадает.
+    """
+    seconds = 0.0
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = perf_counter()
+        func()
+        seconds += perf_counter() - start
+
+    peak_memory = 0
+    if trace_memory:
+        if setup is not None:
+            setup()
+        tracemalloc.start()
+        try:
+            func()
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    return Measure(name, seconds, repeat, peak_memory, counters)
+
+
+@contextmanager
+def isolated_database() -> Iterator[str]:
+    """Замеры с записью в БД идут в отдельной тестовой БД, как в тестах, рабочие данные не трогаем"""
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield connection.vendor
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def render_title(title: str) -> str:
+    return f"{title}\n{'=' * len(title)}"
+
+
+def render(item: Measure) -> str:
+    """Строка таблицы с результатом замера"""
+    rates = ", ".join(f"{item.rate(counter):,.1f} {counter}/s" for counter in item.counters)
+    return (
+        f"{item.name:<40} {item.per_call * 1000:>10.3f} ms/call  "
+        f"peak {item.peak_memory / MIB:>8.2f} MiB  {rates}"
+    )
@@ -0,0 +1,94 @@
+"""
+Замеры первичного импорта: все курсы, уровни и слова новые и записываются в пустую БД
+
+Сравниваются DBActionsBatch (bulk_create) и CopyActionsBatch (COPY FROM STDIN). COPY работает только
+на PostgreSQL, на SQLite CopyActionsBatch добавляет записи через bulk_create пачками, поэтому
+сравнение имеет смысл с DATABASE_URL на PostgreSQL.
+"""
+from __future__ import annotations
+
+from functools import partial
+from typing import Iterator, List, Optional, Tuple
+
+from memrise.benchmarks.base import Measure, isolated_database, measure, register_suite
+from memrise.benchmarks.word_actions import SilentReporter
+from memrise.core.domains.entities import CourseEntity
+from memrise.core.modules.actions.base import Actions
+from memrise.core.modules.actions.copy_actions import (
+    CopyCourseActions,
+    CopyLevelActions,
+    CopyWordActions,
+)
+from memrise.core.modules.actions.db_actions import (
+    DBCourseActions,
+    DBLevelActions,
+    DBWordActions,
+)
+from memrise.models import Course, Level, Word
+from memrise.tests.synthetic import course_entities
+
+# Общее количество слов в импорте.
+SYNTHETIC_SIZES = (100000, 1000000)
+WORDS_PER_LEVEL = 100
+LEVELS_PER_COURSE = 100
+
+ActionsT = Tuple[Actions, Actions, Actions]
+
+
+def load(actions: ActionsT, courses: List[CourseEntity]) -> None:
+    course_actions, level_actions, word_actions = actions
+    levels = [level for course in courses for level in course.levels]
+    course_actions.create(courses)
+    level_actions.create(levels)
+    word_actions.create([word for level in levels for word in level.words])
+
+
+def clear_database() -> None:
+    # Без каскадов Django удаляет записи одним запросом на таблицу.
+    Word.objects.all().delete()
+    Level.objects.all().delete()
+    Course.objects.all().delete()
+
+
+@register_suite("bulk_load")
+def bulk_load_suite(repeat: int, size: Optional[int] = None) -> Iterator[Measure]:
+    reporter = SilentReporter()
+    variants = (
+        (
+            "DBActionsBatch",
+            (
+                DBCourseActions(reporter=reporter),
+                DBLevelActions(reporter=reporter),
+                DBWordActions(reporter=reporter),
+            ),
+        ),
+        (
+            "CopyActionsBatch",
+            (
+                CopyCourseActions(reporter=reporter),
+                CopyLevelActions(reporter=reporter),
+                CopyWordActions(reporter=reporter),
+            ),
+        ),
+    )
+    with isolated_database() as vendor:
+        for num_words in (size,) if size else SYNTHETIC_SIZES:
+            levels_per_course = min(LEVELS_PER_COURSE, max(1, num_words // WORDS_PER_LEVEL))
+            num_courses = max(1, num_words // (levels_per_course * WORDS_PER_LEVEL))
+            courses = course_entities(num_courses, levels_per_course, WORDS_PER_LEVEL)
+            total_words = num_courses * levels_per_course * WORDS_PER_LEVEL
+            # Импорт идет целиком, повторов немного.
+            size_repeat = max(1, repeat * 1000 // total_words)
+            for variant, actions in variants:
+                # Пиковая память не снимается: повторный импорт под tracemalloc удваивает время замера.
+                yield measure(
+                    f"{variant} load [{vendor}-{total_words}]",
+                    partial(load, actions, courses),
+                    repeat=size_repeat,
+                    trace_memory=False,
+                    setup=clear_database,
+                    words=total_words,
+                )
+
+            clear_database()
+            del courses
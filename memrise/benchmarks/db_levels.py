@@ -0,0 +1,60 @@
+"""
+Замеры чтения уровней со словами из БД через DBRep.get_levels
+
+Прежний способ (модели Django с prefetch и фабрики сущностей) сравнивается с чтением кортежей
+`values_list`. Замеры идут в отдельной тестовой БД той же СУБД, что указана в DATABASE_URL.
+"""
+from __future__ import annotations
+
+from functools import partial
+from typing import Iterator, Optional
+
+from django.conf import settings
+
+from memrise.benchmarks.base import Measure, isolated_database, measure, register_suite
+from memrise.benchmarks.word_actions import prepare_database
+from memrise.core.modules.actions.actions_batch import DBActionsBatch
+from memrise.core.repositories.repos import DBRep
+from memrise.models import Course, Word
+from memrise.tests.helpers import legacy_get_levels
+
+# Количество слов в БД.
+SYNTHETIC_SIZES = (50000, 500000)
+
+
+@register_suite("db_levels")
+def db_levels_suite(repeat: int, size: Optional[int] = None) -> Iterator[Measure]:
+    repo = DBRep(DBActionsBatch())
+    with isolated_database() as vendor:
+        for num_words in (size,) if size else SYNTHETIC_SIZES:
+            words = prepare_database(num_words)
+            Word.objects.bulk_create(
+                (
+                    Word(
+                        id=item.id,
+                        level_id=item.level_id,
+                        word_a=item.word_a,
+                        word_b=item.word_b,
+                    )
+                    for item in words
+                ),
+                batch_size=settings.MEMRISE_DB_BATCH_SIZE,
+            )
+            courses = repo.get_courses()
+            num_levels = len(repo.get_levels(courses))
+            # Каждый повтор читает всю БД, поэтому повторов немного.
+            size_repeat = max(1, repeat * 100 // num_words)
+            variants = (
+                ("legacy", partial(legacy_get_levels, courses)),
+                ("values_list", partial(repo.get_levels, courses)),
+            )
+            for variant, func in variants:
+                yield measure(
+                    f"DBRep.get_levels {variant} [{vendor}-{num_words}]",
+                    func,
+                    repeat=size_repeat,
+                    levels=num_levels,
+                    words=num_words,
+                )
+
+            Course.objects.all().delete()
@@ -0,0 +1,102 @@
+"""
+Замеры создания доменных сущностей: слотовые dataclass против прежних pydantic моделей с теми же
+полями (`LegacyCourse`, `LegacyLevel`, `LegacyWord`)
+
+Пиковая память замера создания - память, которую занимает список из `size` слов.
+"""
+from __future__ import annotations
+
+from typing import Callable, Iterator, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, Field
+
+from memrise.benchmarks.base import Measure, measure, register_suite
+from memrise.core.domains.entities import Entity, WordEntity
+from memrise.shares.types import URL
+
+# Количество слов.
+SYNTHETIC_SIZES = (100000,)
+WORDS_PER_LEVEL = 100
+
+WordRow = Tuple[int, int, str, str, bool]
+
+
+class LegacyWord(BaseModel):
+    id: int
+    level_id: int
+    word_a: str
+    word_b: str
+    is_learned: bool = False
+
+
+class LegacyLevel(BaseModel):
+    id: int
+    number: int
+    course_id: int
+    name: str
+    words: List[LegacyWord] = Field(default_factory=list)
+
+
+class LegacyCourse(BaseModel):
+    id: int
+    name: str
+    url: str
+    difficult: int
+    num_words: int
+    num_levels: int
+    difficult_url: str
+    levels_url: List[URL] = Field(default_factory=list)
+    levels: List[LegacyLevel] = Field(default_factory=list)
+    is_disable: bool = Field(default=False)
+
+
+def to_legacy(model: Type[BaseModel], entities: List[Entity]) -> List[BaseModel]:
+    return [model.parse_obj(entity.dict()) for entity in entities]
+
+
+def word_rows(num_words: int) -> List[WordRow]:
+    return [
+        (word_id, word_id // WORDS_PER_LEVEL, f"word {word_id}", f"translate {word_id}", False)
+        for word_id in range(num_words)
+    ]
+
+
+def make_words(word_cls: Callable, rows: List[WordRow]) -> List:
+    return [
+        word_cls(
+            id=word_id, level_id=level_id, word_a=word_a, word_b=word_b, is_learned=is_learned
+        )
+        for word_id, level_id, word_a, word_b, is_learned in rows
+    ]
+
+
+def cold_fingerprints(words: List[WordEntity]) -> List[str]:
+    for word in words:
+        word._fingerprint = None
+
+    return [word.fingerprint for word in words]
+
+
+@register_suite("entities")
+def entities_suite(repeat: int, size: Optional[int] = None) -> Iterator[Measure]:
+    for num_words in (size,) if size else SYNTHETIC_SIZES:
+        rows = word_rows(num_words)
+        # Количество повторов уменьшается с ростом данных, общее количество слов примерно одинаковое.
+        size_repeat = max(1, repeat * 1000 // num_words)
+        for name, word_cls in (("WordEntity", WordEntity), ("LegacyWord (pydantic)", LegacyWord)):
+            yield measure(
+                f"{name} create [{num_words}]",
+                lambda word_cls=word_cls: make_words(word_cls, rows),
+                repeat=size_repeat,
+                words=num_words,
+            )
+
+        words = make_words(WordEntity, rows)
+        yield measure(
+            f"WordEntity fingerprint cold [{num_words}]",
+            lambda: cold_fingerprints(words),
+            repeat=size_repeat,
+            trace_memory=False,
+            words=num_words,
+        )
+
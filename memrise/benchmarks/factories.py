@@ -0,0 +1,96 @@
+"""
+Замеры создания сущностей слов из моделей Django фабриками `factory_mapper`
+
+Прежний способ (каждая фабрика проверяет все элементы, затем maker собирает список) сравнивается
+с выбором фабрики по типу первого элемента. Замеры идут в отдельной тестовой БД той же СУБД,
+что указана в DATABASE_URL.
+"""
+from __future__ import annotations
+
+from functools import partial
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from memrise.benchmarks.base import Measure, isolated_database, measure, register_suite
+from memrise.benchmarks.word_actions import fill_words, prepare_database
+from memrise.core.domains.entities import WordEntity
+from memrise.core.modules.factories.factories import (
+    CourseFactory,
+    LevelFactory,
+    WordFactory,
+    factory_mapper,
+)
+from memrise.core.modules.factories.factory_registry import FactoryHandler
+from memrise.models import Course, Word
+
+# Количество слов в БД.
+SYNTHETIC_SIZES = (10000, 100000)
+
+LEGACY_ITEM_TYPES = (
+    CourseFactory.item_types,
+    LevelFactory.item_types,
+    WordFactory.item_types,
+)
+
+
+def legacy_seek(items: List[Word]) -> List[WordEntity]:
+    """Прежний способ: `matches` каждой фабрики проверяет все элементы, слова строятся по словарю"""
+    matches = [
+        item_types
+        for item_types in LEGACY_ITEM_TYPES
+        if items and all(isinstance(item, item_types) for item in items)
+    ]
+    if not matches:
+        raise ValueError(f"Не найдено ни одиной фабрики по параметрам: `{items}`")
+
+    data = []
+    for item in items:
+        attrs = {
+            "id": item.id,
+            "level_id": item.level.id,
+            "word_a": item.word_a,
+            "word_b": item.word_b,
+            "is_learned": item.is_learned,
+        }
+        data.append(WordEntity(**attrs))
+
+    return data
+
+
+def strict_mapper() -> FactoryHandler:
+    mapper = FactoryHandler(strict=True)
+    for factory in (CourseFactory, LevelFactory, WordFactory):
+        mapper.register(factory)
+
+    return mapper
+
+
+def count_streamed() -> int:
+    """Сущности из QuerySet.iterator() без списков моделей и сущностей"""
+    return sum(1 for _ in factory_mapper.iterate(Word.objects.iterator()))
+
+
+@register_suite("factories")
+def factories_suite(repeat: int, size: Optional[int] = None) -> Iterator[Measure]:
+    strict = strict_mapper()
+    with isolated_database() as vendor:
+        for num_words in (size,) if size else SYNTHETIC_SIZES:
+            fill_words(prepare_database(num_words))
+            # Уровни подтягиваются заранее, чтобы `level.id` прежнего способа не ходил в БД.
+            records = list(Word.objects.select_related("level"))
+            # Количество повторов уменьшается с ростом данных, общее количество слов примерно одинаковое.
+            size_repeat = max(1, repeat * 1000 // num_words)
+            variants: List[Tuple[str, Callable[[], object]]] = [
+                ("legacy", partial(legacy_seek, records)),
+                ("dispatch", partial(factory_mapper.seek, records)),
+                ("dispatch strict", partial(strict.seek, records)),
+                ("dispatch queryset iterator", count_streamed),
+            ]
+            for variant, func in variants:
+                yield measure(
+                    f"FactoryHandler {variant} [{vendor}-{num_words}]",
+                    func,
+                    repeat=size_repeat,
+                    words=num_words,
+                )
+
+            Course.objects.all().delete()
@@ -0,0 +1,73 @@
+"""
+Замеры скорости парсинга страницы уровня всеми зарегистрированными реализациями Parser
+на реальной странице из fixtures и синтетических уровнях разного размера
+
+С MEMRISE_HTML_CACHE=1 в замеры добавляются реальные уровни из кеша страниц, без запросов к memrise.
+"""
+from __future__ import annotations
+
+from functools import partial
+from itertools import islice
+from typing import Dict, Iterator, Optional
+from urllib.parse import urlparse
+
+from django.conf import settings
+
+from memrise import logger
+from memrise.benchmarks.base import Measure, measure, register_suite
+from memrise.core.modules.api.html_cache import default_html_cache
+
+# Импорт модулей регистрирует реализации парсеров.
+from memrise.core.modules.parsing import regular_lxml, single_pass_lxml  # noqa
+from memrise.core.modules.parsing.base import parser_registry
+from memrise.tests.synthetic import level_page
+
+LEVEL_TEXT_FIXTURE = settings.RESOURSES / "fixtures/level_text_response.html"
+# Количество слов в синтетических уровнях.
+SYNTHETIC_SIZES = (10, 100, 1000, 5000)
+# Количество слов в fixture странице, относительно нее масштабируется число повторов.
+FIXTURE_WORDS = 20
+# Количество уровней из кеша страниц в замерах.
+CACHED_PAGES = 5
+# Парсер, превысивший это время разбора одной страницы, не замеряется на страницах большего размера.
+MAX_SECONDS_PER_PAGE = 5.0
+
+
+def level_pages(size: Optional[int] = None) -> Dict[str, str]:
+    """Страницы уровней для замеров: fixture, синтетические уровни и уровни из кеша страниц"""
+    pages = {"fixture": LEVEL_TEXT_FIXTURE.read_text()}
+    for num_words in (size,) if size else SYNTHETIC_SIZES:
+        pages[f"synthetic-{num_words}"] = level_page(num_words)
+
+    if cache := default_html_cache():
+        for url, html in islice(cache.pages(), CACHED_PAGES):
+            pages[f"cached-{urlparse(url).path}"] = html
+
+    return pages
+
+
+@register_suite("parsers")
+def parsers_suite(repeat: int, size: Optional[int] = None) -> Iterator[Measure]:
+    """Пиковая память считается по куче Python (сущности, строки), память libxml2 в нее не попадает"""
+    too_slow = set()
+    for page_name, response in level_pages(size).items():
+        for parser_name, parser_cls in sorted(parser_registry.items()):
+            if parser_name in too_slow:
+                logger.warning(f"{parser_name} [{page_name}] пропущен, слишком долгий разбор")
+                continue
+
+            parser = parser_cls()
+            num_words = len(parser.parse(response, 1).words)
+            # Чем больше слов на странице, тем меньше повторов, общее количество слов примерно одинаковое.
+            page_repeat = max(1, repeat * FIXTURE_WORDS // max(num_words, 1))
+            item = measure(
+                f"{parser_name} [{page_name}]",
+                partial(parser.parse, response, 1),
+                repeat=page_repeat,
+                pages=1,
+                words=num_words,
+            )
+            if item.per_call > MAX_SECONDS_PER_PAGE:
+                too_slow.add(parser_name)
+
+            yield item
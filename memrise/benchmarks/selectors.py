@@ -0,0 +1,97 @@
+"""
+Замеры сравнения сущностей отборщиками: прежнее сравнение словарей полей pydantic моделей против
+сравнения кортежей значений `Entity.compared_values`
+
+Прежний способ замеряется на pydantic моделях с полями сущностей до перехода на dataclass
+(`LegacyCourse`, `LegacyLevel`, `LegacyWord` из замеров `entities`), данные переводятся в них
+до замера.
+"""
+from __future__ import annotations
+
+from functools import partial
+from typing import Callable, Iterator, List, Optional, Set, Tuple
+
+from pydantic import BaseModel
+
+from memrise.benchmarks.base import Measure, measure, register_suite
+from memrise.benchmarks.entities import LegacyCourse, LegacyLevel, LegacyWord, to_legacy
+from memrise.core.modules.selectors import (
+    CourseSelector,
+    DiffContainer,
+    LevelSelector,
+    WordSelector,
+)
+from memrise.tests.synthetic import course_entities
+
+# Общее количество слов в синтетических курсах.
+SYNTHETIC_SIZES = (1000, 10000, 100000)
+WORDS_PER_LEVEL = 100
+LEVELS_PER_COURSE = 10
+# Доля слов, измененных между сохраненными и новыми данными.
+CHANGED_RATIO = 0.1
+
+
+def legacy_dict_match(
+    fresh_entities: List[BaseModel], actual_entities: List[BaseModel], exclude: Set[str]
+) -> DiffContainer:
+    """Прежний способ сравнения: словари полей pydantic моделей строятся на каждое совпадение id"""
+    diff = DiffContainer()
+    exists_actual_items = {entity.id: entity for entity in actual_entities}
+    for entity in fresh_entities:
+        actual_entity = exists_actual_items.pop(entity.id, None)
+        if actual_entity is None:
+            diff.create.append(entity)
+        elif actual_entity.dict(exclude=exclude) != entity.dict(exclude=exclude):
+            diff.update.append(entity)
+        else:
+            diff.equal.append(entity)
+
+    diff.delete.extend(exists_actual_items.values())
+    return diff
+
+
+@register_suite("selectors")
+def selectors_suite(repeat: int, size: Optional[int] = None) -> Iterator[Measure]:
+    for num_words in (size,) if size else SYNTHETIC_SIZES:
+        num_courses = max(1, num_words // (LEVELS_PER_COURSE * WORDS_PER_LEVEL))
+        make_courses = partial(
+            course_entities, num_courses, LEVELS_PER_COURSE, WORDS_PER_LEVEL
+        )
+        actual_courses = make_courses()
+        fresh_courses = make_courses(changed_ratio=CHANGED_RATIO)
+        actual_levels = [level for course in actual_courses for level in course.levels]
+        fresh_levels = [level for course in fresh_courses for level in course.levels]
+        actual_words = [word for level in actual_levels for word in level.words]
+        fresh_words = [word for level in fresh_levels for word in level.words]
+
+        cases = (
+            (
+                "courses",
+                CourseSelector,
+                LegacyCourse,
+                fresh_courses,
+                actual_courses,
+                {"levels", "levels_url"},
+            ),
+            ("levels", LevelSelector, LegacyLevel, fresh_levels, actual_levels, {"words"}),
+            ("words", WordSelector, LegacyWord, fresh_words, actual_words, set()),
+        )
+        # Количество повторов уменьшается с ростом данных, общее количество сравнений примерно одинаковое.
+        size_repeat = max(1, repeat * 1000 // len(fresh_words))
+        for counter, selector, legacy_model, fresh, actual, exclude in cases:
+            legacy_fresh = to_legacy(legacy_model, fresh)
+            legacy_actual = to_legacy(legacy_model, actual)
+            variants: List[Tuple[str, Callable[[], object]]] = [
+                (
+                    "legacy dict",
+                    partial(legacy_dict_match, legacy_fresh, legacy_actual, exclude),
+                ),
+                ("values", partial(selector.match, fresh, actual)),
+            ]
+            for variant, func in variants:
+                yield measure(
+                    f"{selector.__name__} {variant} [{len(fresh_words)}]",
+                    func,
+                    repeat=size_repeat,
+                    **{counter: len(fresh)},
+                )
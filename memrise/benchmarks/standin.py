@@ -0,0 +1,238 @@
+"""
+Подставной сервер memrise
+=========================
+
+aiohttp сервер, который отвечает на запросы `API` и `AsyncAPI` вместо memrise: страницы dashboard
+в JSON и HTML страницы уровней. С MEMRISE_HOST, указывающим на сервер, полное обновление
+`UpdateManager.update` идет без сети, что позволяет гонять нагрузочные замеры.
+
+Ответы берутся из источника:
+    - `SyntheticSource` - синтетические курсы с разметкой уровней из `memrise.tests.synthetic`,
+      `SyntheticSource.from_fixture` - курсы dashboard из fixtures с синтетическими уровнями;
+    - `CassetteSource` - ответы, записанные с реального memrise в кассету (см. MEMRISE_CASSETTE).
+
+Задержка ответа `latency` и доля ответов 503 `error_rate` задаются в `StandInServer`. На условный
+запрос с совпавшим ETag сервер отвечает 304, как memrise.
+
+HOW TO USE IT:
+    python manage.py standin --port 8000 --courses 50 --latency 0.05 --error-rate 0.01
+    MEMRISE_HOST=http://127.0.0.1:8000 python manage.py shell
+
+    with serve(StandInServer(SyntheticSource(num_courses=10))) as host:
+        ...
+"""
+from __future__ import annotations
+
+import asyncio
+import copy
+import json
+import re
+import threading
+from abc import ABC, abstractmethod
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from random import Random
+from typing import Dict, Iterator, List, Mapping, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+from aiohttp import web
+
+from memrise.core.modules.api.cassette import Cassette, Recording, request_key
+from memrise.core.modules.api.html_cache import content_key
+from memrise.shares.contants import DASHBOARD_FIXTURE, DASHBOARD_URL
+from memrise.tests.synthetic import level_page
+
+LEVEL_PATH = re.compile(r"^/course/(?P<course_id>\d+)/[^/]+/(?P<number>\d+)/?$")
+JSON_TYPE = "application/json"
+HTML_TYPE = "text/html; charset=utf-8"
+
+
+def load_fixture_courses() -> List[Dict]:
+    with DASHBOARD_FIXTURE.open() as f:
+        return json.load(f)["courses"]
+
+
+def synthetic_course(template: Dict, course_id: int, num_levels: int, num_words: int) -> Dict:
+    """Курс dashboard по образцу курса из fixtures"""
+    course = copy.deepcopy(template)
+    course.update(
+        id=course_id,
+        name=f"Course {course_id}",
+        slug="synthetic",
+        url=f"/course/{course_id}/synthetic/",
+        num_things=num_words,
+        num_levels=num_levels,
+        learned=0,
+        review=0,
+        difficult=0,
+    )
+    return course
+
+
+class Source(ABC):
+    @abstractmethod
+    def respond(self, method: str, path: str) -> Optional[Recording]:
+        """Ответ на запрос `method` по пути с параметрами `path`, None - страницы нет"""
+
+
+@dataclass
+class SyntheticSource(Source):
+    num_courses: int = 10
+    levels_per_course: int = 10
+    words_per_level: int = 50
+    seed: int = 0
+    courses: List[Dict] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        if not self.courses:
+            template = load_fixture_courses()[0]
+            self.courses = [
+                synthetic_course(
+                    template,
+                    course_id,
+                    self.levels_per_course,
+                    self.levels_per_course * self.words_per_level,
+                )
+                for course_id in range(1, self.num_courses + 1)
+            ]
+        self._course_map = {course["id"]: course for course in self.courses}
+
+    @classmethod
+    def from_fixture(cls, words_per_level: int = 50, seed: int = 0) -> SyntheticSource:
+        """Курсы dashboard из fixtures, уровни курсов синтетические"""
+        courses = load_fixture_courses()
+        return cls(
+            num_courses=len(courses),
+            words_per_level=words_per_level,
+            seed=seed,
+            courses=courses,
+        )
+
+    def respond(self, method: str, path: str) -> Optional[Recording]:
+        parts = urlsplit(path)
+        if parts.path.rstrip("/") == DASHBOARD_URL.rstrip("/"):
+            return self._dashboard(method, path, dict(parse_qsl(parts.query)))
+
+        match = LEVEL_PATH.match(parts.path)
+        if match is None:
+            return None
+
+        course = self._course_map.get(int(match["course_id"]))
+        number = int(match["number"])
+        if course is None or not 1 <= number <= course["num_levels"]:
+            return None
+
+        # id уровней и слов не пересекаются между курсами и уровнями.
+        level_id = course["id"] * 1000 + number
+        body = level_page(
+            self.words_per_level,
+            level_id=level_id,
+            course_id=course["id"],
+            number=number,
+            first_word_id=level_id * self.words_per_level,
+            seed=self.seed + level_id,
+        )
+        return Recording(method, path, HTTPStatus.OK, body, {"Content-Type": HTML_TYPE})
+
+    def _dashboard(self, method: str, path: str, query: Mapping[str, str]) -> Recording:
+        # memrise отдает limit + 1 курсов, клиент сдвигает offset на limit + 1
+        # (см. MemriseRequestCounter).
+        offset = int(query.get("offset", 0))
+        end = offset + int(query.get("limit", 4)) + 1
+        body = json.dumps(
+            {
+                "courses": self.courses[offset:end],
+                "to_review_total": 0,
+                "has_more_courses": end < len(self.courses),
+            }
+        )
+        return Recording(method, path, HTTPStatus.OK, body, {"Content-Type": JSON_TYPE})
+
+
+@dataclass
+class CassetteSource(Source):
+    cassette: Cassette
+
+    def __post_init__(self) -> None:
+        self._recordings = self.cassette.load()
+
+    def respond(self, method: str, path: str) -> Optional[Recording]:
+        return self._recordings.get(request_key(method, path))
+
+
+@dataclass
+class StandInServer:
+    source: Source
+    # Задержка каждого ответа в секундах.
+    latency: float = 0.0
+    # Доля ответов 503.
+    error_rate: float = 0.0
+    seed: int = 0
+    # Количество ответов по статусам.
+    responses: Counter = field(init=False, default_factory=Counter)
+
+    def __post_init__(self) -> None:
+        self._random = Random(self.seed)
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_route("*", "/{path:.*}", self.handle)
+        return app
+
+    async def handle(self, request: web.Request) -> web.Response:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        response = self._respond(request)
+        self.responses[response.status] += 1
+        return response
+
+    def _respond(self, request: web.Request) -> web.Response:
+        if self._random.random() < self.error_rate:
+            return web.Response(status=HTTPStatus.SERVICE_UNAVAILABLE)
+
+        recording = self.source.respond(request.method, request.path_qs)
+        if recording is None:
+            return web.Response(status=HTTPStatus.NOT_FOUND)
+
+        headers = dict(recording.headers)
+        if recording.status == HTTPStatus.OK:
+            headers.setdefault("ETag", f'"{content_key(recording.body.encode())}"')
+            if request.headers.get("If-None-Match") == headers["ETag"]:
+                return web.Response(status=HTTPStatus.NOT_MODIFIED, headers=headers)
+
+        # Content-Type задается параметрами ответа: aiohttp не принимает его в заголовках вместе
+        # с текстом.
+        content_type, _, charset = headers.pop("Content-Type", HTML_TYPE).partition("; charset=")
+        return web.Response(
+            status=recording.status,
+            text=recording.body,
+            headers=headers,
+            content_type=content_type,
+            charset=charset or None,
+        )
+
+
+@contextmanager
+def serve(server: StandInServer, host: str = "127.0.0.1", port: int = 0) -> Iterator[str]:
+    """Сервер в фоновом потоке на время контекста, отдает адрес для MEMRISE_HOST.
+
+    С `port=0` порт выбирает система.
+    """
+    loop = asyncio.new_event_loop()
+    runner = web.AppRunner(server.make_app())
+    loop.run_until_complete(runner.setup())
+    loop.run_until_complete(web.TCPSite(runner, host, port).start())
+    _, port = runner.addresses[0][:2]
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://{host}:{port}"
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.run_until_complete(runner.cleanup())
+        loop.close()
+
@@ -0,0 +1,75 @@
+"""
+Замеры полного обновления `UpdateManager.update` на подставном сервере memrise
+
+Сервер из `memrise.benchmarks.standin` отдает синтетические курсы с задержкой `LATENCY` и долей
+ответов 503 `ERROR_RATE`, MEMRISE_HOST на время замеров указывает на него. Замеры идут по порядку
+в отдельной тестовой БД:
+    - cold - первое обновление, все курсы, уровни и слова создаются;
+    - recrawl - повторный обход всех уровней без изменений в memrise;
+    - incremental - обновление, в котором уровни не стягиваются, так как dashboard не изменился.
+
+Каждое обновление получает новый ограничитель скорости запросов, если ограничение включено.
+"""
+from __future__ import annotations
+
+from typing import Iterator, Optional
+from unittest.mock import patch
+
+from django.test.utils import override_settings
+
+from memrise.benchmarks.base import Measure, isolated_database, measure, register_suite
+from memrise.benchmarks.standin import StandInServer, SyntheticSource, serve
+from memrise.core.modules.api import api, async_api
+from memrise.core.modules.api.rate_limiter import RateLimiter
+from memrise.di import UpdateMemriseContainer
+
+# Количество курсов.
+SYNTHETIC_SIZES = (10,)
+LEVELS_PER_COURSE = 5
+WORDS_PER_LEVEL = 50
+# Задержка ответа подставного сервера в секундах и доля ответов 503.
+LATENCY = 0.02
+ERROR_RATE = 0.01
+
+
+class BenchmarkContainer(UpdateMemriseContainer):
+    # Контрольная точка не нужна: прерванный замер запускается заново.
+    checkpoint = None
+
+
+def run_update(full_crawl_interval: int) -> None:
+    manager = BenchmarkContainer.manager
+    manager.full_crawl_interval = full_crawl_interval
+    limiter = RateLimiter() if async_api.limiter is not None else None
+    with patch.object(api, "limiter", limiter), patch.object(async_api, "limiter", limiter):
+        manager.update()
+
+
+@register_suite("update")
+def update_suite(repeat: int, size: Optional[int] = None) -> Iterator[Measure]:
+    for num_courses in (size,) if size else SYNTHETIC_SIZES:
+        source = SyntheticSource(
+            num_courses=num_courses,
+            levels_per_course=LEVELS_PER_COURSE,
+            words_per_level=WORDS_PER_LEVEL,
+        )
+        server = StandInServer(source, latency=LATENCY, error_rate=ERROR_RATE)
+        counters = dict(
+            courses=num_courses,
+            levels=num_courses * LEVELS_PER_COURSE,
+            words=num_courses * LEVELS_PER_COURSE * WORDS_PER_LEVEL,
+        )
+        with isolated_database() as vendor, serve(server) as host:
+            with override_settings(MEMRISE_HOST=host):
+                # Обновления меняют БД, поэтому каждое замеряется один раз в заданном порядке.
+                for name, full_crawl_interval in (
+                    ("cold", 0),
+                    ("recrawl", 0),
+                    ("incremental", 24),
+                ):
+                    yield measure(
+                        f"UpdateManager.update {name} [{vendor}-{num_courses}]",
+                        lambda: run_update(full_crawl_interval),
+                        trace_memory=False,
+                        **counters,
+                    )
@@ -0,0 +1,164 @@
+"""
+Замеры добавления и обновления слов в БД через DBWordActions и UpsertWordActions
+
+Замеры идут в отдельной тестовой БД той же СУБД, что указана в DATABASE_URL, поэтому для PostgreSQL
+достаточно запустить команду с нужным DATABASE_URL.
+"""
+from __future__ import annotations
+
+from functools import partial
+from random import randint
+from typing import Iterator, List, Optional
+
+from django.conf import settings
+
+from memrise.benchmarks.base import Measure, isolated_database, measure, register_suite
+from memrise.core.domains.entities import WordEntity
+from memrise.core.modules.actions.action_reporter import Reporter
+from memrise.core.modules.actions.db_actions import DBWordActions
+from memrise.core.modules.actions.upsert_actions import UpsertWordActions
+from memrise.models import Course, Level, Word
+from memrise.tests.synthetic import course_entities
+
+# Количество новых слов в одном вызове create.
+SYNTHETIC_SIZES = (1000, 10000, 50000)
+WORDS_PER_LEVEL = 100
+LEVELS_PER_COURSE = 50
+# Доля новых слов, id которых уже заняты в БД словом другого уровня, они получают постоянный id.
+DUPLICATE_RATIO = 0.01
+
+
+class SilentReporter(Reporter):
+    """В замер попадает только работа с БД, без логирования и отправки сообщений"""
+
+    def report(self, entities: List, msg: str, is_mute=False) -> None:
+        pass
+
+
+def legacy_custom_id(max_len: int = 7) -> int:
+    """Прежний случайный id дубликата, не совпадает между обновлениями"""
+    range_start = 10 ** (max_len - 1)
+    range_end = (10 ** max_len) - 1
+    return randint(range_start, range_end)
+
+
+def legacy_create(entities: List[WordEntity]) -> None:
+    """Прежний способ: отдельный SELECT на каждое слово для поиска дубликатов"""
+    words = []
+    for item in entities:
+        try:
+            Word.objects.get(id=item.id)
+            item_id = legacy_custom_id()
+        except Word.DoesNotExist:
+            item_id = item.id
+
+        words.append(
+            Word(
+                id=item_id,
+                level_id=item.level_id,
+                word_a=item.word_a,
+                word_b=item.word_b,
+                is_learned=item.is_learned,
+            )
+        )
+
+    Word.objects.bulk_create(words)
+
+
+def prepare_database(num_words: int) -> List[WordEntity]:
+    """Курсы и уровни для новых слов, часть id слов уже занята в БД"""
+    num_courses = max(1, num_words // (LEVELS_PER_COURSE * WORDS_PER_LEVEL))
+    courses = course_entities(num_courses, LEVELS_PER_COURSE, WORDS_PER_LEVEL)
+    Course.objects.bulk_create(
+        Course(
+            id=course.id,
+            name=course.name,
+            url=course.url,
+            difficult=course.difficult,
+            num_things=course.num_words,
+            num_levels=course.num_levels,
+            difficult_url=course.difficult_url,
+        )
+        for course in courses
+    )
+    levels = [level for course in courses for level in course.levels]
+    Level.objects.bulk_create(
+        Level(id=level.id, number=level.number, name=level.name, course_id=level.course_id)
+        for level in levels
+    )
+    return [word for level in levels for word in level.words][:num_words]
+
+
+def reset_words(entities: List[WordEntity]) -> None:
+    """Перед каждым замером в БД остаются только слова, с которыми новые слова дублируются.
+
+    Занятые id сохранены в уровнях из другой половины набора: слово с тем же id в том же уровне
+    было бы не новым, а уже сохраненным.
+    """
+    Word.objects.all().delete()
+    step = int(1 / DUPLICATE_RATIO)
+    half = len(entities) // 2
+    Word.objects.bulk_create(
+        Word(
+            id=entities[index].id,
+            level_id=entities[(index + half) % len(entities)].level_id,
+            word_a=entities[index].word_a,
+            word_b=entities[index].word_b,
+        )
+        for index in range(0, len(entities), step)
+    )
+
+
+def fill_words(entities: List[WordEntity]) -> None:
+    """Перед замером обновления в БД есть все слова"""
+    Word.objects.all().delete()
+    Word.objects.bulk_create(
+        (
+            Word(id=item.id, level_id=item.level_id, word_a=item.word_a, word_b=item.word_b)
+            for item in entities
+        ),
+        batch_size=settings.MEMRISE_DB_BATCH_SIZE,
+    )
+
+
+@register_suite("word_actions")
+def word_actions_suite(repeat: int, size: Optional[int] = None) -> Iterator[Measure]:
+    actions = DBWordActions(reporter=SilentReporter())
+    upsert_actions = UpsertWordActions(reporter=SilentReporter())
+    with isolated_database() as vendor:
+        for num_words in (size,) if size else SYNTHETIC_SIZES:
+            entities = prepare_database(num_words)
+            # Каждый повтор пишет все слова заново, поэтому повторов немного.
+            size_repeat = max(1, repeat * 100 // num_words)
+            variants = (
+                ("DBWordActions.create legacy", partial(legacy_create, entities)),
+                ("DBWordActions.create batched", partial(actions.create, entities)),
+                ("UpsertWordActions.create", partial(upsert_actions.create, entities)),
+            )
+            for variant, func in variants:
+                yield measure(
+                    f"{variant} [{vendor}-{num_words}]",
+                    func,
+                    repeat=size_repeat,
+                    setup=partial(reset_words, entities),
+                    words=num_words,
+                )
+
+            changed = [
+                item.copy(update={"word_b": f"{item.word_b} (changed)"})
+                for item in entities
+            ]
+            variants = (
+                ("DBWordActions.update", partial(actions.update, changed)),
+                ("UpsertWordActions.update", partial(upsert_actions.update, changed)),
+            )
+            for variant, func in variants:
+                yield measure(
+                    f"{variant} [{vendor}-{num_words}]",
+                    func,
+                    repeat=size_repeat,
+                    setup=partial(fill_words, entities),
+                    words=num_words,
+                )
+
+            Course.objects.all().delete()
@@ -0,0 +1,73 @@
+"""
+Замеры снимка слов аккаунта: дерево сущностей WordEntity против колонок WordColumns
+
+Пиковая память замера упаковки - память снимка из `size` слов. Сравнение и подсчет изученных слов
+идут по всему снимку.
+"""
+from __future__ import annotations
+
+from functools import partial
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from memrise.benchmarks.base import Measure, measure, register_suite
+from memrise.benchmarks.selectors import CHANGED_RATIO, LEVELS_PER_COURSE, WORDS_PER_LEVEL
+from memrise.core.domains.entities import WordEntity
+from memrise.core.domains.word_columns import WordColumns
+from memrise.core.modules.selectors import WordColumnsSelector, WordSelector
+from memrise.tests.synthetic import course_entities
+
+# Количество слов в снимке.
+SYNTHETIC_SIZES = (100000,)
+
+
+def copy_words(words: List[WordEntity]) -> List[WordEntity]:
+    """Снимок сущностями: каждое слово - отдельный объект со своими строками и числами"""
+    return [word.copy() for word in words]
+
+
+@register_suite("word_columns")
+def word_columns_suite(repeat: int, size: Optional[int] = None) -> Iterator[Measure]:
+    for num_words in (size,) if size else SYNTHETIC_SIZES:
+        num_courses = max(1, num_words // (LEVELS_PER_COURSE * WORDS_PER_LEVEL))
+        make_courses = partial(
+            course_entities, num_courses, LEVELS_PER_COURSE, WORDS_PER_LEVEL
+        )
+        actual_words = [
+            word
+            for course in make_courses()
+            for level in course.levels
+            for word in level.words
+        ]
+        fresh_words = [
+            word
+            for course in make_courses(changed_ratio=CHANGED_RATIO)
+            for level in course.levels
+            for word in level.words
+        ]
+        actual_columns = WordColumns.from_entities(actual_words)
+        fresh_columns = WordColumns.from_entities(fresh_words)
+        total_words = len(fresh_words)
+        # Количество повторов уменьшается с ростом данных, общее количество слов примерно одинаковое.
+        size_repeat = max(1, repeat * 1000 // total_words)
+
+        variants: List[Tuple[str, Callable[[], object]]] = [
+            ("WordEntity snapshot", partial(copy_words, fresh_words)),
+            ("WordColumns snapshot", partial(WordColumns.from_entities, fresh_words)),
+            (
+                "WordEntity count learned",
+                lambda: sum(word.is_learned for word in fresh_words),
+            ),
+            ("WordColumns count learned", fresh_columns.count_learned),
+            (
+                "WordSelector match",
+                partial(WordSelector.match, fresh_words, actual_words),
+            ),
+            (
+                "WordColumnsSelector match",
+                partial(WordColumnsSelector.match, fresh_columns, actual_columns),
+            ),
+        ]
+        for name, func in variants:
+            yield measure(
+                f"{name} [{total_words}]", func, repeat=size_repeat, words=total_words
+            )
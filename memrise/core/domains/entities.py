@@ -1,31 +1,170 @@
+"""
+Доменные сущности
+=================
+
+Сущности - dataclass с явными `__slots__`: у экземпляров нет `__dict__` и служебных полей pydantic,
+сущности создаются без повторной валидации. Данные проверяются на входе (ответы memrise - pydantic
+модели, записи БД). Значения по умолчанию и `__slots__` в одном классе несовместимы, поэтому
+`__init__` у сущностей свой, а dataclass дает `__repr__`, `__eq__` и `fields()`.
+"""
+import hashlib
 from abc import ABC
-from typing import List
+from collections.abc import Sequence
+from copy import deepcopy
+from dataclasses import dataclass
+from operator import attrgetter
+from typing import Any, ClassVar, Dict, Iterable, List, Optional, Set, Tuple
 from urllib.parse import urljoin
 
-from pydantic import BaseModel, Field
-
-from memrise.core.mixins import AsDictMixin
 from memrise.shares.types import URL
 
+FINGERPRINT_SIZE = 16
+object_setattr = object.__setattr__
+
+
+def make_fingerprint(values: Tuple[Any, ...]) -> str:
+    """Отпечаток значений сравниваемых полей, см. `Entity.fingerprint`"""
+    return hashlib.blake2b(repr(values).encode(), digest_size=FINGERPRINT_SIZE).hexdigest()
+
+
+def make_digest(parts: Iterable[str]) -> str:
+    """Дайджест набора отпечатков, порядок частей задает вызывающий код"""
+    digest = hashlib.blake2b(digest_size=FINGERPRINT_SIZE)
+    for part in parts:
+        digest.update(part.encode())
+        digest.update(b"\n")
+
+    return digest.hexdigest()
+
+
+def _plain(value: Any) -> Any:
+    if isinstance(value, Entity):
+        return value.dict()
+    # Слова уровня могут храниться в колонках `WordColumns`, это тоже последовательность.
+    if isinstance(value, Sequence) and not isinstance(value, str):
+        return [_plain(item) for item in value]
+
+    return value
+
+
+class Entity(ABC):
+    # Отпечаток вместе со значениями сравниваемых полей, по которым он посчитан.
+    __slots__ = ("_fingerprint",)
+
+    # Поля, которые сравниваются отборщиками, вложенные сущности сравниваются в своих отборщиках.
+    compared_fields: ClassVar[Tuple[str, ...]] = ()
+    # Все поля сущности в порядке объявления, это `__slots__` класса сущности.
+    field_names: ClassVar[Tuple[str, ...]] = ()
+    _compared_values: ClassVar[attrgetter]
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls.field_names = tuple(cls.__dict__.get("__slots__", ()))
+        cls._compared_values = attrgetter(*cls.compared_fields)
+
+    @property
+    def compared_values(self) -> Tuple[Any, ...]:
+        """Значения сравниваемых полей, по ним отборщики решают, изменилась ли сущность"""
+        return self._compared_values(self)
+
+    @property
+    def fingerprint(self) -> str:
+        """Отпечаток содержимого сравниваемых полей для сохраняемых дайджестов уровней и курсов.
 
-class Entity(BaseModel, ABC):
-    pass
+        Считается заново, только если сравниваемые поля изменились с прошлого расчета. Не зависит
+        от процесса (в отличие от hash()), поэтому его можно сохранять и сравнивать между
+        запусками. Для сравнения сущностей в одном процессе достаточно `compared_values`.
+        """
+        values = self._compared_values(self)
+        cached = getattr(self, "_fingerprint", None)
+        if cached is not None and cached[0] == values:
+            return cached[1]
 
+        fingerprint = make_fingerprint(values)
+        object_setattr(self, "_fingerprint", (values, fingerprint))
+        return fingerprint
+
+    def dict(self, exclude: Optional[Set[str]] = None) -> Dict[str, Any]:
+        """Поля сущности словарем, вложенные сущности тоже переводятся в словари"""
+        exclude = exclude or set()
+        return {
+            name: _plain(getattr(self, name))
+            for name in self.field_names
+            if name not in exclude
+        }
+
+    def copy(self, update: Optional[Dict[str, Any]] = None, deep: bool = False) -> Any:
+        """Копия сущности, поля из `update` заменяются"""
+        values = {name: getattr(self, name) for name in self.field_names}
+        if deep:
+            values = deepcopy(values)
+        values.update(update or {})
+        return self.__class__(**values)
+
+
+@dataclass(init=False)
+class WordEntity(Entity):
+    __slots__ = ("id", "level_id", "word_a", "word_b", "is_learned")
+
+    compared_fields: ClassVar[Tuple[str, ...]] = (
+        "id",
+        "level_id",
+        "word_a",
+        "word_b",
+        "is_learned",
+    )
 
-class WordEntity(Entity, AsDictMixin):
     id: int
     level_id: int
     word_a: str
     word_b: str
-    is_learned: bool = False
+    is_learned: bool
+
+    def __init__(
+        self, id: int, level_id: int, word_a: str, word_b: str, is_learned: bool = False
+    ) -> None:
+        self.id = id
+        self.level_id = level_id
+        self.word_a = word_a
+        self.word_b = word_b
+        self.is_learned = is_learned
+
+
+@dataclass(init=False)
+class LevelEntity(Entity):
+    __slots__ = ("id", "number", "course_id", "name", "words")
 
+    compared_fields: ClassVar[Tuple[str, ...]] = ("id", "number", "course_id", "name")
 
-class LevelEntity(Entity, AsDictMixin):
     id: int
     number: int
     course_id: int
     name: str
-    words: List[WordEntity] = Field(default_factory=list)
+    words: List[WordEntity]
+
+    def __init__(
+        self,
+        id: int,
+        number: int,
+        course_id: int,
+        name: str,
+        words: Optional[List[WordEntity]] = None,
+    ) -> None:
+        self.id = id
+        self.number = number
+        self.course_id = course_id
+        self.name = name
+        self.words = [] if words is None else words
+
+    @property
+    def digest(self) -> str:
+        """Дайджест слов уровня, меняется при изменении, добавлении или удалении любого слова"""
+        # Колонки `WordColumns` считают отпечатки строк без создания сущностей.
+        fingerprints = getattr(self.words, "fingerprints", None)
+        if fingerprints is not None:
+            return make_digest(sorted(fingerprints()))
+
+        return make_digest(sorted(word.fingerprint for word in self.words))
 
     def add_word(self, word: WordEntity) -> None:
         """Добавление слова в уровень"""
@@ -36,7 +175,33 @@ class LevelEntity(Entity, AsDictMixin):
         self.words = words
 
 
-class CourseEntity(Entity, AsDictMixin):
+@dataclass(init=False)
+class CourseEntity(Entity):
+    __slots__ = (
+        "id",
+        "name",
+        "url",
+        "difficult",
+        "num_words",
+        "num_levels",
+        "difficult_url",
+        "levels_url",
+        "levels",
+        "is_disable",
+        "dashboard_digest",
+    )
+
+    compared_fields: ClassVar[Tuple[str, ...]] = (
+        "id",
+        "name",
+        "url",
+        "difficult",
+        "num_words",
+        "num_levels",
+        "difficult_url",
+        "is_disable",
+    )
+
     id: int
     name: str
     url: str
@@ -44,9 +209,44 @@ class CourseEntity(Entity, AsDictMixin):
     num_words: int
     num_levels: int
     difficult_url: str
-    levels_url: List[URL] = Field(default_factory=list)
-    levels: List[LevelEntity] = Field(default_factory=list)
-    is_disable: bool = Field(default=False)
+    levels_url: List[URL]
+    levels: List[LevelEntity]
+    is_disable: bool
+    # Дайджест метаданных курса на dashboard, по нему решается нужно ли стягивать уровни курса.
+    dashboard_digest: str
+
+    def __init__(
+        self,
+        id: int,
+        name: str,
+        url: str,
+        difficult: int,
+        num_words: int,
+        num_levels: int,
+        difficult_url: str,
+        levels_url: Optional[List[URL]] = None,
+        levels: Optional[List[LevelEntity]] = None,
+        is_disable: bool = False,
+        dashboard_digest: str = "",
+    ) -> None:
+        self.id = id
+        self.name = name
+        self.url = url
+        self.difficult = difficult
+        self.num_words = num_words
+        self.num_levels = num_levels
+        self.difficult_url = difficult_url
+        self.levels_url = [] if levels_url is None else levels_url
+        self.levels = [] if levels is None else levels
+        self.is_disable = is_disable
+        self.dashboard_digest = dashboard_digest
+
+    @property
+    def digest(self) -> str:
+        """Дайджест дерева уровней курса: сами уровни и дайджесты их слов"""
+        return make_digest(
+            sorted(level.fingerprint + level.digest for level in self.levels)
+        )
 
     def generate_levels_url(self) -> None:
         """Создание списка URL уровней"""
@@ -0,0 +1,144 @@
+"""
+Колоночное хранение слов
+========================
+
+WordColumns хранит слова не объектами WordEntity, а колонками: id слов и уровней в массивах `array`,
+флаги изученности в bytearray, слова и переводы - интернированные строки, повторы которых хранятся
+одним объектом. Снимок аккаунта в колонках занимает в разы меньше памяти, чем дерево сущностей.
+
+Подсчеты идут по колонкам целиком, без создания сущностей. WordEntity создаются только при обращении
+к элементам, поэтому колонки можно подставить вместо списка слов уровня: `LevelEntity.digest` берет
+отпечатки строк из колонок, сравнение колонок - `WordColumnsSelector`.
+
+Колонки служат только снимкам dashboard (`Dashboard.get_word_columns`, MEMRISE_COLUMNAR_WORDS).
+Обновление `UpdateManager` сравнивает слова сущностями через `WordSelector`: свежим словам до
+сравнения выдаются постоянные id дубликатов (`resolve_word_ids`), а слова из БД читаются сущностями.
+
+HOW TO USE IT:
+    columns = WordColumns.from_entities(level.words)
+    columns.count_learned()
+    columns.count_by_level()
+    words = list(columns)
+"""
+from __future__ import annotations
+
+import sys
+from array import array
+from collections import Counter
+from dataclasses import dataclass, field
+from itertools import compress
+from typing import Dict, Iterable, Iterator, List, Sequence, Set, Tuple, Union
+
+from memrise.core.domains.entities import WordEntity, make_fingerprint
+
+# Знаковые 64-битные целые. В БД id слов и уровней - IntegerField (32 бита), но колонки строятся
+# из ответов memrise до записи в БД и не должны падать на id за пределами 32 бит.
+ID_TYPECODE = "q"
+
+# Строка колонок в порядке полей WordEntity: id, level_id, word_a, word_b, is_learned.
+WordRow = Tuple[int, int, str, str, bool]
+
+
+def id_array() -> array:
+    return array(ID_TYPECODE)
+
+
+@dataclass
+class WordColumns(Sequence[WordEntity]):
+    ids: array = field(default_factory=id_array)
+    level_ids: array = field(default_factory=id_array)
+    learned: bytearray = field(default_factory=bytearray)
+    words_a: List[str] = field(default_factory=list)
+    words_b: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_entities(cls, words: Iterable[WordEntity]) -> WordColumns:
+        """Колонки из сущностей слов"""
+        columns = cls()
+        columns.extend(words)
+        return columns
+
+    def append(self, word: WordEntity) -> None:
+        """Добавление слова"""
+        self.ids.append(word.id)
+        self.level_ids.append(word.level_id)
+        self.learned.append(word.is_learned)
+        self.words_a.append(sys.intern(word.word_a))
+        self.words_b.append(sys.intern(word.word_b))
+
+    def extend(self, words: Iterable[WordEntity]) -> None:
+        """Массовое добавление слов"""
+        for word in words:
+            self.append(word)
+
+    def merge(self, other: WordColumns) -> None:
+        """Добавление колонок `other` целиком, без перебора слов"""
+        self.ids.extend(other.ids)
+        self.level_ids.extend(other.level_ids)
+        self.learned.extend(other.learned)
+        self.words_a.extend(other.words_a)
+        self.words_b.extend(other.words_b)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[WordEntity, WordColumns]:  # type: ignore
+        if isinstance(index, slice):
+            return WordColumns(
+                self.ids[index],
+                self.level_ids[index],
+                self.learned[index],
+                self.words_a[index],
+                self.words_b[index],
+            )
+
+        return WordEntity(
+            self.ids[index],
+            self.level_ids[index],
+            self.words_a[index],
+            self.words_b[index],
+            bool(self.learned[index]),
+        )
+
+    def __iter__(self) -> Iterator[WordEntity]:
+        return map(
+            WordEntity,
+            self.ids,
+            self.level_ids,
+            self.words_a,
+            self.words_b,
+            map(bool, self.learned),
+        )
+
+    def rows(self) -> Iterator[WordRow]:
+        """Строки колонок в порядке полей WordEntity"""
+        return zip(
+            self.ids, self.level_ids, self.words_a, self.words_b, map(bool, self.learned)
+        )
+
+    def fingerprints(self) -> List[str]:
+        """Отпечатки слов, совпадают с `WordEntity.fingerprint`"""
+        return [make_fingerprint(row) for row in self.rows()]
+
+    def count_learned(self) -> int:
+        """Количество изученных слов"""
+        return self.learned.count(1)
+
+    def count_by_level(self) -> Dict[int, int]:
+        """Количество слов по уровням"""
+        return Counter(self.level_ids)
+
+    def count_learned_by_level(self) -> Dict[int, int]:
+        """Количество изученных слов по уровням"""
+        return Counter(compress(self.level_ids, self.learned))
+
+    def select_levels(self, level_ids: Set[int]) -> WordColumns:
+        """Колонки слов уровней `level_ids`"""
+        mask = bytearray(level_id in level_ids for level_id in self.level_ids)
+        return WordColumns(
+            array(ID_TYPECODE, compress(self.ids, mask)),
+            array(ID_TYPECODE, compress(self.level_ids, mask)),
+            bytearray(compress(self.learned, mask)),
+            list(compress(self.words_a, mask)),
+            list(compress(self.words_b, mask)),
+        )
@@ -1,8 +1,68 @@
-from random import randint
+import asyncio
+import threading
+from itertools import islice
+from typing import AsyncIterator, Iterable, Iterator, List, Tuple, TypeVar
 
+from django.conf import settings
 
-def generate_custom_id(max_len: int = 7) -> int:
-    """Генерация номера ID для дублированных записей"""
-    range_start = 10**(max_len-1)
-    range_end = (10**max_len)-1
-    return randint(range_start, range_end)
+T = TypeVar("T")
+# Конец обхода в очереди `iterate_async`.
+_END = object()
+
+
+def chunked(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Разбиение последовательности на пачки размером не больше `size`"""
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def iterate_async(
+    async_iterator: AsyncIterator[T], maxsize: int = settings.MEMRISE_CONCURRENCY
+) -> Iterator[T]:
+    """Синхронный обход асинхронного итератора.
+
+    Event loop работает в отдельном потоке и складывает элементы в очередь не больше `maxsize`,
+    поэтому запросы обхода продолжаются, пока потребитель разбирает полученный элемент. Ошибка
+    итератора поднимается у потребителя. Если потребитель бросил обход, итератор отменяется
+    и закрывается, event loop живет ровно столько, сколько живет обход.
+    """
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    async def produce(items: asyncio.Queue) -> None:
+        try:
+            async for item in async_iterator:
+                await items.put((item, None))
+        except Exception as error:
+            await items.put((_END, error))
+        else:
+            await items.put((_END, None))
+
+    async def start() -> Tuple[asyncio.Queue, asyncio.Future]:
+        items: asyncio.Queue = asyncio.Queue(maxsize)
+        return items, asyncio.ensure_future(produce(items))
+
+    async def stop() -> None:
+        producer.cancel()
+        await asyncio.gather(producer, return_exceptions=True)
+        aclose = getattr(async_iterator, "aclose", None)
+        if aclose is not None:
+            await aclose()
+        await loop.shutdown_asyncgens()
+
+    items, producer = asyncio.run_coroutine_threadsafe(start(), loop).result()
+    try:
+        while True:
+            item, error = asyncio.run_coroutine_threadsafe(items.get(), loop).result()
+            if error is not None:
+                raise error
+            if item is _END:
+                break
+            yield item
+    finally:
+        asyncio.run_coroutine_threadsafe(stop(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import ClassVar
+from typing import ClassVar, Dict, Type
 
 from memrise.core.modules.actions.action_reporter import (
     CourseReporter,
@@ -8,6 +8,11 @@ from memrise.core.modules.actions.action_reporter import (
     WordReporter,
 )
 from memrise.core.modules.actions.base import Actions
+from memrise.core.modules.actions.copy_actions import (
+    CopyCourseActions,
+    CopyLevelActions,
+    CopyWordActions,
+)
 from memrise.core.modules.actions.db_actions import (
     DBCourseActions,
     DBLevelActions,
@@ -18,6 +23,11 @@ from memrise.core.modules.actions.empty_actions import (
     EmptyLevelActions,
     EmptyWordActions,
 )
+from memrise.core.modules.actions.upsert_actions import (
+    UpsertCourseActions,
+    UpsertLevelActions,
+    UpsertWordActions,
+)
 
 
 @dataclass
@@ -42,6 +52,22 @@ class DBActionsBatch(ActionsBatch):
         self.word = DBWordActions(reporter=WordReporter())
 
 
+@dataclass
+class UpsertActionsBatch(ActionsBatch):
+    def init(self):
+        self.course = UpsertCourseActions(reporter=CourseReporter())
+        self.level = UpsertLevelActions(reporter=LevelReporter())
+        self.word = UpsertWordActions(reporter=WordReporter())
+
+
+@dataclass
+class CopyActionsBatch(ActionsBatch):
+    def init(self):
+        self.course = CopyCourseActions(reporter=CourseReporter())
+        self.level = CopyLevelActions(reporter=LevelReporter())
+        self.word = CopyWordActions(reporter=WordReporter())
+
+
 @dataclass
 class JsonActionsBatch(ActionsBatch):
     def init(self):
@@ -56,3 +82,11 @@ class MemriseActionsBatch(ActionsBatch):
         self.course = EmptyCourseActions(reporter=CourseReporter())
         self.level = EmptyLevelActions(reporter=LevelReporter())
         self.word = EmptyWordActions(reporter=WordReporter())
+
+
+# Варианты записи в БД, выбираются настройкой MEMRISE_ACTIONS_BATCH.
+DB_ACTIONS_BATCHES: Dict[str, Type[ActionsBatch]] = {
+    "db": DBActionsBatch,
+    "upsert": UpsertActionsBatch,
+    "copy": CopyActionsBatch,
+}
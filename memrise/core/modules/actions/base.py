@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, ClassVar, TypeVar
+from typing import List, ClassVar, Tuple, TypeVar
 
 from pydantic import BaseModel
 
@@ -13,6 +13,8 @@ class Actions(BaseModel, ABC):
     reporter: Reporter
     prefix: ClassVar[str] = ""
     postfix: ClassVar[str] = "[$total]: $id_items"
+    # Команды, которые сами пишут поток записей пачками, репозиторий передает им все сущности сразу.
+    streamed_commands: ClassVar[Tuple[str, ...]] = ()
 
     @abstractmethod
     def create(self, entities: List[EntityT]) -> None:
@@ -0,0 +1,173 @@
+"""
+Первичная загрузка данных через COPY FROM STDIN
+===============================================
+
+При первом импорте большого аккаунта все курсы, уровни и слова новые, и bulk_create на сотнях тысяч
+записей упирается в разбор INSERT запросов. На PostgreSQL новые записи потоком идут через
+`COPY FROM STDIN` во временную таблицу и переносятся в таблицу модели одним запросом
+INSERT ... SELECT ... ON CONFLICT DO UPDATE. Записи строятся пачками по `MEMRISE_DB_BATCH_SIZE`,
+поэтому в памяти не держится весь набор моделей.
+
+На остальных СУБД (SQLite) новые записи добавляются через bulk_create пачками. Обновление записей
+идет через upsert, как в UpsertActionsBatch.
+
+HOW TO USE IT:
+    MEMRISE_ACTIONS_BATCH=copy python manage.py runserver
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Callable,
+    ClassVar,
+    Iterable,
+    Iterator,
+    List,
+    Tuple,
+    Type,
+    TYPE_CHECKING,
+)
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Model
+
+from memrise.core.helpers import chunked
+from memrise.core.modules.actions.upsert_actions import (
+    UpsertCourseActions,
+    UpsertLevelActions,
+    UpsertWordActions,
+)
+from memrise.core.modules.word_ids import resolve_duplicates
+from memrise.models import Course, Level, Word
+
+if TYPE_CHECKING:
+    from memrise.core.domains.entities import CourseEntity, LevelEntity, WordEntity
+
+# Экранирование текстового формата COPY.
+COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+COPY_NULL = "\\N"
+
+
+def copy_value(value: Any) -> str:
+    """Значение поля в текстовом формате COPY"""
+    if value is None:
+        return COPY_NULL
+    if isinstance(value, bool):
+        return "t" if value else "f"
+
+    return str(value).translate(COPY_ESCAPES)
+
+
+@dataclass
+class CopyReader:
+    """Файлоподобный объект для COPY FROM STDIN, строки собираются по мере чтения"""
+
+    lines: Iterator[str]
+
+    def read(self, size: int = -1) -> str:
+        if size < 0:
+            return "".join(self.lines)
+
+        chunk = []
+        total = 0
+        for line in self.lines:
+            chunk.append(line)
+            total += len(line)
+            if total >= size:
+                break
+
+        return "".join(chunk)
+
+
+def copy_load(
+    model: Type[Model], records: Iterable[Model], update_fields: List[str]
+) -> None:
+    """Загрузка записей `model`, при конфликте по первичному ключу обновляются `update_fields`"""
+    if connection.vendor != "postgresql":
+        for chunk in chunked(records, settings.MEMRISE_DB_BATCH_SIZE):
+            model.objects.bulk_create(chunk)
+        return
+
+    opts = model._meta
+    fields = opts.concrete_fields
+    quote_name = connection.ops.quote_name
+    table = quote_name(opts.db_table)
+    staging = quote_name(f"{opts.db_table}_staging")
+    columns = ", ".join(quote_name(field.column) for field in fields)
+    updates = ", ".join(
+        f"{quote_name(column)} = EXCLUDED.{quote_name(column)}"
+        for column in (opts.get_field(name).column for name in update_fields)
+    )
+    lines = (
+        "\t".join(
+            copy_value(field.get_db_prep_save(getattr(record, field.attname), connection))
+            for field in fields
+        )
+        + "\n"
+        for record in records
+    )
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TEMPORARY TABLE {staging} (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP"
+        )
+        cursor.copy_expert(
+            f"COPY {staging} ({columns}) FROM STDIN", CopyReader(lines)
+        )
+        cursor.execute(
+            f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {staging} "
+            f"ON CONFLICT ({quote_name(opts.pk.column)}) DO UPDATE SET {updates}"
+        )
+        # Внутри внешней транзакции ON COMMIT DROP сработает только в ее конце, и следующая
+        # загрузка той же модели не смогла бы создать временную таблицу.
+        cursor.execute(f"DROP TABLE {staging}")
+
+
+def iterate_records(
+    make_records: Callable[[List[Any]], List[Model]], entities: List[Any]
+) -> Iterator[Model]:
+    """Записи строятся пачками по мере загрузки"""
+    for chunk in chunked(entities, settings.MEMRISE_DB_BATCH_SIZE):
+        yield from make_records(chunk)
+
+
+class CopyCourseActions(UpsertCourseActions):
+    streamed_commands: ClassVar[Tuple[str, ...]] = ("create",)
+
+    def create(self, entities: List[CourseEntity]) -> None:
+        self.reporter.report(
+            entities, f"{self.prefix}Добавление новых курсов{self.postfix}"
+        )
+
+        copy_load(
+            Course, iterate_records(self._make_records, entities), self.update_fields
+        )
+
+
+class CopyLevelActions(UpsertLevelActions):
+    streamed_commands: ClassVar[Tuple[str, ...]] = ("create",)
+
+    def create(self, entities: List[LevelEntity]) -> None:
+        self.reporter.report(
+            entities, f"{self.prefix}Добавление новых уровней{self.postfix}"
+        )
+
+        copy_load(
+            Level, iterate_records(self._make_records, entities), self.update_fields
+        )
+
+
+class CopyWordActions(UpsertWordActions):
+    streamed_commands: ClassVar[Tuple[str, ...]] = ("create",)
+
+    def create(self, entities: List[WordEntity]) -> None:
+        self.reporter.report(
+            entities, f"{self.prefix}Добавление новых слов{self.postfix}"
+        )
+
+        copy_load(Word, self._iterate_new_records(entities), self.update_fields)
+
+    def _iterate_new_records(self, entities: List[WordEntity]) -> Iterator[Word]:
+        return iterate_records(self._make_records, resolve_duplicates(entities))
@@ -2,8 +2,10 @@ from __future__ import annotations
 
 from typing import List, ClassVar, TYPE_CHECKING
 
-from memrise.core.helpers import generate_custom_id
+from django.conf import settings
+
 from memrise.core.modules.actions.base import Actions
+from memrise.core.modules.word_ids import resolve_duplicates
 from memrise.models import Course, Level, Word
 
 if TYPE_CHECKING:
@@ -11,30 +13,29 @@ if TYPE_CHECKING:
 
 
 class DBCourseActions(Actions):
+    update_fields: ClassVar[List[str]] = [
+        "name",
+        "url",
+        "difficult",
+        "num_things",
+        "num_levels",
+        "difficult_url",
+        "is_disable",
+    ]
+
     def create(self, entities: List[CourseEntity]) -> None:
         self.reporter.report(
             entities, f"{self.prefix}Добавление новых курсов{self.postfix}"
         )
 
-        courses = []
-        for item in entities:
-            courses.append(
-                Course(
-                    id=item.id,
-                    name=item.name,
-                    url=item.url,
-                    difficult=item.difficult,
-                    num_things=item.num_words,
-                    num_levels=item.num_levels,
-                    difficult_url=item.difficult_url,
-                )
-            )
-
-        Course.objects.bulk_create(courses)
+        Course.objects.bulk_create(self._make_records(entities))
 
     def update(self, entities: List[CourseEntity]) -> None:
         self.reporter.report(entities, f"{self.prefix}Обновление курсов{self.postfix}")
 
+        Course.objects.bulk_update(self._make_records(entities), self.update_fields)
+
+    def _make_records(self, entities: List[CourseEntity]) -> List[Course]:
         courses = []
         for item in entities:
             courses.append(
@@ -50,18 +51,7 @@ class DBCourseActions(Actions):
                 )
             )
 
-        Course.objects.bulk_update(
-            courses,
-            [
-                "name",
-                "url",
-                "difficult",
-                "num_things",
-                "num_levels",
-                "difficult_url",
-                "is_disable",
-            ],
-        )
+        return courses
 
     def equal(self, entities: List[CourseEntity]) -> None:
         self.reporter.report(
@@ -72,12 +62,21 @@ class DBCourseActions(Actions):
         # Курсы не удаляем, а отключаем, для того чтобы можно было бы вернуться к ним.
         self.reporter.report(entities, f"{self.prefix}Отключение курсов{self.postfix}")
 
+        # Дайджесты сбрасываем, уровни отключенного курса удаляются и при возврате курса стягиваются заново.
         courses = []
         for item in entities:
-            courses.append(Course(id=item.id, is_disable=True))
+            courses.append(
+                Course(
+                    id=item.id,
+                    is_disable=True,
+                    digest="",
+                    dashboard_digest="",
+                    crawled_at=None,
+                )
+            )
 
         Course.objects.bulk_update(
-            courses, ["is_disable"],
+            courses, ["is_disable", "digest", "dashboard_digest", "crawled_at"],
         )
 
         # <editor-fold desc="Удаление курса из БД">
@@ -93,12 +92,21 @@ class DBCourseActions(Actions):
 
 class DBLevelActions(Actions):
     prefix: ClassVar[str] = "Курс $course_id --> "
+    update_fields: ClassVar[List[str]] = ["name"]
 
     def create(self, entities: List[LevelEntity]) -> None:
         self.reporter.report(
             entities, f"{self.prefix}Добавление новых уровней{self.postfix}"
         )
 
+        Level.objects.bulk_create(self._make_records(entities))
+
+    def update(self, entities: List[LevelEntity]) -> None:
+        self.reporter.report(entities, f"{self.prefix}Обновление уровней{self.postfix}")
+
+        Level.objects.bulk_update(self._make_records(entities), self.update_fields)
+
+    def _make_records(self, entities: List[LevelEntity]) -> List[Level]:
         levels = []
         for item in entities:
             levels.append(
@@ -110,16 +118,7 @@ class DBLevelActions(Actions):
                 )
             )
 
-        Level.objects.bulk_create(levels)
-
-    def update(self, entities: List[LevelEntity]) -> None:
-        self.reporter.report(entities, f"{self.prefix}Обновление уровней{self.postfix}")
-
-        levels = []
-        for item in entities:
-            levels.append(Level(id=item.id, course_id=item.course_id, name=item.name))
-
-        Level.objects.bulk_update(levels, ["name"])
+        return levels
 
     def equal(self, entities: List[LevelEntity]) -> None:
         self.reporter.report(
@@ -138,42 +137,43 @@ class DBLevelActions(Actions):
 
 class DBWordActions(Actions):
     prefix: ClassVar[str] = "Уровень $level_id --> "
+    # is_learned входит в сравниваемые поля WordEntity: без него отборщик видел бы изменение
+    # статуса изучения, но в БД оно не попадало, и слово уходило в обновление при каждом обходе.
+    update_fields: ClassVar[List[str]] = ["word_a", "word_b", "is_learned"]
 
     def create(self, entities: List[WordEntity]) -> None:
         self.reporter.report(
             entities, f"{self.prefix}Добавление новых слов{self.postfix}"
         )
 
+        Word.objects.bulk_create(
+            self._make_new_records(entities), batch_size=settings.MEMRISE_DB_BATCH_SIZE
+        )
+
+    def _make_new_records(self, entities: List[WordEntity]) -> List[Word]:
+        """Записи новых слов, дубликаты получают постоянные id"""
+        return self._make_records(resolve_duplicates(entities))
+
+    def update(self, entities: List[WordEntity]) -> None:
+        self.reporter.report(entities, f"{self.prefix}Обновление слов{self.postfix}")
+
+        # TODO: сделать тесты, была не отловлена ошибка по обновлению данных!!!
+        Word.objects.bulk_update(self._make_records(entities), self.update_fields)
+
+    def _make_records(self, entities: List[WordEntity]) -> List[Word]:
         words = []
         for item in entities:
-            try:
-                # Если id был найден, значит это дубликат, присваиваем ему сгенерированный id.
-                Word.objects.get(id=item.id)
-                item_id = generate_custom_id()
-            except Word.DoesNotExist:
-                item_id = item.id
-
             words.append(
                 Word(
-                    id=item_id,
+                    id=item.id,
                     level_id=item.level_id,
                     word_a=item.word_a,
                     word_b=item.word_b,
-                    is_learned=item.is_learned
+                    is_learned=item.is_learned,
                 )
             )
 
-        Word.objects.bulk_create(words)
-
-    def update(self, entities: List[WordEntity]) -> None:
-        self.reporter.report(entities, f"{self.prefix}Обновление слов{self.postfix}")
-
-        words = []
-        for item in entities:
-            words.append(Word(id=item.id, word_a=item.word_a, word_b=item.word_b, is_learned=item.is_learned))
-
-        # TODO: сделать тесты, была не отловлена ошибка по обновлению данных!!!
-        Word.objects.bulk_update(words, ["word_a", "word_b"])
+        return words
 
     def equal(self, entities: List[WordEntity]) -> None:
         self.reporter.report(
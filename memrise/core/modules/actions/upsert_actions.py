@@ -0,0 +1,110 @@
+"""
+Запись новых и измененных данных через INSERT ... ON CONFLICT DO UPDATE
+========================================================================
+
+bulk_update строит на пачку записей UPDATE с CASE WHEN на каждое поле, такой запрос долго разбирается
+и держит блокировки строк. Upsert пишет новые и измененные записи одним видом запроса пачками
+по `MEMRISE_DB_BATCH_SIZE`, обновляются только поля `update_fields` действия. В отличие от bulk_update,
+запись, которой нет в БД, при обновлении добавляется.
+
+В Django 3.1 у bulk_create нет `update_conflicts`, поэтому запрос собирается вручную. Поддерживаются
+PostgreSQL и SQLite >= 3.24.
+"""
+from __future__ import annotations
+
+from typing import List, Sequence, TYPE_CHECKING
+
+from django.conf import settings
+from django.db import NotSupportedError, connection
+from django.db.models import Model
+
+from memrise.core.helpers import chunked
+from memrise.core.modules.actions.db_actions import (
+    DBCourseActions,
+    DBLevelActions,
+    DBWordActions,
+)
+
+if TYPE_CHECKING:
+    from memrise.core.domains.entities import CourseEntity, LevelEntity, WordEntity
+
+UPSERT_VENDORS = ("postgresql", "sqlite")
+
+
+def upsert(records: Sequence[Model], update_fields: List[str]) -> None:
+    """Вставка записей пачками, при конфликте по первичному ключу обновляются поля `update_fields`"""
+    if not records:
+        return
+
+    if connection.vendor not in UPSERT_VENDORS:
+        raise NotSupportedError(f"Upsert не поддерживается для `{connection.vendor}`")
+
+    opts = records[0]._meta
+    fields = opts.concrete_fields
+    quote_name = connection.ops.quote_name
+    columns = ", ".join(quote_name(field.column) for field in fields)
+    updates = ", ".join(
+        f"{quote_name(column)} = EXCLUDED.{quote_name(column)}"
+        for column in (opts.get_field(name).column for name in update_fields)
+    )
+    row = f"({', '.join(['%s'] * len(fields))})"
+    # SQLite ограничивает количество параметров в запросе, пачка уменьшается под это ограничение.
+    batch_size = min(
+        settings.MEMRISE_DB_BATCH_SIZE, connection.ops.bulk_batch_size(fields, records)
+    )
+
+    with connection.cursor() as cursor:
+        for chunk in chunked(records, batch_size):
+            cursor.execute(
+                f"INSERT INTO {quote_name(opts.db_table)} ({columns}) "
+                f"VALUES {', '.join([row] * len(chunk))} "
+                f"ON CONFLICT ({quote_name(opts.pk.column)}) DO UPDATE SET {updates}",
+                [
+                    field.get_db_prep_save(getattr(record, field.attname), connection)
+                    for record in chunk
+                    for field in fields
+                ],
+            )
+
+
+class UpsertCourseActions(DBCourseActions):
+    def create(self, entities: List[CourseEntity]) -> None:
+        self.reporter.report(
+            entities, f"{self.prefix}Добавление новых курсов{self.postfix}"
+        )
+
+        upsert(self._make_records(entities), self.update_fields)
+
+    def update(self, entities: List[CourseEntity]) -> None:
+        self.reporter.report(entities, f"{self.prefix}Обновление курсов{self.postfix}")
+
+        upsert(self._make_records(entities), self.update_fields)
+
+
+class UpsertLevelActions(DBLevelActions):
+    def create(self, entities: List[LevelEntity]) -> None:
+        self.reporter.report(
+            entities, f"{self.prefix}Добавление новых уровней{self.postfix}"
+        )
+
+        upsert(self._make_records(entities), self.update_fields)
+
+    def update(self, entities: List[LevelEntity]) -> None:
+        self.reporter.report(entities, f"{self.prefix}Обновление уровней{self.postfix}")
+
+        upsert(self._make_records(entities), self.update_fields)
+
+
+class UpsertWordActions(DBWordActions):
+    def create(self, entities: List[WordEntity]) -> None:
+        self.reporter.report(
+            entities, f"{self.prefix}Добавление новых слов{self.postfix}"
+        )
+
+        # Дубликаты получают постоянные id до записи, иначе upsert перезаписал бы слово другого уровня.
+        upsert(self._make_new_records(entities), self.update_fields)
+
+    def update(self, entities: List[WordEntity]) -> None:
+        self.reporter.report(entities, f"{self.prefix}Обновление слов{self.postfix}")
+
+        upsert(self._make_records(entities), self.update_fields)
@@ -1,25 +1,76 @@
 from __future__ import annotations
 
+import asyncio
+from contextlib import asynccontextmanager
 from dataclasses import dataclass, field
-from typing import Dict
+from http import HTTPStatus
+from time import perf_counter
+from typing import AsyncIterator, Dict, Mapping, Optional
 from urllib.parse import urljoin
 
-from aiohttp import ClientSession
+from aiohttp import (
+    ClientConnectionError,
+    ClientPayloadError,
+    ClientResponseError,
+    ClientSession,
+    ClientTimeout,
+    TCPConnector,
+)
 from django.conf import settings
 
 from memrise import logger
+from memrise.core.modules.api.cassette import Cassette, default_cassette
+from memrise.core.modules.api.html_cache import (
+    HTMLCache,
+    Page,
+    content_key,
+    default_html_cache,
+)
+from memrise.core.modules.api.page_validators import (
+    PageValidators,
+    Validator,
+    default_page_validators,
+)
+from memrise.core.modules.api.rate_limiter import RateLimiter, shared_rate_limiter
+from memrise.core.modules.api.retry import RetryPolicy
 from memrise.core.modules.web_socket_client import wss
 from memrise.shares.types import URL
 
 GET, POST = "GET", "POST"
 
+# Ошибки соединения, после которых запрос повторяется.
+RETRY_ERRORS = (ClientConnectionError, ClientPayloadError, asyncio.TimeoutError)
+
+
+@dataclass
+class Reply:
+    """Прочитанный ответ, доступный после закрытия соединения"""
+
+    status: int
+    text: str
+    headers: Mapping[str, str]
+
 
 @dataclass
 class AsyncAPI:
     timeout: int = 90
     ssl: bool = False
+    concurrency: int = settings.MEMRISE_CONCURRENCY
+    limit_per_host: int = settings.MEMRISE_LIMIT_PER_HOST
+    keepalive_timeout: int = 30
+    # Кеш страниц уровней на диске, None - страницы всегда стягиваются из memrise.
+    cache: Optional[HTMLCache] = field(default_factory=default_html_cache)
+    # ETag, Last-Modified и разобранные уровни для условных запросов, None - запросы безусловные.
+    validators: Optional[PageValidators] = field(default_factory=default_page_validators)
+    retry: RetryPolicy = field(default_factory=RetryPolicy)
+    # Общее с `API` ограничение скорости запросов, None - без ограничения.
+    limiter: Optional[RateLimiter] = field(default_factory=shared_rate_limiter)
+    # Кассета для записи ответов, None - ответы не записываются.
+    cassette: Optional[Cassette] = field(default_factory=default_cassette)
     headers: Dict = field(init=False)
     cookies: Dict = field(init=False)
+    _session: Optional[ClientSession] = field(init=False, default=None)
+    _semaphore: Optional[asyncio.Semaphore] = field(init=False, default=None)
 
     def __post_init__(self) -> None:
         self.headers = {
@@ -29,21 +80,187 @@ class AsyncAPI:
         }
         self.cookies = settings.MEMRISE_COOKIES
 
+    @asynccontextmanager
+    async def crawl_session(self) -> AsyncIterator[ClientSession]:
+        """Общая сессия на время обхода уровней.
+
+        Все запросы внутри контекста используют один пул keep-alive соединений, а количество
+        одновременных запросов ограничивается семафором `concurrency`.
+        """
+        connector = TCPConnector(
+            limit=self.concurrency,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            ssl=self.ssl,
+        )
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        async with ClientSession(
+            connector=connector,
+            cookies=self.cookies,
+            headers=self.headers,
+            timeout=ClientTimeout(total=self.timeout),
+        ) as session:
+            self._session = session
+            try:
+                yield session
+            finally:
+                self._session = None
+                self._semaphore = None
+
     async def fetch(
         self, session: ClientSession, method: str, endpoint: URL
     ) -> str:
         url = urljoin(settings.MEMRISE_HOST, endpoint)
-        async with session.request(method, url, ssl=self.ssl) as response:
-            response.raise_for_status()
-            logger.debug(f"Got response [{response.status}] for URL: {url}, ({response.content=})")
-            wss.publish(f"Memrise API request: {method} {url}: {response}", is_mute=True)
-            return await response.text()
+        reply = await self.request(session, method, url)
+        return reply.text
+
+    async def request(
+        self,
+        session: ClientSession,
+        method: str,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Reply:
+        """Запрос с повторами по политике `retry`.
+
+        Ответы 429 и 5xx, обрывы соединения и таймауты повторяются с задержкой, остальные ошибочные
+        ответы и последняя неудачная попытка поднимают исключение aiohttp. Каждая попытка ждет
+        токен ограничителя `limiter` и сообщает ему статус и задержку ответа.
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            can_retry = attempt <= self.retry.retries
+            if self.limiter is not None:
+                await self.limiter.acquire_async()
+            start = perf_counter()
+            try:
+                async with session.request(
+                    method, url, ssl=self.ssl, headers=headers or {}
+                ) as response:
+                    if self.limiter is not None:
+                        self.limiter.observe(
+                            response.status,
+                            perf_counter() - start,
+                            response.headers.get("Retry-After"),
+                        )
+                    logger.debug(
+                        f"Got response [{response.status}] for URL: {url}, ({response.content=})"
+                    )
+                    wss.publish(f"Memrise API request: {method} {url}: {response}", is_mute=True)
+                    if not (can_retry and self.retry.is_retryable(response.status)):
+                        response.raise_for_status()
+                        text = (
+                            ""
+                            if response.status == HTTPStatus.NOT_MODIFIED
+                            else await response.text()
+                        )
+                        if self.cassette is not None:
+                            self.cassette.record(
+                                method, url, response.status, response.headers, text
+                            )
+                        return Reply(response.status, text, response.headers)
+
+                    reason = f"status {response.status}"
+                    delay = self.retry.delay(attempt, response.headers.get("Retry-After"))
+            except RETRY_ERRORS as error:
+                if self.limiter is not None:
+                    self.limiter.observe(None, perf_counter() - start)
+                if not can_retry:
+                    raise
+                reason = repr(error)
+                delay = self.retry.delay(attempt)
+
+            logger.warning(
+                f"Memrise API request: {method} {url}: {reason}, "
+                f"повтор {attempt} через {delay:.2f} с"
+            )
+            await asyncio.sleep(delay)
+
+    def is_retried(self, error: BaseException) -> bool:
+        """Ошибка, которую `request` уже повторял `retry.retries` раз"""
+        if not self.retry.retries:
+            return False
+
+        if isinstance(error, ClientResponseError):
+            return self.retry.is_retryable(error.status)
+        return isinstance(error, RETRY_ERRORS)
+
+    async def fetch_page(
+        self, session: ClientSession, url: str, validator: Optional[Validator] = None
+    ) -> Page:
+        """GET запрос страницы, с валидатором `validator` запрос условный.
+
+        По ответу 304 страница отдается без текста, с разобранным уровнем валидатора.
+        """
+        headers = validator.conditional_headers() if validator is not None else {}
+        reply = await self.request(session, GET, url, headers)
+        if reply.status == HTTPStatus.NOT_MODIFIED and validator is not None:
+            if self.cache is not None:
+                entry = self.cache.get(url)
+                if entry is not None and entry.digest == validator.digest:
+                    self.cache.touch(entry)
+            return Page(
+                url, "", not_modified=True, digest=validator.digest, level=validator.level
+            )
+
+        digest = content_key(reply.text.encode())
+        if self.cache is not None:
+            self.cache.put(url, reply.text)
+        if self.validators is not None:
+            self.validators.put(
+                url,
+                digest,
+                etag=reply.headers.get("ETag"),
+                last_modified=reply.headers.get("Last-Modified"),
+            )
+
+        not_modified = validator is not None and validator.digest == digest
+        return Page(
+            url,
+            reply.text,
+            not_modified=not_modified,
+            digest=digest,
+            level=validator.level if not_modified else None,
+        )
 
     async def get_level(self, endpoint: URL) -> str:
         """ Асинхронное получение конкретного уровня из Memrise """
-        # TODO: Пересмотреть логику работы с ассинхронными запросами
-        async with ClientSession(cookies=self.cookies, headers=self.headers) as session:
-            return await self.fetch(session, GET, endpoint)
+        page = await self.get_level_page(endpoint, conditional=False)
+        return page.text
+
+    async def get_level_page(self, endpoint: URL, conditional: bool = True) -> Page:
+        """Страница уровня с признаком `not_modified`.
+
+        Свежая запись кеша отдается без запроса. Если уровень уже разобран, запрос условный,
+        и по ответу 304 или той же странице уровень берется из `Page.level` без парсинга.
+
+        :param conditional: условный запрос, с ним по ответу 304 у страницы нет текста
+        """
+        url = urljoin(settings.MEMRISE_HOST, endpoint)
+        validator = self.validators.get(url) if self.validators is not None else None
+        if validator is not None and (not conditional or validator.level is None):
+            # По ответу 304 отдать нечего.
+            validator = None
+
+        entry = self.cache.get(url) if self.cache is not None else None
+        if entry is not None and self.cache.is_fresh(entry):
+            cached = self.cache.read(entry)
+            if cached is not None:
+                level = (
+                    validator.level
+                    if validator is not None and validator.digest == entry.digest
+                    else None
+                )
+                return Page(url, cached, not_modified=True, digest=entry.digest, level=level)
+
+        if self._session is None:
+            # Одиночный запрос вне обхода, открываем сессию только на него.
+            async with self.crawl_session() as session:
+                return await self.fetch_page(session, url, validator)
+
+        async with self._semaphore:
+            return await self.fetch_page(self._session, url, validator)
 
 
 async_api = AsyncAPI()
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from time import time
-from typing import ClassVar, Dict
-from urllib.parse import urljoin
+import json
+import threading
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from time import sleep, time
+from typing import ClassVar, Dict, Optional
+from urllib.parse import urlencode, urljoin
 
 import requests
 from django.conf import settings
@@ -11,7 +14,12 @@ from requests.adapters import HTTPAdapter
 from urllib3 import Retry
 
 from memrise import logger
+from memrise.core.modules.api.cassette import Cassette, default_cassette
 from memrise.core.modules.api.errors import APIError
+from memrise.core.modules.api.html_cache import HTMLCache, Page, content_key, default_html_cache
+from memrise.core.modules.api.page_validators import PageValidators, default_page_validators
+from memrise.core.modules.api.rate_limiter import RateLimiter, shared_rate_limiter
+from memrise.core.modules.api.retry import RetryPolicy
 from memrise.core.modules.web_socket_client import wss
 from memrise.shares.contants import DASHBOARD_URL
 from memrise.shares.types import URL
@@ -22,35 +30,109 @@ GET, POST = "GET", "POST"
 @dataclass
 class API:
     timeout: int = 90
-    retries: ClassVar[Retry] = Retry(total=5, connect=3, read=2, backoff_factor=0.1)
+    # Кеш страниц уровней на диске, None - страницы всегда стягиваются из memrise.
+    cache: Optional[HTMLCache] = field(default_factory=default_html_cache)
+    # ETag и Last-Modified для условных запросов, None - запросы безусловные.
+    validators: Optional[PageValidators] = field(default_factory=default_page_validators)
+    # Общее с `AsyncAPI` ограничение скорости запросов, None - без ограничения.
+    limiter: Optional[RateLimiter] = field(default_factory=shared_rate_limiter)
+    # Кассета для записи ответов, None - ответы не записываются.
+    cassette: Optional[Cassette] = field(default_factory=default_cassette)
+    # Ответы 429 и 5xx повторяются в `request`, чтобы каждая попытка проходила через `limiter`.
+    retry: RetryPolicy = field(default_factory=RetryPolicy)
+    # Обрывы соединения повторяет urllib3.
+    retries: ClassVar[Retry] = Retry(
+        total=5, connect=3, read=2, backoff_factor=settings.MEMRISE_RETRY_BACKOFF
+    )
 
     def __post_init__(self) -> None:
-        self._session = requests.Session()
-        self._session.mount("http://", HTTPAdapter(max_retries=self.retries))
-        self._session.mount("https://", HTTPAdapter(max_retries=self.retries))
+        self._local = threading.local()
+
+    @property
+    def _session(self) -> requests.Session:
+        """Сессия текущего потока.
+
+        requests.Session не потокобезопасна, а страницы dashboard запрашиваются из пула потоков
+        (см. `MemriseRep.dashboard_prefetch`), поэтому у каждого потока своя сессия и свой пул
+        соединений.
+        """
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+            session.mount("http://", HTTPAdapter(max_retries=self.retries))
+            session.mount("https://", HTTPAdapter(max_retries=self.retries))
+        return session
 
     def request(
-        self, method: str, endpoint: URL, params: Dict = None, data: Dict = None
+        self,
+        method: str,
+        endpoint: URL,
+        params: Dict = None,
+        data: Dict = None,
+        headers: Dict = None,
     ) -> requests.Response:
         url = urljoin(settings.MEMRISE_HOST, endpoint)
-        start = time()
-
         headers = {
             "Content-Type": "application/json",
             "User-Agent": settings.USER_AGENT,
             "charset": "utf-8",
+            **(headers or {}),
         }
 
-        response = self._session.request(
-            method,
-            url,
-            params=params,
-            data=data,
-            headers=headers,
-            timeout=self.timeout,
-            cookies=settings.MEMRISE_COOKIES,
-        )
+        attempt = 0
+        while True:
+            attempt += 1
+            response = self._send(method, url, params, data, headers)
+            if attempt > self.retry.retries or not self.retry.is_retryable(response.status_code):
+                break
+
+            delay = self.retry.delay(attempt, response.headers.get("Retry-After"))
+            logger.warning(
+                f"Memrise API request: {method} {url}: status {response.status_code}, "
+                f"повтор {attempt} через {delay:.2f} с"
+            )
+            sleep(delay)
+
+        if self.cassette is not None:
+            self.cassette.record(
+                method, response.url, response.status_code, response.headers, response.text
+            )
+
+        if response.status_code not in (200, 304, 400):
+            raise APIError(
+                "Unexpected status",
+                {"message": response.content, "error_code": response.status_code},
+            )
+
+        return response
+
+    def _send(
+        self, method: str, url: str, params: Dict, data: Dict, headers: Dict
+    ) -> requests.Response:
+        """Одна попытка запроса: ждет токен ограничителя `limiter` и сообщает ему ответ"""
+        if self.limiter is not None:
+            self.limiter.acquire()
+        start = time()
+        try:
+            response = self._session.request(
+                method,
+                url,
+                params=params,
+                data=data,
+                headers=headers,
+                timeout=self.timeout,
+                cookies=settings.MEMRISE_COOKIES,
+            )
+        except requests.RequestException:
+            if self.limiter is not None:
+                self.limiter.observe(None, time() - start)
+            raise
+
         duration = time() - start
+        if self.limiter is not None:
+            self.limiter.observe(
+                response.status_code, duration, response.headers.get("Retry-After")
+            )
 
         logger.debug(
             f"({duration:.3f}) Memrise API request: {method} {url} ({params=},{data=}):{response}",
@@ -58,29 +140,81 @@ class API:
                 "method": method,
                 "url": url,
                 "duration": duration,
+                "rate": self.limiter.rate if self.limiter is not None else None,
                 "request": {"params": params, "data": data},
                 "response": response,
             },
         )
         wss.publish(f"Memrise API request: {method} {url}: {response}",)
+        return response
 
-        if response.status_code not in (200, 400):
-            raise APIError(
-                "Unexpected status",
-                {"message": response.content, "error_code": response.status_code},
-            )
+    def get_page(
+        self, endpoint: URL, params: Dict = None, use_fresh: bool = True
+    ) -> Page:
+        """GET запрос через кеш страниц.
 
-        return response
+        По ответу 304 отдается страница из кеша, поэтому запрос условный, только если в кеше
+        лежит та же страница, что описывает валидатор.
+
+        :param use_fresh: свежая запись кеша отдается без запроса
+        """
+        url = urljoin(settings.MEMRISE_HOST, endpoint)
+        if params:
+            url = f"{url}?{urlencode(params)}"
+
+        entry = self.cache.get(url) if self.cache is not None else None
+        if entry is not None and use_fresh and self.cache.is_fresh(entry):
+            cached = self.cache.read(entry)
+            if cached is not None:
+                return Page(url, cached, not_modified=True, digest=entry.digest)
+
+        validator = self.validators.get(url) if self.validators is not None else None
+        headers = None
+        if validator is not None and entry is not None and entry.digest == validator.digest:
+            headers = validator.conditional_headers()
+
+        response = self.request(GET, endpoint, params=params, headers=headers)
+        if response.status_code == HTTPStatus.NOT_MODIFIED and headers is not None:
+            cached = self.cache.read(entry)
+            if cached is not None:
+                self.cache.touch(entry)
+                return Page(url, cached, not_modified=True, digest=entry.digest)
+
+            # Объект вытеснен из кеша между проверкой и ответом, страница стягивается целиком.
+            response = self.request(GET, endpoint, params=params)
+
+        if response.status_code != HTTPStatus.OK:
+            return Page(url, response.text)
+
+        digest = content_key(response.text.encode())
+        if self.cache is not None:
+            self.cache.put(url, response.text)
+        if self.validators is not None:
+            self.validators.put(
+                url,
+                digest,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            )
+        return Page(
+            url,
+            response.text,
+            not_modified=validator is not None and validator.digest == digest,
+            digest=digest,
+        )
 
     def load_dashboard_courses(self, params: Dict) -> Dict:
         """ Получение курсов из Memrise.Dashboard """
-        response = self.request(GET, DASHBOARD_URL, params=params)
-        return response.json()
+        if self.cache is None:
+            return self.request(GET, DASHBOARD_URL, params=params).json()
+
+        # Dashboard всегда проверяется запросом, он определяет, какие курсы изменились.
+        page = self.get_page(DASHBOARD_URL, params=params, use_fresh=False)
+        return json.loads(page.text)
 
     def get_level(self, endpoint: URL) -> str:
         """ Получение конкретного уровня из учебого курса Memrise """
-        result = self.request(GET, endpoint)
-        return result.text
+        return self.get_page(endpoint).text
 
 
 api = API()
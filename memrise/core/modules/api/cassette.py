@@ -0,0 +1,92 @@
+"""
+Запись ответов memrise в кассету
+================================
+
+С MEMRISE_CASSETTE каждый ответ `API` и `AsyncAPI` дописывается в файл строкой JSON: метод, путь
+с параметрами запроса, статус, заголовки кеширования и тело ответа. Путь пишется без хоста, поэтому
+кассету можно проиграть подставным сервером (`memrise.benchmarks.standin`) на любом адресе и гонять
+полное обновление без memrise. Заголовки запроса, в том числе cookies сессии, не записываются.
+
+HOW TO USE IT:
+    MEMRISE_CASSETTE=resources/cassette.jsonl python manage.py runserver
+    recordings = Cassette(path=Path("resources/cassette.jsonl")).load()
+"""
+from __future__ import annotations
+
+import json
+import threading
+from dataclasses import asdict, dataclass, field
+from http import HTTPStatus
+from pathlib import Path
+from typing import Dict, Mapping, Optional, Tuple
+from urllib.parse import urlsplit
+
+from django.conf import settings
+
+ENCODING = "utf-8"
+# Заголовки ответа, которые попадают в кассету.
+RECORDED_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+def request_key(method: str, url: str) -> Tuple[str, str]:
+    """Ключ записи: метод и путь с параметрами запроса без хоста"""
+    parts = urlsplit(url)
+    path = f"{parts.path}?{parts.query}" if parts.query else parts.path
+    return method.upper(), path
+
+
+@dataclass
+class Recording:
+    method: str
+    path: str
+    status: int
+    body: str
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class Cassette:
+    path: Path
+    _lock: threading.Lock = field(init=False, default_factory=threading.Lock)
+
+    def record(
+        self, method: str, url: str, status: int, headers: Mapping[str, str], body: str
+    ) -> None:
+        """Дозапись ответа, запись из нескольких потоков не перемешивает строки"""
+        method, path = request_key(method, url)
+        recording = Recording(
+            method=method,
+            path=path,
+            status=status,
+            body=body,
+            headers={name: headers[name] for name in RECORDED_HEADERS if name in headers},
+        )
+        line = f"{json.dumps(asdict(recording), ensure_ascii=False)}\n"
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding=ENCODING) as f:
+                f.write(line)
+
+    def load(self) -> Dict[Tuple[str, str], Recording]:
+        """Записи по методу и пути, из повторных ответов на один запрос берется последний.
+
+        Ответ 304 на условный запрос не заменяет записанную ранее страницу.
+        """
+        recordings: Dict[Tuple[str, str], Recording] = {}
+        with self.path.open(encoding=ENCODING) as f:
+            for line in f:
+                recording = Recording(**json.loads(line))
+                key = (recording.method, recording.path)
+                if recording.status == HTTPStatus.NOT_MODIFIED and key in recordings:
+                    continue
+                recordings[key] = recording
+
+        return recordings
+
+
+def default_cassette() -> Optional[Cassette]:
+    """Кассета из настроек, None если запись выключена"""
+    if not settings.MEMRISE_CASSETTE:
+        return None
+
+    return Cassette(path=Path(settings.MEMRISE_CASSETTE))
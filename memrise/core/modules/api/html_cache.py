@@ -0,0 +1,222 @@
+"""
+Кеш HTML страниц уровней на диске
+=================================
+
+Повторный запуск обновления после сбоя не должен заново стягивать все уровни из memrise. Ответы
+хранятся на диске сжатыми gzip и адресуются содержимым: объект `objects/<digest>.gz` - страница,
+запись `entries/<ключ url>.json` - ссылка url на объект и время загрузки. Одинаковые страницы разных
+url хранятся одним объектом.
+
+Запись моложе `ttl` секунд отдается без запроса к memrise. ETag, Last-Modified и разобранные уровни
+хранятся отдельно от кеша, в `page_validators`: условные запросы работают и с выключенным кешем.
+
+Когда объекты занимают больше `max_size` байт, удаляются давно не читанные (время чтения - mtime
+объекта), пока кеш не станет меньше `LOW_WATER` от `max_size`. Запас до `max_size` копится многими
+записями, поэтому объекты просматриваются и сортируются не на каждой записи, а только при переходе
+через предел. Вместе с объектом удаляются ссылающиеся на него записи. Запись, объект которой удален,
+считается промахом.
+
+Кеш общий для потоков (страницы dashboard запрашиваются из пула потоков), поэтому запись объекта,
+учет размера и вытеснение идут под блокировкой.
+
+Сохраненные страницы позволяют гонять парсеры на реальных уровнях без сети, см. `HTMLCache.pages`.
+
+HOW TO USE IT:
+    MEMRISE_HTML_CACHE=1 python manage.py runserver
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from time import time
+from typing import Iterator, Optional, Set, Tuple
+
+from django.conf import settings
+
+from memrise import logger
+from memrise.core.responses.structs import LevelStruct
+
+ENCODING = "utf-8"
+# Доля `max_size`, до которой вытесняются объекты.
+LOW_WATER = 0.9
+
+
+def content_key(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """Запись файла через временный файл: прерванная запись не оставляет битый файл"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with NamedTemporaryFile(dir=path.parent, delete=False) as tmp:
+        tmp.write(data)
+    os.replace(tmp.name, path)
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    digest: str
+    stored_at: float
+
+
+@dataclass
+class Page:
+    url: str
+    text: str
+    # Содержимое не изменилось с прошлого запроса: свежая запись кеша, ответ 304 или тот же дайджест.
+    not_modified: bool = False
+    digest: Optional[str] = None
+    # Разобранный уровень неизмененной страницы из `page_validators`, по нему уровень не парсится.
+    level: Optional[LevelStruct] = None
+
+
+@dataclass
+class HTMLCache:
+    root: Path
+    # Время жизни записи в секундах, 0 - записи отдаются без срока.
+    ttl: int = 0
+    # Предельный размер сжатых объектов в байтах, 0 - без ограничения.
+    max_size: int = 0
+    compress_level: int = 6
+    _size: Optional[int] = field(init=False, default=None)
+    _lock: threading.Lock = field(init=False, default_factory=threading.Lock)
+
+    def entry_path(self, url: str) -> Path:
+        return self.root / "entries" / f"{content_key(url.encode())}.json"
+
+    def object_path(self, digest: str) -> Path:
+        return self.root / "objects" / digest[:2] / f"{digest}.gz"
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """Запись url без проверки срока жизни"""
+        path = self.entry_path(url)
+        try:
+            entry = CacheEntry(**json.loads(path.read_text()))
+        except FileNotFoundError:
+            return None
+        except (ValueError, TypeError):
+            logger.warning(f"Битая запись кеша {path}, удаляется")
+            path.unlink(missing_ok=True)
+            return None
+
+        if not self.object_path(entry.digest).exists():
+            path.unlink(missing_ok=True)
+            return None
+
+        return entry
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        return not self.ttl or time() - entry.stored_at < self.ttl
+
+    def read(self, entry: CacheEntry) -> Optional[str]:
+        """Содержимое записи, чтение продлевает жизнь объекта при вытеснении"""
+        path = self.object_path(entry.digest)
+        try:
+            data = gzip.decompress(path.read_bytes())
+            os.utime(path)
+        except (FileNotFoundError, OSError, EOFError):
+            return None
+
+        return data.decode(ENCODING)
+
+    def lookup(self, url: str) -> Optional[str]:
+        """Страница url, если запись есть и не устарела"""
+        entry = self.get(url)
+        if entry is None or not self.is_fresh(entry):
+            return None
+
+        return self.read(entry)
+
+    def put(self, url: str, html: str) -> CacheEntry:
+        """Сохранение страницы url, объект пишется только если такой страницы еще нет"""
+        data = html.encode(ENCODING)
+        digest = content_key(data)
+        path = self.object_path(digest)
+        with self._lock:
+            if path.exists():
+                os.utime(path)
+            else:
+                compressed = gzip.compress(data, compresslevel=self.compress_level)
+                write_atomic(path, compressed)
+                if self._size is not None:
+                    self._size += len(compressed)
+
+        entry = CacheEntry(url=url, digest=digest, stored_at=time())
+        write_atomic(self.entry_path(url), json.dumps(asdict(entry)).encode())
+        self.evict()
+        return entry
+
+    def touch(self, entry: CacheEntry) -> CacheEntry:
+        """Продление жизни записи, страница которой не изменилась (ответ 304)"""
+        entry.stored_at = time()
+        write_atomic(self.entry_path(entry.url), json.dumps(asdict(entry)).encode())
+        return entry
+
+    def evict(self) -> None:
+        """Удаление давно не читанных объектов, если кеш больше `max_size`"""
+        if not self.max_size:
+            return
+
+        evicted = set()
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._objects())
+            if self._size <= self.max_size:
+                return
+
+            low_water = self.max_size * LOW_WATER
+            for path, size, _ in sorted(self._objects(), key=lambda item: item[2]):
+                if self._size <= low_water:
+                    break
+                path.unlink(missing_ok=True)
+                self._size -= size
+                evicted.add(path.name[: -len(".gz")])
+
+            self._prune_entries(evicted)
+
+    def pages(self) -> Iterator[Tuple[str, str]]:
+        """Все сохраненные страницы: url и HTML"""
+        for path in sorted((self.root / "entries").glob("*.json")):
+            try:
+                entry = CacheEntry(**json.loads(path.read_text()))
+            except (FileNotFoundError, ValueError, TypeError):
+                continue
+            if (html := self.read(entry)) is not None:
+                yield entry.url, html
+
+    def _objects(self) -> Iterator[Tuple[Path, int, float]]:
+        for path in (self.root / "objects").glob("*/*.gz"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            yield path, stat.st_size, stat.st_mtime
+
+    def _prune_entries(self, digests: Set[str]) -> None:
+        """Удаление записей, объекты которых вытеснены"""
+        for path in (self.root / "entries").glob("*.json"):
+            try:
+                digest = json.loads(path.read_text())["digest"]
+            except (FileNotFoundError, ValueError, TypeError, KeyError):
+                continue
+            if digest in digests:
+                path.unlink(missing_ok=True)
+
+
+def default_html_cache() -> Optional[HTMLCache]:
+    """Кеш из настроек, None если кеш выключен"""
+    if not settings.MEMRISE_HTML_CACHE:
+        return None
+
+    return HTMLCache(
+        root=settings.MEMRISE_HTML_CACHE_DIR,
+        ttl=settings.MEMRISE_HTML_CACHE_TTL * 3600,
+        max_size=settings.MEMRISE_HTML_CACHE_MAX_SIZE * 1024 * 1024,
+    )
@@ -0,0 +1,111 @@
+"""
+Валидаторы страниц
+==================
+
+Условный запрос (If-None-Match, If-Modified-Since) экономит сеть и парсинг, только если по ответу
+304 есть что отдать. Для обхода уровней это не HTML страницы, а уже разобранный уровень. Поэтому
+на каждый url хранится небольшая запись `<ключ url>.json`: ETag, Last-Modified, дайджест содержимого
+страницы и, для страниц уровней, разобранный уровень в компактной структуре `LevelStruct`.
+
+Записи не зависят от кеша HTML страниц (`html_cache`), который по умолчанию выключен, поэтому
+неизмененные уровни не стягиваются целиком и не парсятся заново и без него. Запись на url одна
+и перезаписывается, размер каталога ограничен количеством уровней.
+
+HOW TO USE IT:
+    validators = PageValidators(root=Path("page_validators"))
+    validator = validators.get(url)
+    headers = validator.conditional_headers()
+    validators.put(url, digest, etag=response.headers.get("ETag"))
+    validators.put_level(url, digest, level_struct)
+"""
+from __future__ import annotations
+
+import json
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+from django.conf import settings
+
+from memrise import logger
+from memrise.core.modules.api.html_cache import ENCODING, content_key, write_atomic
+from memrise.core.responses.structs import LevelStruct
+
+
+@dataclass
+class Validator:
+    url: str
+    # Дайджест содержимого страницы, см. `html_cache.content_key`.
+    digest: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    # Разобранный уровень страницы, None - страница не уровень или еще не разобрана.
+    level: Optional[LevelStruct] = None
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Заголовки условного запроса, сервер ответит 304 если страница не изменилась"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+@dataclass
+class PageValidators:
+    root: Path
+
+    def path(self, url: str) -> Path:
+        return self.root / f"{content_key(url.encode())}.json"
+
+    def get(self, url: str) -> Optional[Validator]:
+        path = self.path(url)
+        try:
+            validator = Validator(**json.loads(path.read_text(encoding=ENCODING)))
+            if validator.level is not None:
+                validator.level = LevelStruct(*validator.level)
+        except FileNotFoundError:
+            return None
+        except (ValueError, TypeError):
+            logger.warning(f"Битый валидатор страницы {path}, удаляется")
+            path.unlink(missing_ok=True)
+            return None
+
+        return validator
+
+    def put(
+        self,
+        url: str,
+        digest: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> Validator:
+        """Валидаторы полученной страницы, разобранный уровень остается, если страница та же"""
+        previous = self.get(url)
+        level = previous.level if previous is not None and previous.digest == digest else None
+        validator = Validator(url, digest, etag, last_modified, level)
+        self._write(validator)
+        return validator
+
+    def put_level(self, url: str, digest: str, level: LevelStruct) -> None:
+        """Сохранение разобранного уровня страницы `digest`"""
+        validator = self.get(url)
+        if validator is None or validator.digest != digest:
+            # Страница изменилась, пока уровень разбирался.
+            return
+
+        validator.level = level
+        self._write(validator)
+
+    def _write(self, validator: Validator) -> None:
+        data = json.dumps(asdict(validator), ensure_ascii=False).encode(ENCODING)
+        write_atomic(self.path(validator.url), data)
+
+
+def default_page_validators() -> Optional[PageValidators]:
+    """Валидаторы из настроек, None если условные запросы выключены"""
+    if not settings.MEMRISE_CONDITIONAL_REQUESTS:
+        return None
+
+    return PageValidators(root=settings.MEMRISE_PAGE_VALIDATORS_DIR)
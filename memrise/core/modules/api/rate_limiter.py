@@ -0,0 +1,163 @@
+"""
+Адаптивное ограничение скорости запросов к memrise
+==================================================
+
+Все запросы `API` и `AsyncAPI` проходят через общее ведро токенов: ведро пополняется со скоростью
+`rate` запросов в секунду и вмещает не больше `burst` токенов, запрос без токена ждет своей очереди.
+
+Скорость подстраивается по ответам в стиле AIMD. Каждый быстрый успешный ответ прибавляет
+`increase / rate`, то есть при ровном потоке скорость растет примерно на `increase` запросов
+в секунду за секунду. Ответ 429 или 5xx, обрыв соединения или ответ дольше `target_latency` секунд
+умножают скорость на `decrease`, но не чаще раза в `cooldown` секунд: ответы запросов, отправленных
+до снижения, не должны снижать скорость повторно. Retry-After из ответа 429 приостанавливает
+все запросы на указанное время.
+
+Текущая скорость, сглаженная задержка ответов и количество снижений доступны в `stats`.
+
+HOW TO USE IT:
+    limiter = RateLimiter(rate=20, max_rate=100)
+    await limiter.acquire_async()
+    limiter.observe(response.status, latency)
+    limiter.stats()
+
+Ограничитель `shared_rate_limiter` общий на процесс: его скорость и статистика переживают обновления
+и тесты, `reset` возвращает его к начальному состоянию.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from time import monotonic, sleep
+from typing import Optional
+
+from django.conf import settings
+
+from memrise import logger
+from memrise.core.modules.api.retry import parse_retry_after
+
+# Вес последнего ответа в сглаженной задержке.
+LATENCY_SMOOTHING = 0.2
+
+
+@dataclass
+class RateStats:
+    rate: float
+    latency: float
+    requests: int
+    throttled: int
+
+
+@dataclass
+class RateLimiter:
+    # Начальная скорость, запросов в секунду.
+    rate: float = settings.MEMRISE_RATE_LIMIT
+    min_rate: float = settings.MEMRISE_RATE_LIMIT_MIN
+    max_rate: float = settings.MEMRISE_RATE_LIMIT_MAX
+    # Сколько запросов можно отправить разом после простоя.
+    burst: int = settings.MEMRISE_CONCURRENCY
+    # Задержка ответа в секундах, дольше которой memrise считается перегруженным.
+    target_latency: float = settings.MEMRISE_RATE_LIMIT_LATENCY
+    increase: float = 1.0
+    decrease: float = 0.5
+    cooldown: float = 1.0
+    _initial_rate: float = field(init=False)
+    _tokens: float = field(init=False)
+    _updated: float = field(init=False)
+    _paused_until: float = field(init=False, default=0.0)
+    _decreased_at: float = field(init=False, default=float("-inf"))
+    _latency: float = field(init=False, default=0.0)
+    _requests: int = field(init=False, default=0)
+    _throttled: int = field(init=False, default=0)
+    _lock: threading.Lock = field(init=False, default_factory=threading.Lock)
+
+    def __post_init__(self) -> None:
+        self._initial_rate = self.rate
+        self._tokens = float(self.burst)
+        self._updated = monotonic()
+
+    def reset(self) -> None:
+        """Возврат к начальной скорости с пустой статистикой, например между тестами"""
+        with self._lock:
+            self.rate = self._initial_rate
+            self._tokens = float(self.burst)
+            self._updated = monotonic()
+            self._paused_until = 0.0
+            self._decreased_at = float("-inf")
+            self._latency = 0.0
+            self._requests = 0
+            self._throttled = 0
+
+    def reserve(self) -> float:
+        """Забрать токен, результат - сколько секунд ждать до отправки запроса"""
+        with self._lock:
+            now = monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._paused_until - now)
+
+    def acquire(self) -> None:
+        if (wait := self.reserve()) > 0:
+            sleep(wait)
+
+    async def acquire_async(self) -> None:
+        if (wait := self.reserve()) > 0:
+            await asyncio.sleep(wait)
+
+    def observe(
+        self, status: Optional[int], latency: float, retry_after: Optional[str] = None
+    ) -> None:
+        """Учет ответа: `status` None - запрос оборвался без ответа"""
+        with self._lock:
+            now = monotonic()
+            self._requests += 1
+            self._latency += LATENCY_SMOOTHING * (latency - self._latency)
+            throttled = (
+                status is None
+                or status == HTTPStatus.TOO_MANY_REQUESTS
+                or status >= HTTPStatus.INTERNAL_SERVER_ERROR
+            )
+            if status == HTTPStatus.TOO_MANY_REQUESTS:
+                if (seconds := parse_retry_after(retry_after)) is not None:
+                    self._paused_until = max(self._paused_until, now + seconds)
+
+            if not throttled and latency <= self.target_latency:
+                self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+                return
+
+            if now - self._decreased_at < self.cooldown:
+                return
+
+            self._decreased_at = now
+            self._throttled += 1
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+
+        logger.info(
+            f"Memrise не справляется (status={status}, {latency=:.2f} с), "
+            f"скорость запросов снижена до {self.rate:.1f}/с"
+        )
+
+    def stats(self) -> RateStats:
+        return RateStats(
+            rate=round(self.rate, 2),
+            latency=round(self._latency, 3),
+            requests=self._requests,
+            throttled=self._throttled,
+        )
+
+
+_shared: Optional[RateLimiter] = None
+
+
+def shared_rate_limiter() -> Optional[RateLimiter]:
+    """Общий ограничитель `API` и `AsyncAPI`, None если ограничение выключено"""
+    global _shared
+    if not settings.MEMRISE_RATE_LIMIT:
+        return None
+
+    if _shared is None:
+        _shared = RateLimiter()
+    return _shared
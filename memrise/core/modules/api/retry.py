@@ -0,0 +1,77 @@
+"""
+Повторы запросов
+================
+
+Один неудачный ответ memrise (502, обрыв соединения, таймаут) не должен ронять уровень, а с ним
+и курс. Запрос повторяется до `retries` раз с экспоненциальной задержкой
+`backoff * 2 ** (попытка - 1)`, не больше `max_delay` секунд. Задержка выбирается случайно от нуля
+до этого значения (full jitter), чтобы одновременно упавшие запросы обхода не повторялись все
+в одну секунду.
+
+На 429 и 503 memrise может прислать Retry-After - в секундах или HTTP датой. Такая задержка
+соблюдается как есть, без случайной составляющей.
+
+Политика общая для `AsyncAPI` и `API`: синхронные ответы 429 и 5xx тоже повторяются в цикле
+`API.request`, а не внутри urllib3, чтобы каждая попытка проходила через ограничитель скорости.
+
+HOW TO USE IT:
+    policy = RetryPolicy(retries=3, backoff=0.5)
+    if policy.is_retryable(status):
+        await asyncio.sleep(policy.delay(attempt, response.headers.get("Retry-After")))
+"""
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from http import HTTPStatus
+from time import time
+from typing import FrozenSet, Optional
+
+from django.conf import settings
+
+RETRY_STATUSES = frozenset(
+    {
+        HTTPStatus.TOO_MANY_REQUESTS,
+        HTTPStatus.INTERNAL_SERVER_ERROR,
+        HTTPStatus.BAD_GATEWAY,
+        HTTPStatus.SERVICE_UNAVAILABLE,
+        HTTPStatus.GATEWAY_TIMEOUT,
+    }
+)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Задержка из заголовка Retry-After в секундах, None если заголовка нет или он битый"""
+    if not value:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time())
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+@dataclass
+class RetryPolicy:
+    # Количество повторов после первой попытки, 0 - без повторов.
+    retries: int = settings.MEMRISE_REQUEST_RETRIES
+    # Базовая задержка в секундах, удваивается с каждой попыткой.
+    backoff: float = settings.MEMRISE_RETRY_BACKOFF
+    max_delay: float = settings.MEMRISE_RETRY_MAX_DELAY
+    statuses: FrozenSet[int] = RETRY_STATUSES
+
+    def is_retryable(self, status: int) -> bool:
+        return status in self.statuses
+
+    def delay(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """Задержка перед повтором после неудачной попытки `attempt` (начиная с 1)"""
+        if (seconds := parse_retry_after(retry_after)) is not None:
+            return seconds
+
+        return random.uniform(0, min(self.max_delay, self.backoff * 2 ** (attempt - 1)))
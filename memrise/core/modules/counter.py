@@ -1,11 +1,12 @@
 from itertools import count
 from typing import Callable, Dict
 
+from django.conf import settings
 from pydantic.dataclasses import dataclass
 
 from memrise.core.mixins import AsDictMixin
 
-LIMIT = 4
+LIMIT = settings.MEMRISE_DASHBOARD_PAGE_SIZE
 STEP = LIMIT + 1
 START_OFFSET = 0
 
@@ -29,3 +30,9 @@ class MemriseRequestCounter(AsDictMixin):
 
     def reset(self):
         self.offset_counter = counter(STEP)
+
+    def page(self, number: int) -> Dict:
+        """Параметры запроса страницы `number` (с 0), счетчик не сдвигается"""
+        params = self.as_dict(exclude={"offset_counter"})
+        params["offset"] = number * (self.limit + 1)
+        return params
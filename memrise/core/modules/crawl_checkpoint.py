@@ -0,0 +1,151 @@
+"""
+Контрольная точка обхода уровней
+================================
+
+Обход большого аккаунта идет часами, и сбой на середине не должен терять уже стянутые уровни.
+Каждый полученный уровень сразу дописывается в файл строкой JSON: url страницы, отпечаток курса
+на dashboard (`CourseEntity.dashboard_digest`) и разобранный уровень в компактной структуре
+`LevelStruct`. Следующий обход берет уровни из файла и стягивает только оставшиеся. Файл удаляется,
+когда обход прошел без пропущенных уровней.
+
+Контрольная точка принадлежит одному обходу: первая строка файла - заголовок с id обхода и временем
+его начала. Обходы, продолжающие прерванный, дописывают уровни под тем же заголовком. Срок жизни
+`max_age` отсчитывается от начала обхода, а не от последней записи, поэтому обход, который
+раз за разом падает на середине, не продлевает контрольную точку бесконечно. Уровень из контрольной
+точки годится, только если отпечаток его курса совпадает с текущим dashboard
+(см. `CheckpointLevel`).
+
+Файл без заголовка не используется. Строка, запись которой оборвалась при падении процесса,
+пропускается.
+
+HOW TO USE IT:
+    checkpoint = CrawlCheckpoint(path=Path("crawl_checkpoint.jsonl"))
+    done = checkpoint.load()
+    checkpoint.save(url, course.dashboard_digest, level)
+    checkpoint.clear()
+"""
+from __future__ import annotations
+
+import json
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from time import time
+from typing import Dict, NamedTuple, Optional, TextIO, Tuple
+from uuid import uuid4
+
+from django.conf import settings
+
+from memrise import logger
+from memrise.core.domains.entities import LevelEntity
+from memrise.core.modules.parsing.executor import level_to_struct
+from memrise.core.responses.structs import LevelStruct
+
+ENCODING = "utf-8"
+
+
+class CheckpointLevel(NamedTuple):
+    # Отпечаток курса на dashboard в момент, когда уровень был стянут.
+    dashboard_digest: str
+    level: LevelStruct
+
+
+@dataclass
+class CrawlCheckpoint:
+    path: Path
+    # Время жизни контрольной точки в секундах от начала обхода, 0 - без срока.
+    max_age: int = 0
+    # Обход, которому принадлежит файл, пустая строка - обход еще не начат.
+    run_id: str = field(init=False, default="")
+    started_at: float = field(init=False, default=0.0)
+    _lock: threading.Lock = field(init=False, default_factory=threading.Lock)
+
+    def load(self) -> Dict[str, CheckpointLevel]:
+        """Уровни, стянутые прерванным обходом, по url страниц"""
+        self.run_id = ""
+        try:
+            f = self.path.open(encoding=ENCODING)
+        except FileNotFoundError:
+            return {}
+
+        with f:
+            header = self._read_header(f)
+            if header is None:
+                logger.warning(
+                    f"Контрольная точка обхода {self.path} без заголовка, обход идет заново"
+                )
+                self.clear()
+                return {}
+
+            run_id, started_at = header
+            if self.max_age and time() - started_at > self.max_age:
+                logger.info(f"Контрольная точка обхода {self.path} устарела, обход идет заново")
+                self.clear()
+                return {}
+
+            levels = {}
+            broken = False
+            for line in f:
+                try:
+                    url, dashboard_digest, level = json.loads(line)
+                    levels[url] = CheckpointLevel(dashboard_digest, LevelStruct(*level))
+                except (ValueError, TypeError):
+                    broken = True
+
+        self.run_id, self.started_at = run_id, started_at
+        if broken:
+            # Оборванная строка переписывается, иначе следующая запись склеится с ней.
+            self.path.write_text(
+                self._header_line()
+                + "".join(self._line(url, *saved) for url, saved in levels.items()),
+                encoding=ENCODING,
+            )
+
+        if levels:
+            logger.info(
+                f"Обход {run_id} продолжается с контрольной точки: "
+                f"{len(levels)} уровней уже стянуто"
+            )
+        return levels
+
+    def save(self, url: str, dashboard_digest: str, level: LevelEntity) -> None:
+        """Дозапись стянутого уровня, первая запись обхода начинает файл с заголовка"""
+        line = self._line(url, dashboard_digest, level_to_struct(level))
+        with self._lock:
+            if not self.run_id:
+                self.run_id, self.started_at = uuid4().hex, time()
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self.path.write_text(self._header_line(), encoding=ENCODING)
+
+            with self.path.open("a", encoding=ENCODING) as f:
+                f.write(line)
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
+        self.run_id = ""
+
+    def _header_line(self) -> str:
+        return f"{json.dumps({'run_id': self.run_id, 'started_at': self.started_at})}\n"
+
+    @staticmethod
+    def _read_header(f: TextIO) -> Optional[Tuple[str, float]]:
+        try:
+            header = json.loads(f.readline())
+            return str(header["run_id"]), float(header["started_at"])
+        except (ValueError, TypeError, KeyError):
+            return None
+
+    @staticmethod
+    def _line(url: str, dashboard_digest: str, level: LevelStruct) -> str:
+        return f"{json.dumps([url, dashboard_digest, level], ensure_ascii=False)}\n"
+
+
+def default_crawl_checkpoint() -> Optional[CrawlCheckpoint]:
+    """Контрольная точка из настроек, None если контрольные точки выключены"""
+    if not settings.MEMRISE_CRAWL_CHECKPOINT:
+        return None
+
+    return CrawlCheckpoint(
+        path=settings.MEMRISE_CRAWL_CHECKPOINT_PATH,
+        max_age=settings.MEMRISE_CRAWL_CHECKPOINT_TTL * 3600,
+    )
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, TypeVar
+from typing import ClassVar, Iterable, Iterator, Tuple, TypeVar
 
 from memrise.core.modules.factories.entity_makers import DomainEntityT
 
@@ -12,10 +12,13 @@ class Factory(ABC):
     формат и умеет создавать нужный maker с параметрами
     """
 
-    @abstractmethod
-    def matches(self, item: ItemT) -> bool:
-        """Механизм соответствия входящих параметров с конкретным maker"""
+    # Типы элементов, по которым FactoryHandler выбирает фабрику.
+    item_types: ClassVar[Tuple[type, ...]] = ()
+
+    def matches(self, items: Iterable[ItemT]) -> bool:
+        """Механизм соответствия входящих параметров с конкретным maker, проверяются все элементы"""
+        return all(isinstance(item, self.item_types) for item in items)
 
     @abstractmethod
-    def make_product(self, item: ItemT) -> List[DomainEntityT]:
-        """Создание конкретного продукта"""
+    def make_product(self, items: Iterable[ItemT]) -> Iterator[DomainEntityT]:
+        """Создание конкретного продукта, сущности отдаются по мере обхода `items`"""
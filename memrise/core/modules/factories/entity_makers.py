@@ -6,7 +6,7 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from dataclasses import field, dataclass
-from typing import Generator, TypeVar, List, Generic
+from typing import Generic, Iterable, Iterator, List, TypeVar
 from urllib.parse import urljoin
 
 from memrise.core.domains.entities import CourseEntity, LevelEntity, WordEntity
@@ -25,12 +25,17 @@ WordMakerT = TypeVar("WordMakerT", Word, Word)
 class EntityMaker(Generic[DomainEntityT], ABC):
     data: List[DomainEntityT] = field(default_factory=list)
 
-    @abstractmethod
-    def make(self, items: Generator[DomainEntityT, None, None]) -> List[DomainEntityT]:
-        pass
+    def make(self, items: Iterable) -> List[DomainEntityT]:
+        """Создание всех сущностей `items` в `data`"""
+        self.data.extend(self.iterate(items))
+        return self.data
+
+    def iterate(self, items: Iterable) -> Iterator[DomainEntityT]:
+        """Сущности создаются по мере обхода `items`, генераторы и QuerySet не копируются в список"""
+        return map(self._make_entity, items)
 
     @abstractmethod
-    def _append(self, item: DomainEntityT) -> None:
+    def _make_entity(self, item) -> DomainEntityT:
         pass
 
 
@@ -38,77 +43,47 @@ class EntityMaker(Generic[DomainEntityT], ABC):
 class CourseEntityMaker(EntityMaker):
     data: List[CourseEntity] = field(default_factory=list)
 
-    def make(self, items: Generator[CoursesMakerT, None, None]) -> List[CourseEntity]:
-        for item in items:
-            attrs = {
-                "id": item.id,
-                "name": item.name,
-                "url": item.url,
-                "difficult": item.difficult,
-                "num_words": item.num_things,
-                "num_levels": item.num_levels,
-                "difficult_url": urljoin(item.url, DIFFICULT_ITEMS_URL),
-                "is_disable": item.is_disable,
-            }
-            ce = CourseEntity(**attrs)
-            ce.generate_levels_url()
-
-            self._append(ce)
-
-        return self.data
-
-    def _append(self, item: CourseEntity) -> None:
-        self.data.append(item)
+    def _make_entity(self, item: CoursesMakerT) -> CourseEntity:
+        ce = CourseEntity(
+            id=item.id,
+            name=item.name,
+            url=item.url,
+            difficult=item.difficult,
+            num_words=item.num_things,
+            num_levels=item.num_levels,
+            difficult_url=urljoin(item.url, DIFFICULT_ITEMS_URL),
+            is_disable=item.is_disable,
+            dashboard_digest=item.dashboard_digest,
+        )
+        ce.generate_levels_url()
+        return ce
 
 
 @dataclass
 class LevelEntityMaker(EntityMaker):
     data: List[LevelEntity] = field(default_factory=list)
 
-    def make(self, items: Generator[LevelMakerT, None, None]) -> List[LevelEntity]:
-        for item in items:
-            attrs = {
-                "id": item.id,
-                "number": item.number,
-                "course_id": item.course_id,
-                "name": item.name,
-                "words": [],
-            }
-
-            try:
-                # Отработает если пришел LevelStruct.
-                attrs["words"] = item.entity_words
-            except AttributeError:
-                pass
-
-            le = LevelEntity(**attrs)
-            self._append(le)
-
-        return self.data
-
-    def _append(self, item: LevelEntity) -> None:
-        self.data.append(item)
+    def _make_entity(self, item: LevelMakerT) -> LevelEntity:
+        return LevelEntity(
+            id=item.id,
+            number=item.number,
+            course_id=item.course_id,
+            name=item.name,
+            # Слова есть только у моделей уровней, которым их проставили заранее.
+            words=getattr(item, "entity_words", []),
+        )
 
 
 @dataclass
 class WordEntityMaker(EntityMaker):
     data: List[WordEntity] = field(default_factory=list)
 
-    def make(self, items: Generator[WordMakerT, None, None]) -> List[WordEntity]:
-        # TODO: необходимо добавить покрытие тестами, добавление в фабрику новых полей attrs
-        for item in items:
-            attrs = {
-                "id": item.id,
-                "level_id": item.level.id,
-                "word_a": item.word_a,
-                "word_b": item.word_b,
-                "is_learned": item.is_learned,
-            }
-            le = WordEntity(**attrs)
-
-            self._append(le)
-
-        return self.data
-
-    def _append(self, item: WordEntity) -> None:
-        self.data.append(item)
+    def _make_entity(self, item: WordMakerT) -> WordEntity:
+        # `level_id` вместо `level.id`: у модели слова без select_related это запрос уровня.
+        return WordEntity(
+            id=item.id,
+            level_id=item.level_id,
+            word_a=item.word_a,
+            word_b=item.word_b,
+            is_learned=item.is_learned,
+        )
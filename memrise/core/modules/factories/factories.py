@@ -1,11 +1,15 @@
-from typing import List
+from typing import Iterable, Iterator
 
 from memrise.core.domains.entities import CourseEntity, LevelEntity, WordEntity
-from memrise.core.modules.factories.base import Factory, ItemT
+from memrise.core.modules.factories.base import Factory
 from memrise.core.modules.factories.entity_makers import (
     CourseEntityMaker,
+    CoursesMakerT,
     LevelEntityMaker,
-    WordEntityMaker, )
+    LevelMakerT,
+    WordEntityMaker,
+    WordMakerT,
+)
 from memrise.core.modules.factories.factory_registry import FactoryHandler
 from memrise.core.responses.course_response import CourseItemResponse
 from memrise.core.responses.structs import LevelStruct
@@ -16,35 +20,23 @@ factory_mapper = FactoryHandler()
 
 @factory_mapper.register
 class CourseFactory(Factory):
-    def matches(self, item: ItemT) -> bool:
-        if not item:
-            return False
+    item_types = (CourseItemResponse, Course)
 
-        return all(isinstance(x, (CourseItemResponse, Course)) for x in item)
-
-    def make_product(self, item: ItemT) -> List[CourseEntity]:
-        return CourseEntityMaker().make(item)
+    def make_product(self, items: Iterable[CoursesMakerT]) -> Iterator[CourseEntity]:
+        return CourseEntityMaker().iterate(items)
 
 
 @factory_mapper.register
 class LevelFactory(Factory):
-    def matches(self, item: ItemT) -> bool:
-        if not item:
-            return False
-
-        return all(isinstance(x, (LevelStruct, Level)) for x in item)
+    item_types = (LevelStruct, Level)
 
-    def make_product(self, item: ItemT) -> List[LevelEntity]:
-        return LevelEntityMaker().make(item)
+    def make_product(self, items: Iterable[LevelMakerT]) -> Iterator[LevelEntity]:
+        return LevelEntityMaker().iterate(items)
 
 
 @factory_mapper.register
 class WordFactory(Factory):
-    def matches(self, item: ItemT) -> bool:
-        if not item:
-            return False
-
-        return all(isinstance(x, Word) for x in item)
+    item_types = (Word,)
 
-    def make_product(self, item: ItemT) -> List[WordEntity]:
-        return WordEntityMaker().make(item)
+    def make_product(self, items: Iterable[WordMakerT]) -> Iterator[WordEntity]:
+        return WordEntityMaker().iterate(items)
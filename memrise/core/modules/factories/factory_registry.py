@@ -1,6 +1,7 @@
 from abc import ABC
 from dataclasses import dataclass, field
-from typing import List, Set, Type, ClassVar
+from itertools import chain
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Type
 
 from memrise.core.modules.factories.base import Factory, ItemT
 from memrise.core.modules.factories.entity_makers import DomainEntityT
@@ -11,11 +12,16 @@ class FactoryHandler(ABC):
     """
     Агрегирующий класс, позволяющий регистрировать у себя фабрики makers,
     производить поиск фабрик по критериям и создавать конкретный maker
+
+    Фабрика выбирается по типу первого элемента через словарь `item_types` фабрик, входящие данные
+    не просматриваются целиком. В строгом режиме `strict` тип проверяется у каждого элемента
+    по мере создания сущностей.
     """
 
     _factories: List["Factory"] = field(init=False, default_factory=list)
     _registered: Set[str] = field(init=False, default_factory=set)
-    strict: ClassVar[bool] = False
+    _dispatch: Dict[type, Factory] = field(init=False, default_factory=dict)
+    strict: bool = False
 
     def register(self, cls: Type[Factory]) -> Type[Factory]:
         """Регистрация фабрики maker
@@ -28,22 +34,60 @@ class FactoryHandler(ABC):
         if cls.__name__ in self._registered:
             raise ValueError(f"`{cls.__name__}` класс уже зарегистрирован")
 
-        self._factories.append(cls())
+        factory = cls()
+        for item_type in cls.item_types:
+            if item_type in self._dispatch:
+                raise ValueError(
+                    f"Тип `{item_type.__name__}` уже обрабатывает "
+                    f"`{type(self._dispatch[item_type]).__name__}`"
+                )
+            self._dispatch[item_type] = factory
+
+        self._factories.append(factory)
         self._registered.add(cls.__name__)
         return cls
 
-    def seek(self, item: ItemT) -> List[DomainEntityT]:
+    def find(self, item_type: type) -> Optional[Factory]:
+        """Фабрика по типу элемента, подклассы зарегистрированных типов тоже находятся"""
+        for base in item_type.__mro__:
+            if factory := self._dispatch.get(base):
+                if base is not item_type:
+                    self._dispatch[item_type] = factory
+                return factory
+
+        return None
+
+    def seek(self, items: Iterable[ItemT]) -> List[DomainEntityT]:
         """Поиск конкретной фабрики по входящим параметам makers """
-        matches: List[Factory] = [
-            factory for factory in self._factories if factory.matches(item)
-        ]
+        entities = list(self.iterate(items))
+        if not entities:
+            # Для пустых данных фабрика не выбирается, как и раньше это ошибка вызывающего кода.
+            raise ValueError(f"Не найдено ни одиной фабрики по параметрам: `{items}`")
+
+        return entities
+
+    def iterate(self, items: Iterable[ItemT]) -> Iterator[DomainEntityT]:
+        """Как `seek`, но сущности отдаются по мере обхода `items`, пустые данные - пустой обход"""
+        iterator = iter(items)
+        for first in iterator:
+            factory = self.find(type(first))
+            if factory is None:
+                raise ValueError(
+                    f"Не найдено ни одиной фабрики по параметрам: `{type(first).__name__}`"
+                )
 
-        if not matches:
-            raise ValueError(f"Не найдено ни одиной фабрики по параметрам: `{item}`")
+            items = chain((first,), iterator)
+            if self.strict:
+                items = self._checked(factory, items)
+            return factory.make_product(items)
 
-        if self.strict is True:
-            if len(matches) > 1:
-                raise ValueError("Найдено более одной фабрики!!!", matches, item)
+        return iter(())
 
-        product = matches[0]
-        return product.make_product(item)
+    @staticmethod
+    def _checked(factory: Factory, items: Iterable[ItemT]) -> Iterator[ItemT]:
+        for item in items:
+            if not factory.matches((item,)):
+                raise ValueError(
+                    f"`{type(factory).__name__}` не обрабатывает элемент: `{item}`"
+                )
+            yield item
@@ -15,7 +15,7 @@
 
 from abc import ABC, abstractmethod
 from dataclasses import field, dataclass
-from typing import TYPE_CHECKING
+from typing import Dict, Type, TYPE_CHECKING
 
 
 if TYPE_CHECKING:
@@ -29,3 +29,22 @@ class Parser(ABC):
     @abstractmethod
     def parse(self, response: str, level_num: int) -> "LevelEntity":
         """Парсинг слов в учебном курсе"""
+
+
+# Зарегистрированные реализации парсеров, используются для сравнения стратегий парсинга между собой.
+parser_registry: Dict[str, Type[Parser]] = {}
+
+
+def register_parser(cls: Type[Parser]) -> Type[Parser]:
+    """Регистрация реализации парсера
+
+    :param cls: класс парсера
+    """
+    if not issubclass(cls, Parser):
+        raise TypeError("Можно зарегистрировать только подклассы от Parser")
+
+    if cls.__name__ in parser_registry:
+        raise ValueError(f"`{cls.__name__}` класс уже зарегистрирован")
+
+    parser_registry[cls.__name__] = cls
+    return cls
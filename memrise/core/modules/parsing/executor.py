@@ -0,0 +1,88 @@
+"""
+===============================================================================================
+Вынос парсинга уровней в пул процессов
+===============================================================================================
+
+Парсинг lxml синхронный и при большом обходе блокирует event loop, в котором крутятся остальные
+запросы. ParseExecutor позволяет отдать парсинг в ProcessPoolExecutor, тогда каждая страница разбирается
+в отдельном процессе, а обратно передается компактная структура `LevelStruct` из кортежей.
+Для небольших обходов пул не поднимается и парсинг идет прямо в event loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator, Optional, Type
+
+from django.conf import settings
+
+from memrise.core.domains.entities import LevelEntity, WordEntity
+from memrise.core.modules.parsing.base import Parser
+from memrise.core.responses.structs import LevelStruct
+
+
+def parse_level_struct(
+    parser_cls: Type[Parser], response: str, level_number: int
+) -> LevelStruct:
+    """Парсинг страницы уровня в дочернем процессе, слова упаковываются в кортежи"""
+    return level_to_struct(parser_cls().parse(response, level_number))
+
+
+def level_to_struct(level: LevelEntity) -> LevelStruct:
+    """Упаковка уровня в компактную структуру из кортежей"""
+    words = [(word.id, word.word_a, word.word_b, word.is_learned) for word in level.words]
+    return LevelStruct(level.id, level.number, level.course_id, level.name, words)
+
+
+def level_from_struct(struct: LevelStruct) -> LevelEntity:
+    """Сборка LevelEntity из компактной структуры пришедшей из дочернего процесса"""
+    level = LevelEntity(
+        id=struct.id, number=struct.number, course_id=struct.course_id, name=struct.name
+    )
+    level.add_words(
+        [
+            WordEntity(
+                id=word_id,
+                level_id=struct.id,
+                word_a=word_a,
+                word_b=word_b,
+                is_learned=is_learned,
+            )
+            for word_id, word_a, word_b, is_learned in struct.words
+        ]
+    )
+    return level
+
+
+@dataclass
+class ParseExecutor:
+    parser: Parser
+    workers: int = settings.MEMRISE_PARSE_WORKERS
+    threshold: int = settings.MEMRISE_PARSE_POOL_THRESHOLD
+    _pool: Optional[ProcessPoolExecutor] = field(init=False, default=None)
+
+    @contextmanager
+    def pool(self, num_pages: int) -> Iterator["ParseExecutor"]:
+        """Поднятие пула процессов на время обхода, если страниц достаточно много"""
+        if self.workers > 0 and num_pages >= self.threshold:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+
+        try:
+            yield self
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+    async def parse(self, response: str, level_number: int) -> LevelEntity:
+        if self._pool is None:
+            return self.parser.parse(response, level_number)
+
+        loop = asyncio.get_event_loop()
+        struct = await loop.run_in_executor(
+            self._pool, parse_level_struct, type(self.parser), response, level_number
+        )
+        return level_from_struct(struct)
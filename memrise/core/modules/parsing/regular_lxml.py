@@ -16,12 +16,13 @@ from lxml.html import fromstring
 
 from memrise import logger
 from memrise.core.domains.entities import LevelEntity, WordEntity
-from memrise.core.modules.parsing.base import Parser
+from memrise.core.modules.parsing.base import Parser, register_parser
 
 if TYPE_CHECKING:
     from lxml.html import HtmlElement
 
 
+@register_parser
 @dataclass
 class RegularLXML(Parser):
     page: ClassVar[HtmlElement]
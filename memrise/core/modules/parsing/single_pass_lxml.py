@@ -0,0 +1,107 @@
+"""
+===============================================================================================
+Однопроходный парсинг слов учебного курса с помощью lxml
+===============================================================================================
+
+Переписанная версия RegularLXML: документ обходится один раз, заголовок уровня и элементы слов
+отбираются за этот обход, а все XPath выражения скомпилированы заранее на уровне модуля.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Optional, TYPE_CHECKING
+
+from lxml.etree import XPath
+from lxml.html import fromstring
+
+from memrise import logger
+from memrise.core.domains.entities import LevelEntity, WordEntity
+from memrise.core.modules.parsing.base import Parser, register_parser
+
+if TYPE_CHECKING:
+    from lxml.html import HtmlElement
+
+
+def _has_class(class_name: str) -> str:
+    """XPath условие, аналогичное HtmlElement.find_class"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')"
+
+
+LEVEL_HEADER_CLASS = " rebrand reverse-header-ruled level-view "
+LEVEL_TITLE_CLASS = " progress-box-title "
+WORD_CLASS = " thing text-text "
+
+# Дешевый отбор кандидатов по подстроке, точная проверка классов делается в `_split_elements`.
+# descendant-or-self вместо `//*`: на больших страницах `//` сливает множества узлов и растет нелинейно.
+PAGE_ELEMENTS = XPath(
+    "descendant-or-self::*[contains(@class, 'level-view') "
+    "or contains(@class, 'progress-box-title') or contains(@class, 'text-text')]"
+)
+WORD_COLUMNS = XPath(f"descendant::*[{_has_class('col text')}]")
+# smart_strings=False - строки не держат ссылку на дерево документа.
+WORD_TEXT = XPath("div[contains(@class, 'text')]/text()", smart_strings=False)
+LEARN_STATUS = XPath(f"boolean(descendant::*[{_has_class('status')}])")
+
+NOT_AVAILABLE = "N/A"
+
+
+@register_parser
+@dataclass
+class SinglePassLXML(Parser):
+    def parse(self, response: str, level_number: int) -> LevelEntity:
+        headers, titles, word_elements = self._split_elements(fromstring(response))
+        header = self._first(headers)
+        level_id = int(header.attrib["data-level-id"])
+        self.level = LevelEntity(
+            id=level_id,
+            number=level_number,
+            course_id=int(header.attrib["data-course-id"]),
+            name=self._first(titles).text.strip(),
+        )
+        self.level.add_words(
+            [self._make_word(element, level_id) for element in word_elements]
+        )
+
+        return self.level
+
+    def _split_elements(self, page: "HtmlElement") -> List[List["HtmlElement"]]:
+        """Раскладываем элементы страницы на заголовок уровня, название уровня и слова"""
+        groups: List[List["HtmlElement"]] = [[], [], []]
+        for element in PAGE_ELEMENTS(page):
+            group = self._group_index(f" {' '.join(element.attrib['class'].split())} ")
+            if group is not None:
+                groups[group].append(element)
+
+        return groups
+
+    def _group_index(self, classes: str) -> Optional[int]:
+        if WORD_CLASS in classes:
+            return 2
+        if LEVEL_TITLE_CLASS in classes:
+            return 1
+        if LEVEL_HEADER_CLASS in classes:
+            return 0
+        return None
+
+    def _first(self, elements: List["HtmlElement"]) -> "HtmlElement":
+        if len(elements) > 1:
+            logger.warning("Found more than one element")
+
+        return elements[0]
+
+    def _make_word(self, element: "HtmlElement", level_id: int) -> WordEntity:
+        """Вытаскиваем слово `A` в оригинале, `B` перевод и состояние изучения из элемента слова"""
+        chunks = []
+        for column in WORD_COLUMNS(element):
+            texts = WORD_TEXT(column)
+            chunks.append(texts[0] if texts else NOT_AVAILABLE)
+
+        chunks.extend([NOT_AVAILABLE] * (2 - len(chunks)))
+        return WordEntity(
+            id=int(element.attrib["data-thing-id"]),
+            level_id=level_id,
+            word_a=chunks[0],
+            word_b=chunks[1],
+            is_learned=LEARN_STATUS(element),
+        )
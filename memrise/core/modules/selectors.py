@@ -1,28 +1,74 @@
 """
 Модуль импорта и сравнения сущностей с новыми данными и сохранненными
+
+Сущности сравниваются кортежами значений сравниваемых полей `Entity.compared_values`, а не словарями
+полей. Отпечатки `Entity.fingerprint` нужны только сохраняемым дайджестам, см. `Digests`.
 """
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Generic, List, TypeVar, Generator
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, Generic, List, TypeVar, Generator
 
+from django.utils import timezone
 from pydantic import BaseModel, Field
 
 from memrise.core.domains.entities import CourseEntity, LevelEntity, WordEntity
+from memrise.core.domains.word_columns import WordColumns
 
 DomainEntity = TypeVar("DomainEntity", CourseEntity, LevelEntity, WordEntity)
 
 
-class DiffContainer(BaseModel, Generic[DomainEntity]):
-    create: List[DomainEntity] = Field(default_factory=list)
-    update: List[DomainEntity] = Field(default_factory=list)
-    equal: List[DomainEntity] = Field(default_factory=list)
-    delete: List[DomainEntity] = Field(default_factory=list)
+@dataclass
+class DiffContainer(Generic[DomainEntity]):
+    create: List[DomainEntity] = field(default_factory=list)
+    update: List[DomainEntity] = field(default_factory=list)
+    equal: List[DomainEntity] = field(default_factory=list)
+    delete: List[DomainEntity] = field(default_factory=list)
 
     def __iter__(self) -> "Generator":
         yield from self.__dict__.items()
 
 
+class Digests(BaseModel):
+    """Сохраненные дайджесты курсов и уровней, с которыми они были синхронизированы в последний раз"""
+
+    courses: Dict[int, str] = Field(default_factory=dict)
+    levels: Dict[int, str] = Field(default_factory=dict)
+    dashboard: Dict[int, str] = Field(default_factory=dict)
+    crawled_at: Dict[int, datetime] = Field(default_factory=dict)
+
+    def outdated_courses(
+        self, entities: List[CourseEntity], max_age: int
+    ) -> List[CourseEntity]:
+        """Курсы, уровни которых нужно стянуть: изменились метаданные курса на dashboard
+        или уровни не стягивались дольше `max_age` часов, при `max_age=0` все курсы
+        """
+        if not max_age:
+            return list(entities)
+
+        expired = timezone.now() - timedelta(hours=max_age)
+        return [
+            entity
+            for entity in entities
+            if self.dashboard.get(entity.id) != entity.dashboard_digest
+            or self.crawled_at.get(entity.id, expired) <= expired
+        ]
+
+    def changed_courses(self, entities: List[CourseEntity]) -> List[CourseEntity]:
+        """Курсы, дерево уровней и слов которых изменилось"""
+        return [
+            entity for entity in entities if self.courses.get(entity.id) != entity.digest
+        ]
+
+    def changed_levels(self, entities: List[LevelEntity]) -> List[LevelEntity]:
+        """Уровни, слова которых изменились"""
+        return [
+            entity for entity in entities if self.levels.get(entity.id) != entity.digest
+        ]
+
+
 class Selector(ABC, Generic[DomainEntity]):
     @classmethod
     @abstractmethod
@@ -42,17 +88,13 @@ class CourseSelector(Selector):
         exists_actual_items = {
             actual_entity.id: actual_entity for actual_entity in actual_entities
         }
-        # Убираем ключи которые не будут участвовать в сравнении. Эти ключи будут сравниваться в отдельном отборщике.
-        excluded = {"levels", "levels_url"}
-
+        # Сравниваемые поля не включают уровни, они сравниваются в отдельном отборщике.
         for entity in fresh_entities:
             entity_id = entity.id
 
             if entity_id not in exists_actual_items:
                 diff.create.append(entity)
-            elif exists_actual_items[entity_id].dict(exclude=excluded) != entity.dict(
-                exclude=excluded
-            ):
+            elif exists_actual_items[entity_id].compared_values != entity.compared_values:
                 diff.update.append(entity)
                 del exists_actual_items[entity_id]
             else:
@@ -74,17 +116,13 @@ class LevelSelector(Selector):
         exists_actual_items = {
             actual_entity.id: actual_entity for actual_entity in actual_entities
         }
-        # Убираем ключи которые не будут участвовать в сравнении. Эти ключи будут сравниваться в отдельном отборщике.
-        excluded = {"words"}
-
+        # Сравниваемые поля не включают слова, они сравниваются в отдельном отборщике.
         for entity in fresh_entities:
             entity_id = entity.id
 
             if entity_id not in exists_actual_items:
                 diff.create.append(entity)
-            elif exists_actual_items[entity_id].dict(exclude=excluded) != entity.dict(
-                exclude=excluded
-            ):
+            elif exists_actual_items[entity_id].compared_values != entity.compared_values:
                 diff.update.append(entity)
                 del exists_actual_items[entity_id]
             else:
@@ -111,7 +149,7 @@ class WordSelector(Selector):
             entity_id = entity.id
             if entity_id not in exists_actual_items:
                 diff.create.append(entity)
-            elif exists_actual_items[entity_id] != entity:
+            elif exists_actual_items[entity_id].compared_values != entity.compared_values:
                 diff.update.append(entity)
                 del exists_actual_items[entity_id]
             else:
@@ -122,3 +160,31 @@ class WordSelector(Selector):
             diff.delete.append(exists_actual_items[actual_item])
 
         return diff
+
+
+class WordColumnsSelector:
+    """Сравнение слов в колонках `WordColumns`: строки сравниваются кортежами значений без отпечатков,
+    сущности создаются только для попавших в дельту слов.
+
+    Сравнивает только снимки dashboard, например два `Dashboard.get_word_columns`. В обновлении
+    `UpdateManager` слова сравнивает `WordSelector`.
+    """
+
+    @classmethod
+    def match(
+        cls, fresh_columns: WordColumns, actual_columns: WordColumns
+    ) -> DiffContainer[WordEntity]:
+        diff = DiffContainer()
+        exists_actual_rows = dict(zip(actual_columns.ids, actual_columns.rows()))
+
+        for row in fresh_columns.rows():
+            actual_row = exists_actual_rows.pop(row[0], None)
+            if actual_row is None:
+                diff.create.append(WordEntity(*row))
+            elif actual_row != row:
+                diff.update.append(WordEntity(*row))
+            else:
+                diff.equal.append(WordEntity(*row))
+
+        diff.delete.extend(WordEntity(*row) for row in exists_actual_rows.values())
+        return diff
@@ -0,0 +1,93 @@
+"""
+Постоянные id дубликатов слов
+=============================
+
+Одно и то же слово memrise (один id) может встречаться в нескольких уровнях, а в БД id слова уникален.
+Слово остается со своим id в уровне, где оно сохранено первым (при первом появлении - в уровне
+с меньшим id), во всех остальных уровнях ему выдается id из таблицы `WordAlias`, ключ которой
+(id слова, id уровня). Поэтому дубликат получает один и тот же id при каждом обновлении.
+
+HOW TO USE IT:
+    words = resolve_duplicates(fresh_word_entities)
+"""
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Set, Tuple, TYPE_CHECKING
+
+from django.conf import settings
+
+from memrise.core.helpers import chunked
+from memrise.models import Word, WordAlias, alias_word_id
+
+if TYPE_CHECKING:
+    from memrise.core.domains.entities import WordEntity
+
+AliasKey = Tuple[int, int]
+
+
+def word_aliases(keys: Iterable[AliasKey]) -> Dict[AliasKey, int]:
+    """id дубликатов по ключам (id слова, id уровня), недостающие записи WordAlias создаются"""
+    keys = set(keys)
+    aliases = _load_aliases({original_id for original_id, _ in keys})
+    missing = [key for key in keys if key not in aliases]
+    if missing:
+        WordAlias.objects.bulk_create(
+            [
+                WordAlias(original_id=original_id, level_id=level_id)
+                for original_id, level_id in missing
+            ],
+            batch_size=settings.MEMRISE_DB_BATCH_SIZE,
+            ignore_conflicts=True,
+        )
+        # SQLite не возвращает pk после bulk_create, поэтому созданные записи перечитываем.
+        aliases.update(_load_aliases({original_id for original_id, _ in missing}))
+
+    return {key: aliases[key] for key in keys}
+
+
+def resolve_duplicates(words: List[WordEntity]) -> List[WordEntity]:
+    """Замена id дубликатов на постоянные id, слова без дубликатов возвращаются как есть"""
+    word_ids = {word.id for word in words}
+    owners = _load_owners(word_ids)
+    # Слова, которых еще нет в БД, остаются со своим id в уровне с меньшим id.
+    for word in sorted(words, key=lambda item: item.level_id):
+        owners.setdefault(word.id, word.level_id)
+
+    duplicate_keys = {
+        (word.id, word.level_id) for word in words if owners[word.id] != word.level_id
+    }
+    if not duplicate_keys:
+        return words
+
+    aliases = word_aliases(duplicate_keys)
+    resolved = []
+    for word in words:
+        alias_id = aliases.get((word.id, word.level_id))
+        if alias_id is None:
+            resolved.append(word)
+        else:
+            # Новая сущность, а не изменение старой: дайджест уровня считается по id из memrise.
+            resolved.append(word.copy(update={"id": alias_id}))
+
+    return resolved
+
+
+def _load_owners(word_ids: Set[int]) -> Dict[int, int]:
+    """id уровня, в котором слово сохранено со своим id"""
+    owners: Dict[int, int] = {}
+    for chunk in chunked(word_ids, settings.MEMRISE_DB_BATCH_SIZE):
+        owners.update(Word.objects.filter(id__in=chunk).values_list("id", "level_id"))
+
+    return owners
+
+
+def _load_aliases(original_ids: Set[int]) -> Dict[AliasKey, int]:
+    aliases: Dict[AliasKey, int] = {}
+    for chunk in chunked(original_ids, settings.MEMRISE_DB_BATCH_SIZE):
+        alias_records = WordAlias.objects.filter(original_id__in=chunk).values_list(
+            "pk", "original_id", "level_id"
+        )
+        for pk, original_id, level_id in alias_records:
+            aliases[(original_id, level_id)] = alias_word_id(pk)
+
+    return aliases
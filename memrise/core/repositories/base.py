@@ -2,13 +2,13 @@ from __future__ import annotations
 
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Generic, List, TypeVar, TYPE_CHECKING
+from typing import Generic, Iterable, Iterator, List, Set, TypeVar, TYPE_CHECKING
 
 from memrise.core.modules.actions.actions_batch import ActionsBatch
-from memrise.core.modules.selectors import DiffContainer
+from memrise.core.modules.selectors import DiffContainer, Digests
 
 if TYPE_CHECKING:
-    from memrise.core.domains.entities import CourseEntity, LevelEntity
+    from memrise.core.domains.entities import CourseEntity, LevelEntity, WordEntity
 
 RepositoryT = TypeVar("RepositoryT")
 
@@ -25,6 +25,32 @@ class Repository(Generic[RepositoryT], ABC):
     def get_levels(self, courses: List[CourseEntity]) -> List[LevelEntity]:
         """Стягивание уровней курса"""
 
+    def stream_courses(self) -> Iterator[CourseEntity]:
+        """Потоковое получение курсов, курсы отдаются по мере готовности"""
+        yield from self.get_courses()
+
+    def stream_levels(self, courses: Iterable[CourseEntity]) -> Iterator[LevelEntity]:
+        """Потоковое стягивание уровней курса, уровни отдаются по мере готовности"""
+        yield from self.get_levels(list(courses))
+
+    def get_failed_course_ids(self) -> Set[int]:
+        """Курсы, уровни которых последний обход стянул не полностью"""
+        return set()
+
+    def get_digests(self) -> Digests:
+        """Сохраненные дайджесты курсов и уровней, без дайджестов все дерево считается измененным"""
+        return Digests()
+
+    def save_digests(self, courses: List[CourseEntity]) -> None:
+        """Сохранение дайджестов синхронизированных курсов и их уровней"""
+
+    def mark_crawled(self, courses: List[CourseEntity]) -> None:
+        """Сохранение метаданных курсов, уровни которых были стянуты"""
+
+    def resolve_word_ids(self, words: List[WordEntity]) -> List[WordEntity]:
+        """id слов в хранилище, если хранилище не допускает дубликатов id в разных уровнях"""
+        return words
+
     @abstractmethod
     def update_courses(self, diff: DiffContainer) -> None:
         """Сохранение курса в хранилище"""
@@ -7,26 +7,56 @@ from __future__ import annotations
 
 import asyncio
 import json
-from dataclasses import dataclass
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from operator import attrgetter
 from pathlib import Path
-from typing import List, TYPE_CHECKING
-
+from time import perf_counter
+from typing import (
+    AsyncIterator,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    TYPE_CHECKING,
+)
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from memrise import logger
+from memrise.core.helpers import chunked, iterate_async
 from memrise.core.modules.actions.base import Actions
 from memrise.core.modules.api import async_api, api
+from memrise.core.modules.crawl_checkpoint import (
+    CheckpointLevel,
+    CrawlCheckpoint,
+    default_crawl_checkpoint,
+)
 from memrise.core.modules.factories.factories import factory_mapper
-from memrise.core.modules.selectors import DiffContainer
+from memrise.core.modules.parsing.executor import level_from_struct, level_to_struct
+from memrise.core.modules.selectors import DiffContainer, Digests
+from memrise.core.modules.word_ids import resolve_duplicates
+from memrise.core.domains.entities import LevelEntity, WordEntity
 from memrise.core.repositories.base import Repository
 from memrise.core.responses.course_response import CoursesResponse
 from memrise.core.responses.structs import LevelStruct
-from memrise.models import Course, Level
+from memrise.models import Course, Level, Word
 from memrise.shares.contants import DASHBOARD_FIXTURE, LEVELS_FIXTURE
 
 if TYPE_CHECKING:
     from memrise.core.modules.counter import MemriseRequestCounter
     from memrise.core.modules.parsing.base import Parser
+    from memrise.core.modules.parsing.executor import ParseExecutor
     from memrise.shares.types import URL
-    from memrise.core.domains.entities import CourseEntity, WordEntity, LevelEntity
+    from memrise.core.domains.entities import CourseEntity
 
 
 @dataclass
@@ -68,35 +98,85 @@ class JsonRep(Repository):
 class DBRep(Repository):
     """Работа с данными в БД"""
 
+    # Количество сущностей в одной команде действий при применении расхождений.
+    batch_size: int = settings.MEMRISE_DB_BATCH_SIZE
+
     def get_courses(self) -> List[CourseEntity]:
-        course_entities = factory_mapper.seek(Course.objects.all())
+        # Пустая БД при первом обновлении - не ошибка, поэтому обход, а не `seek`.
+        course_entities = factory_mapper.iterate(Course.objects.all())
         return sorted(course_entities, key=attrgetter("id"))
 
     def get_levels(self, courses: List[CourseEntity]) -> List[LevelEntity]:
-        # TODO: пересмотреть логику получения слов и уровней.
-        course_records = (
-            Course.objects.all()
-            .prefetch_related("levels")
-            .prefetch_related("levels__words")
+        """Уровни со словами курсов `courses`.
+
+        Записи читаются кортежами `values_list` и сразу собираются в сущности, без моделей Django.
+        """
+        levels: Dict[int, LevelEntity] = {}
+        for course_ids in chunked([course.id for course in courses], self.batch_size):
+            level_rows = Level.objects.filter(course_id__in=course_ids).values_list(
+                "id", "number", "course_id", "name"
+            )
+            for level_id, number, course_id, name in level_rows:
+                levels[level_id] = LevelEntity(
+                    id=level_id, number=number, course_id=course_id, name=name
+                )
+
+            word_rows = Word.objects.filter(level__course_id__in=course_ids).values_list(
+                "id", "level_id", "word_a", "word_b", "is_learned"
+            )
+            for word_id, level_id, word_a, word_b, is_learned in word_rows:
+                levels[level_id].words.append(
+                    WordEntity(
+                        id=word_id,
+                        level_id=level_id,
+                        word_a=word_a,
+                        word_b=word_b,
+                        is_learned=is_learned,
+                    )
+                )
+
+        return sorted(levels.values(), key=attrgetter("id"))
+
+    def get_digests(self) -> Digests:
+        digests = Digests(levels=dict(Level.objects.values_list("id", "digest")))
+        course_records = Course.objects.values_list(
+            "id", "digest", "dashboard_digest", "crawled_at"
         )
-
-        level_records_with_words = []
-        for course in course_records:
-            for level in course.levels.all():
-                level.entity_words = self._get_word_entities(level)
-                level_records_with_words.append(level)
-
-        if level_records_with_words:
-            level_entities = factory_mapper.seek(level_records_with_words)
-            return sorted(level_entities, key=attrgetter("id"))
-        else:
-            return []
-
-    def _get_word_entities(self, level_record: Level) -> List[WordEntity]:
-        if word_records := level_record.words.all():
-            return factory_mapper.seek(word_records)
-        else:
-            return []
+        for course_id, digest, dashboard_digest, crawled_at in course_records:
+            digests.courses[course_id] = digest
+            digests.dashboard[course_id] = dashboard_digest
+            if crawled_at is not None:
+                digests.crawled_at[course_id] = crawled_at
+
+        return digests
+
+    def save_digests(self, courses: List[CourseEntity]) -> None:
+        course_records = []
+        level_records = []
+        for course in courses:
+            course_records.append(Course(id=course.id, digest=course.digest))
+            for level in course.levels:
+                level_records.append(
+                    Level(id=level.id, course_id=level.course_id, digest=level.digest)
+                )
+
+        Course.objects.bulk_update(course_records, ["digest"])
+        Level.objects.bulk_update(level_records, ["digest"])
+
+    def resolve_word_ids(self, words: List[WordEntity]) -> List[WordEntity]:
+        return resolve_duplicates(words)
+
+    def mark_crawled(self, courses: List[CourseEntity]) -> None:
+        crawled_at = timezone.now()
+        course_records = [
+            Course(
+                id=course.id,
+                dashboard_digest=course.dashboard_digest,
+                crawled_at=crawled_at,
+            )
+            for course in courses
+        ]
+        Course.objects.bulk_update(course_records, ["dashboard_digest", "crawled_at"])
 
     def update_courses(self, diff: DiffContainer) -> None:
         self._apply_diff(self.batch.course, diff)
@@ -108,10 +188,28 @@ class DBRep(Repository):
         self._apply_diff(self.batch.word, diff)
 
     def _apply_diff(self, actions: Actions, diff: DiffContainer) -> None:
-        """Применение конкретных команд к расхождениям данных"""
-        actions.create(diff.create)
-        actions.update(diff.update)
-        actions.delete(diff.delete)
+        """Применение конкретных команд к расхождениям данных.
+
+        Все изменения одного типа сущностей пишутся в одной транзакции: ошибка на середине
+        не оставляет БД частично обновленной. Команды получают сущности пачками по `batch_size`.
+        """
+        commands = (
+            ("create", diff.create),
+            ("update", diff.update),
+            ("delete", diff.delete),
+        )
+        with transaction.atomic():
+            for name, entities in commands:
+                # Потоковые команды сами пишут записи пачками, им сущности передаются целиком.
+                size = len(entities) if name in actions.streamed_commands else self.batch_size
+                for chunk in chunked(entities, max(size, 1)):
+                    start = perf_counter()
+                    getattr(actions, name)(chunk)
+                    logger.debug(
+                        f"({perf_counter() - start:.3f}) {type(actions).__name__}.{name}"
+                        f" [{len(chunk)}]"
+                    )
+
         actions.equal(diff.equal)
 
 
@@ -121,35 +219,219 @@ class MemriseRep(Repository):
 
     parser: Parser
     counter: MemriseRequestCounter
+    parse_executor: ParseExecutor
+    # Контрольная точка обхода уровней, None - прерванный обход начинается заново.
+    checkpoint: Optional[CrawlCheckpoint] = field(default_factory=default_crawl_checkpoint)
+    level_retries: int = settings.MEMRISE_LEVEL_RETRIES
+    # Сколько страниц dashboard запрашивается одновременно, 1 - страницы запрашиваются по одной.
+    dashboard_prefetch: int = settings.MEMRISE_DASHBOARD_PREFETCH
+    _failed_course_ids: Set[int] = field(init=False, default_factory=set)
 
     def get_courses(self) -> List[CourseEntity]:
-        self.counter.reset()
-        course_entities = []
-        while True:
-            response = api.load_dashboard_courses(self.counter.next())
-            courses_response = CoursesResponse(**response)
+        return sorted(self.stream_courses(), key=attrgetter("id"))
 
+    def stream_courses(self) -> Iterator[CourseEntity]:
+        for courses_response in self._dashboard_pages():
             if courses_response.courses:
-                course_entities.extend(factory_mapper.seek(courses_response.courses))
-
-            if courses_response.has_more_courses is False:
-                break
-
-        return sorted(course_entities, key=attrgetter("id"))
+                yield from factory_mapper.iterate(courses_response.courses)
+
+    def _dashboard_pages(self) -> Iterator[CoursesResponse]:
+        """Страницы dashboard по порядку до первой с `has_more_courses == False`.
+
+        Количество курсов заранее неизвестно, поэтому страницы запрашиваются наперед: в работе
+        держится `dashboard_prefetch` страниц, следующая запрашивается по мере разбора предыдущих.
+        Страницы после последней отбрасываются, еще не отправленные запросы отменяются.
+        """
+        pages: Deque[Future] = deque()
+        with ThreadPoolExecutor(max_workers=max(1, self.dashboard_prefetch)) as pool:
+
+            def request(number: int) -> None:
+                pages.append(pool.submit(api.load_dashboard_courses, self.counter.page(number)))
+
+            for number in range(max(1, self.dashboard_prefetch)):
+                request(number)
+
+            next_number = len(pages)
+            try:
+                while pages:
+                    courses_response = CoursesResponse(**pages.popleft().result())
+                    yield courses_response
+                    if courses_response.has_more_courses is False:
+                        break
+
+                    request(next_number)
+                    next_number += 1
+            finally:
+                for page in pages:
+                    page.cancel()
 
     def get_levels(self, courses: List[CourseEntity]) -> List[LevelEntity]:
-        urls = [url for course_entity in courses for url in course_entity.levels_url]
-        level_entities = asyncio.run(self._bulk_crawl(urls))
-        return sorted(level_entities, key=attrgetter("id"))
-
-    async def _bulk_crawl(self, urls: List[URL]) -> List[LevelEntity]:
-        tasks = [self._fetch_level_and_parse(url=url) for url in urls]
-        return await asyncio.gather(*tasks)
+        return sorted(self.stream_levels(courses), key=attrgetter("id"))
+
+    def stream_levels(self, courses: Iterable[CourseEntity]) -> Iterator[LevelEntity]:
+        """Уровни из контрольной точки прерванного обхода, остальные уровни из memrise.
+
+        `courses` может быть ленивым, например курсы по мере разбора страниц dashboard: уровни курса
+        начинают стягиваться, как только курс получен, не дожидаясь остальных курсов.
+        Уровень, который не удалось стянуть за `level_retries` повторов, пропускается, а его курс
+        попадает в `get_failed_course_ids`. Контрольная точка удаляется после обхода без пропусков.
+        """
+        url_courses: Dict[URL, CourseEntity] = {}
+
+        def url_batches() -> Iterator[List[URL]]:
+            for course_entity in courses:
+                for url in course_entity.levels_url:
+                    url_courses[url] = course_entity
+                yield course_entity.levels_url
+
+        if isinstance(courses, Sequence):
+            num_pages = sum(len(course_entity.levels_url) for course_entity in courses)
+        else:
+            # Количество уровней заранее неизвестно, обход считается большим.
+            num_pages = self.parse_executor.threshold
+
+        self._failed_course_ids = set()
+        restored = self.checkpoint.load() if self.checkpoint is not None else {}
+        failed_urls: Set[URL] = set()
+        yield from iterate_async(
+            self._stream_crawl(url_batches(), url_courses, failed_urls, restored, num_pages)
+        )
+        if async_api.limiter is not None:
+            logger.info(f"Скорость запросов к memrise: {async_api.limiter.stats()}")
+
+        self._failed_course_ids = {url_courses[url].id for url in failed_urls}
+        if failed_urls:
+            logger.warning(
+                f"Обход завершен с пропусками: {len(failed_urls)} уровней, "
+                f"курсы {sorted(self._failed_course_ids)} не обновляются"
+            )
+        if self.checkpoint is not None and not failed_urls:
+            self.checkpoint.clear()
+
+    def get_failed_course_ids(self) -> Set[int]:
+        return set(self._failed_course_ids)
+
+    async def _stream_crawl(
+        self,
+        url_batches: Iterable[List[URL]],
+        url_courses: Mapping[URL, CourseEntity],
+        failed_urls: Set[URL],
+        restored: Dict[URL, CheckpointLevel],
+        num_pages: int,
+    ) -> AsyncIterator[LevelEntity]:
+        """Обход уровней скользящим окном, уровни отдаются по мере получения ответов.
+
+        Адреса уровней приходят пачками из `url_batches`. Следующая пачка ждется в отдельном потоке,
+        пока стягиваются уже известные уровни, поэтому поиск курсов и обход уровней идут внахлест.
+        Уровни из `restored` отдаются без запроса, если курс на dashboard не изменился с тех пор,
+        как уровень был стянут, иначе уровень стягивается заново.
+
+        Одновременно в работе находится не более `async_api.concurrency` уровней, поэтому в памяти
+        держатся только html страницы текущего окна, а не всего обхода. Ошибка одного уровня
+        не обрывает обход: уровень ставится в конец очереди, а после `level_retries` повторов
+        пропускается и попадает в `failed_urls`. Уровень, запрос которого исчерпал повторы
+        `async_api.retry`, пропускается сразу.
+
+        Если обход прервался ошибкой или потребитель закрыл его раньше, незавершенные запросы
+        отменяются, поиск следующей пачки дожидается, а `url_batches` закрывается.
+        """
+        loop = asyncio.get_event_loop()
+        batches = iter(url_batches)
+        queue: Deque[URL] = deque()
+        attempts: Counter = Counter()
+        pending: Dict[asyncio.Future, URL] = {}
+
+        def restore(url: URL) -> Optional[LevelStruct]:
+            saved = restored.get(url)
+            if saved is None or saved.dashboard_digest != url_courses[url].dashboard_digest:
+                return None
+            return saved.level
+
+        def discover() -> asyncio.Future:
+            return loop.run_in_executor(None, next, batches, None)
+
+        def schedule() -> None:
+            while queue and len(pending) < async_api.concurrency:
+                url = queue.popleft()
+                task = asyncio.ensure_future(self._fetch_level_and_parse(url=url))
+                pending[task] = url
+
+        # Все уровни стягиваем через одну сессию, количество одновременных запросов ограничено в async_api.
+        with self.parse_executor.pool(num_pages):
+            async with async_api.crawl_session():
+                discovery: Optional[asyncio.Future] = discover()
+                try:
+                    while pending or discovery is not None:
+                        waiting = {*pending, discovery} - {None}
+                        done, _ = await asyncio.wait(
+                            waiting, return_when=asyncio.FIRST_COMPLETED
+                        )
+                        if discovery in done:
+                            done.discard(discovery)
+                            batch = discovery.result()
+                            discovery = discover() if batch is not None else None
+                            saved = {
+                                url: struct
+                                for url in batch or ()
+                                if (struct := restore(url)) is not None
+                            }
+                            queue.extend(url for url in batch or () if url not in saved)
+                            schedule()
+                            for struct in saved.values():
+                                yield level_from_struct(struct)
+
+                        for task in done:
+                            url = pending.pop(task)
+                            error = task.exception()
+                            if error is not None:
+                                attempts[url] += 1
+                                # Ответы 429 и 5xx, обрывы и таймауты уже повторены в `request`,
+                                # повтор уровня умножил бы число запросов к memrise.
+                                retried = async_api.is_retried(error)
+                                if not retried and attempts[url] <= self.level_retries:
+                                    logger.warning(f"Уровень {url} не стянут: {error!r}, повтор")
+                                    queue.append(url)
+                                else:
+                                    logger.error(
+                                        f"Уровень {url} пропущен после {attempts[url]} попыток:"
+                                        f" {error!r}"
+                                    )
+                                    failed_urls.add(url)
+
+                            schedule()
+                            if error is None:
+                                level = task.result()
+                                if self.checkpoint is not None:
+                                    self.checkpoint.save(
+                                        url, url_courses[url].dashboard_digest, level
+                                    )
+                                yield level
+                finally:
+                    for task in pending:
+                        task.cancel()
+                    await asyncio.gather(*pending, return_exceptions=True)
+                    if discovery is not None:
+                        # Поток может разбирать страницу dashboard: генератор закрывается
+                        # только после нее, иначе close() упадет на выполняющемся генераторе.
+                        await asyncio.gather(discovery, return_exceptions=True)
+                    close = getattr(batches, "close", None)
+                    if close is not None:
+                        close()
 
     async def _fetch_level_and_parse(self, url: URL) -> LevelEntity:
-        html = await async_api.get_level(url)
+        """Страница уровня, которая не изменилась с прошлого обхода, не парсится повторно:
+        разобранный уровень берется из валидаторов страниц
+        """
+        page = await async_api.get_level_page(url)
+        if page.level is not None:
+            return level_from_struct(page.level)
+
         level_number = int(Path(url).stem)
-        return self.parser.parse(html, level_number)
+        level = await self.parse_executor.parse(page.text, level_number)
+        validators = async_api.validators
+        if validators is not None and page.digest is not None:
+            validators.put_level(page.url, page.digest, level_to_struct(level))
+        return level
 
     def update_courses(self, diff: DiffContainer) -> None:
         self._apply_diff(self.batch.course, diff)
@@ -2,6 +2,8 @@ from dataclasses import dataclass
 from typing import Generator, List, Optional
 from uuid import UUID
 
+from memrise.core.domains.entities import make_digest
+
 
 @dataclass
 class Category:
@@ -85,6 +87,20 @@ class CourseItemResponse:
         if self.goal:
             self.goal = Goal(**self.goal)
 
+    @property
+    def dashboard_digest(self) -> str:
+        """Дайджест метаданных курса, меняется при изменении слов или прогресса изучения курса"""
+        return make_digest(
+            str(value)
+            for value in (
+                self.num_things,
+                self.num_levels,
+                self.learned,
+                self.review,
+                self.difficult,
+            )
+        )
+
 
 @dataclass
 class CoursesResponse:
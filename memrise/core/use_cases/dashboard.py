@@ -16,13 +16,24 @@ HOW TO USE IT:
     courses = dashboard.get_courses()
     level_entities = dashboard.get_levels(CourseEntity)
     word_entities = dashboard.get_words(LevelEntity)
+
+С `columnar_words` слова уровней хранятся в колонках `WordColumns`, снимок слов всего аккаунта
+отдает `get_word_columns`:
+    dashboard = Dashboard(MemriseRep(), DashboardCourseContainer(columnar_words=True))
+    dashboard.load_assets()
+    columns = dashboard.get_word_columns()
+    columns.count_learned()
 """
 from __future__ import annotations
 
 from collections import defaultdict
 from dataclasses import dataclass, field
 from operator import attrgetter
-from typing import List, TYPE_CHECKING, Dict
+from typing import Dict, Iterable, Iterator, List, Sequence, Set, TYPE_CHECKING
+
+from django.conf import settings
+
+from memrise.core.domains.word_columns import WordColumns
 
 if TYPE_CHECKING:
     from memrise.core.repositories.base import Repository
@@ -35,6 +46,8 @@ if TYPE_CHECKING:
 
 @dataclass
 class DashboardCourseContainer:
+    # Слова уровней хранятся колонками `WordColumns` вместо списков WordEntity.
+    columnar_words: bool = settings.MEMRISE_COLUMNAR_WORDS
     _courses: List[CourseEntity] = field(init=False, default_factory=list)
 
     @property
@@ -49,6 +62,11 @@ class DashboardCourseContainer:
         """Массовое добавление курсов в course_container"""
         self._courses = courses
 
+    def pack_words(self, level: LevelEntity) -> None:
+        """Перевод слов уровня в колонки, если course_container хранит слова колонками"""
+        if self.columnar_words and not isinstance(level.words, WordColumns):
+            level.add_words(WordColumns.from_entities(level.words))
+
     def get_courses(self) -> List[CourseEntity]:
         """Получение отсортированного списока курсов"""
         return sorted(self._courses, key=attrgetter("id"))
@@ -64,22 +82,61 @@ class Dashboard:
     course_container: "DashboardCourseContainer"
 
     def load_assets(self) -> "DashboardCourseContainer":
-        """Получение всех пользовательских учебных курсов отображаемых в course_container"""
+        """Получение всех пользовательских учебных курсов отображаемых в course_container.
+
+        Уровни курса стягиваются сразу, как только курс получен, параллельно с поиском
+        остальных курсов.
+        """
+        self.load_levels(self.stream_courses())
+
+        return self.course_container
+
+    def load_courses(self) -> List["CourseEntity"]:
+        """Получение курсов без уровней, уровни стягиваются отдельно через `load_levels`"""
         course_entities = self.origin_repo.get_courses()
         self.course_container.add_courses(course_entities)
-        self._fetch_levels()
 
-        return self.course_container
+        return self.course_container.get_courses()
 
-    def _fetch_levels(self) -> None:
-        """Стягиваем уровни из репозитория и добавляем их в course_container,
-        если уровни имееют слова, то они тоже будут там
+    def stream_courses(self) -> Iterator["CourseEntity"]:
+        """Курсы без уровней по мере получения из репозитория, сразу попадают в course_container"""
+        self.course_container.purge()
+        for course_entity in self.origin_repo.stream_courses():
+            self.course_container.add_course(course_entity)
+            yield course_entity
+
+    def load_levels(self, courses: Iterable["CourseEntity"]) -> None:
+        """Стягиваем уровни курсов `courses` из репозитория и добавляем их в course_container,
+        если уровни имееют слова, то они тоже будут там.
+
+        Уровни забираются потоком и сразу раскладываются по курсам, не дожидаясь окончания обхода.
+        `courses` может быть ленивым, например `stream_courses`.
         """
-        level_entities = self.origin_repo.get_levels(self.course_container.courses)
-        level_maps = self.group_levels_by_course(level_entities)
+        course_maps: Dict[int, "CourseEntity"] = {}
+
+        def register(course_entities: Iterable["CourseEntity"]) -> Iterator["CourseEntity"]:
+            for course_entity in course_entities:
+                course_entity.add_levels([])
+                course_maps[course_entity.id] = course_entity
+                yield course_entity
+
+        registered = register(courses)
+        if isinstance(courses, Sequence):
+            registered = list(registered)
+            if not registered:
+                return
+
+        for level_entity in self.origin_repo.stream_levels(registered):
+            if course_entity := course_maps.get(level_entity.course_id):
+                self.course_container.pack_words(level_entity)
+                course_entity.add_level(level_entity)
 
-        for course_entities in self.course_container.courses:
-            course_entities.add_levels(level_maps[course_entities.id])
+        for course_entity in course_maps.values():
+            course_entity.levels.sort(key=attrgetter("id"))
+
+    def get_failed_course_ids(self) -> Set[int]:
+        """Курсы, уровни которых последний `load_levels` стянул не полностью"""
+        return self.origin_repo.get_failed_course_ids()
 
     def group_levels_by_course(
         self, level_entities: List["LevelEntity"]
@@ -110,6 +167,18 @@ class Dashboard:
 
         return word_entities
 
+    def get_word_columns(self) -> WordColumns:
+        """Снимок слов course_container в колонках, колонки уровней склеиваются без перебора слов"""
+        columns = WordColumns()
+        for course_entity in self.course_container.courses:
+            for level_entity in course_entity.levels:
+                if isinstance(level_entity.words, WordColumns):
+                    columns.merge(level_entity.words)
+                else:
+                    columns.extend(level_entity.words)
+
+        return columns
+
     def refresh_assets(self) -> None:
         """Очистка и обновление всех данных, может быть очень трудозатратная особенно при работс memrise.
         В этом случае оно идет в memrise и опять стягивает все данные.
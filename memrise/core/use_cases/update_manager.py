@@ -17,19 +17,25 @@ HOW TO USE IT:
     um = UpdateManager(fresh_repo=memrise_repo, actual_repo=db_repo)
     um.update()
 
+Для курсов и уровней хранятся дайджесты дерева слов (см. `CourseEntity.digest`, `LevelEntity.digest`),
+поэтому слова сравниваются и сохраняются только в тех курсах и уровнях, где что-то изменилось.
+Уровни стягиваются только у курсов, метаданные которых на dashboard изменились, либо если уровни курса
+не стягивались дольше `MEMRISE_FULL_CRAWL_INTERVAL` часов.
 """
 
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import TYPE_CHECKING
+from typing import Iterable, Iterator, TYPE_CHECKING
 
+from django.conf import settings
 from stories import Result, Success, story
 
 from memrise.core.modules.selectors import CourseSelector, LevelSelector, WordSelector
 from memrise.core.use_cases.dashboard import Dashboard
 
 if TYPE_CHECKING:
+    from memrise.core.domains.entities import CourseEntity
     from memrise.core.repositories.base import Repository
 
 
@@ -37,23 +43,92 @@ if TYPE_CHECKING:
 class UpdateManager:
     actual_repo: Repository
     dashboard: Dashboard
+    # Часы между полными обходами уровней курса, 0 - уровни стягиваются при каждом обновлении.
+    full_crawl_interval: int = settings.MEMRISE_FULL_CRAWL_INTERVAL
 
     @story
     def update(I) -> None:
         """Основной метод обновления всех данных данных"""
         # It's stories methods without call and we shall use noqa comments.
         I.load_assets  # noqa
+        I.select_changed  # noqa
         I.update_courses  # noqa
         I.update_levels  # noqa
         I.update_words  # noqa
+        I.save_digests  # noqa
 
     def load_assets(self, ctx) -> Success:
-        self.dashboard.load_assets()
-        ctx.fresh_course_entities = self.dashboard.get_courses()
-        ctx.fresh_level_entities = self.dashboard.get_levels()
-        ctx.fresh_word_entities = self.dashboard.get_words()
+        """Стягивание курсов и уровней только тех курсов, которые могли измениться.
+
+        Уровни курса стягиваются сразу, как только курс разобран на странице dashboard,
+        параллельно с получением остальных страниц.
+        """
         ctx.actual_course_entities = self.actual_repo.get_courses()
-        ctx.actual_level_entities = self.actual_repo.get_levels(ctx.fresh_course_entities)
+        ctx.digests = self.actual_repo.get_digests()
+        outdated_course_entities = []
+
+        def select_outdated(courses: Iterable[CourseEntity]) -> Iterator[CourseEntity]:
+            for course in courses:
+                if ctx.digests.outdated_courses([course], self.full_crawl_interval):
+                    outdated_course_entities.append(course)
+                    yield course
+
+        self.dashboard.load_levels(select_outdated(self.dashboard.stream_courses()))
+        ctx.fresh_course_entities = self.dashboard.get_courses()
+        # Курсы с пропущенными уровнями считаются нестянутыми: их уровни и слова не сравниваются,
+        # иначе пропущенные уровни были бы удалены, а следующее обновление стянет их заново.
+        failed_course_ids = self.dashboard.get_failed_course_ids()
+        ctx.crawled_course_entities = [
+            course
+            for course in outdated_course_entities
+            if course.id not in failed_course_ids
+        ]
+        return Success()
+
+    def select_changed(self, ctx) -> Success:
+        """Отбор курсов и уровней, дайджест которых разошелся с сохраненным.
+
+        Дайджесты сравниваются сверху вниз: уровни сравниваются только у измененных курсов, а слова
+        только у измененных уровней. Уровни и слова пропавших курсов и уровней попадают в сравнение,
+        чтобы их можно было удалить. Курсы, уровни которых не стягивались, считаются неизмененными.
+        """
+        digests = ctx.digests
+        fresh_course_ids = {course.id for course in ctx.fresh_course_entities}
+        ctx.changed_course_entities = digests.changed_courses(ctx.crawled_course_entities)
+        unchanged_course_ids = fresh_course_ids - {
+            course.id for course in ctx.changed_course_entities
+        }
+        removed_course_entities = [
+            course
+            for course in ctx.actual_course_entities
+            if course.id not in fresh_course_ids
+        ]
+
+        ctx.fresh_level_entities = [
+            level for course in ctx.changed_course_entities for level in course.levels
+        ]
+        ctx.actual_level_entities = [
+            level
+            for level in self.actual_repo.get_levels(
+                ctx.changed_course_entities + removed_course_entities
+            )
+            if level.course_id not in unchanged_course_ids
+        ]
+
+        changed_level_entities = digests.changed_levels(ctx.fresh_level_entities)
+        unchanged_level_ids = {level.id for level in ctx.fresh_level_entities} - {
+            level.id for level in changed_level_entities
+        }
+        # Дубликатам слов из разных уровней хранилище выдает свои постоянные id до сравнения.
+        ctx.fresh_word_entities = self.actual_repo.resolve_word_ids(
+            [word for level in changed_level_entities for word in level.words]
+        )
+        ctx.actual_word_entities = [
+            word
+            for level in ctx.actual_level_entities
+            if level.id not in unchanged_level_ids
+            for word in level.words
+        ]
         return Success()
 
     def update_courses(self, ctx) -> Success:
@@ -70,15 +145,16 @@ class UpdateManager:
         self.actual_repo.update_levels(diff)
         return Success()
 
-    def update_words(self, ctx) -> Result:
+    def update_words(self, ctx) -> Success:
         """Обновление слов"""
 
-        actual_word_entities = [
-            word
-            for actual_level_entity in ctx.actual_level_entities
-            for word in actual_level_entity.words
-        ]
-
-        diff = WordSelector.match(ctx.fresh_word_entities, actual_word_entities)
+        diff = WordSelector.match(ctx.fresh_word_entities, ctx.actual_word_entities)
         self.actual_repo.update_words(diff)
+        return Success()
+
+    def save_digests(self, ctx) -> Result:
+        """Сохранение дайджестов, только после успешного обновления всего дерева курса"""
+
+        self.actual_repo.save_digests(ctx.changed_course_entities)
+        self.actual_repo.mark_crawled(ctx.crawled_course_entities)
         return Result(ctx)
@@ -1,8 +1,10 @@
 from _dependencies.injector import Injector
+from django.conf import settings
 
-from memrise.core.modules.actions.actions_batch import DBActionsBatch
+from memrise.core.modules.actions.actions_batch import DB_ACTIONS_BATCHES
 from memrise.core.modules.counter import MemriseRequestCounter
-from memrise.core.modules.parsing.regular_lxml import RegularLXML
+from memrise.core.modules.parsing.executor import ParseExecutor
+from memrise.core.modules.parsing.single_pass_lxml import SinglePassLXML
 from memrise.core.repositories.repos import DBRep, MemriseRep
 from memrise.core.use_cases.dashboard import (
     Dashboard,
@@ -16,7 +18,8 @@ class UpdateMemriseContainer(Injector):
     actual_repo = DBRep
     dashboard = Dashboard
     origin_repo = MemriseRep
-    parser = RegularLXML
+    parser = SinglePassLXML
+    parse_executor = ParseExecutor
     counter = MemriseRequestCounter
     course_container = DashboardCourseContainer
-    batch = DBActionsBatch
+    batch = DB_ACTIONS_BATCHES[settings.MEMRISE_ACTIONS_BATCH]
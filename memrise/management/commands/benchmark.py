@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+
+# Импорт модулей регистрирует наборы замеров.
+from memrise.benchmarks import (  # noqa
+    bulk_load,
+    db_levels,
+    entities,
+    factories,
+    parsers,
+    selectors,
+    update,
+    word_actions,
+    word_columns,
+)
+from memrise.benchmarks.base import SUITES, render, render_title
+
+
+class Command(BaseCommand):
+    help = "Замеры производительности модулей memrise"
+
+    def add_arguments(self, parser):
+        parser.add_argument("suites", nargs="*", help="Наборы замеров, по умолчанию все")
+        parser.add_argument("--repeat", type=int, default=100, help="Количество повторов")
+        parser.add_argument("--size", type=int, default=None, help="Размер синтетических данных")
+        parser.add_argument("--list", action="store_true", help="Список наборов замеров")
+
+    def handle(self, *args, **options):
+        if options["list"]:
+            self.stdout.write("\n".join(sorted(SUITES)))
+            return
+
+        names = options["suites"] or sorted(SUITES)
+        unknown = set(names) - set(SUITES)
+        if unknown:
+            raise CommandError(f"Неизвестные наборы замеров: {', '.join(sorted(unknown))}")
+
+        for name in names:
+            self.stdout.write(render_title(name))
+            for item in SUITES[name](options["repeat"], options["size"]):
+                self.stdout.write(render(item))
+                self.stdout.flush()
@@ -0,0 +1,44 @@
+from pathlib import Path
+
+from aiohttp import web
+from django.core.management.base import BaseCommand
+
+from memrise.benchmarks.standin import CassetteSource, StandInServer, SyntheticSource
+from memrise.core.modules.api.cassette import Cassette
+
+
+class Command(BaseCommand):
+    help = "Подставной сервер memrise для нагрузочных замеров без сети"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1", help="Адрес сервера")
+        parser.add_argument("--port", type=int, default=8000, help="Порт сервера")
+        parser.add_argument("--latency", type=float, default=0.0, help="Задержка ответа в секундах")
+        parser.add_argument("--error-rate", type=float, default=0.0, help="Доля ответов 503")
+        parser.add_argument("--courses", type=int, default=10, help="Количество курсов")
+        parser.add_argument("--levels", type=int, default=10, help="Количество уровней в курсе")
+        parser.add_argument("--words", type=int, default=50, help="Количество слов в уровне")
+        parser.add_argument(
+            "--fixture", action="store_true", help="Курсы dashboard из fixtures"
+        )
+        parser.add_argument("--cassette", type=Path, default=None, help="Проигрывание кассеты")
+
+    def handle(self, *args, **options):
+        if options["cassette"]:
+            source = CassetteSource(Cassette(path=options["cassette"]))
+        elif options["fixture"]:
+            source = SyntheticSource.from_fixture(words_per_level=options["words"])
+        else:
+            source = SyntheticSource(
+                num_courses=options["courses"],
+                levels_per_course=options["levels"],
+                words_per_level=options["words"],
+            )
+
+        server = StandInServer(
+            source, latency=options["latency"], error_rate=options["error_rate"]
+        )
+        self.stdout.write(
+            f"MEMRISE_HOST=http://{options['host']}:{options['port']}, Ctrl+C для остановки"
+        )
+        web.run_app(server.make_app(), host=options["host"], port=options["port"], print=None)
@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('memrise', '0004_word_is_learned'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='digest',
+            field=models.CharField(blank=True, default='', max_length=32, verbose_name='Digest of the synced levels'),
+        ),
+        migrations.AddField(
+            model_name='level',
+            name='digest',
+            field=models.CharField(blank=True, default='', max_length=32, verbose_name='Digest of the synced words'),
+        ),
+    ]
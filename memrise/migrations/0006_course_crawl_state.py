@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('memrise', '0005_course_level_digest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='dashboard_digest',
+            field=models.CharField(blank=True, default='', max_length=32, verbose_name='Digest of the dashboard metadata at the last crawl'),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='crawled_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Last crawl of the course levels'),
+        ),
+    ]
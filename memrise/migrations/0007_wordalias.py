@@ -0,0 +1,22 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('memrise', '0006_course_crawl_state'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WordAlias',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_id', models.IntegerField(verbose_name="Memrise's word ID")),
+                ('level_id', models.IntegerField(verbose_name="Memrise's level ID of the duplicate")),
+            ],
+            options={
+                'unique_together': {('original_id', 'level_id')},
+            },
+        ),
+    ]
@@ -10,6 +10,11 @@ class Course(models.Model):
     num_levels = models.IntegerField("Number of levels in the course")
     difficult_url = models.CharField("Difficult's URL", max_length=1024)
     is_disable = models.BooleanField("Course disable", default=False)
+    digest = models.CharField("Digest of the synced levels", max_length=32, default="", blank=True)
+    dashboard_digest = models.CharField(
+        "Digest of the dashboard metadata at the last crawl", max_length=32, default="", blank=True
+    )
+    crawled_at = models.DateTimeField("Last crawl of the course levels", null=True, blank=True)
 
     def __str__(self) -> str:
         return f"{self.name}"
@@ -20,6 +25,7 @@ class Level(models.Model):
     number = models.IntegerField("Number of level")
     name = models.CharField("Level name", max_length=1024)
     course = models.ForeignKey("Course", on_delete=models.CASCADE, related_name="levels")
+    digest = models.CharField("Digest of the synced words", max_length=32, default="", blank=True)
 
     def __str__(self) -> str:
         return f"{self.course}; Level-{self.number} [{self.name}]"
@@ -34,3 +40,28 @@ class Word(models.Model):
 
     def __str__(self) -> str:
         return f"{self.word_a} --> {self.word_b}"
+
+
+def alias_word_id(pk: int) -> int:
+    """id дубликата слова по pk записи WordAlias"""
+    return -pk
+
+
+class WordAlias(models.Model):
+    """Постоянный id дубликата слова: одно и то же слово memrise встречается в нескольких уровнях.
+
+    id дубликата берется из резервного диапазона отрицательных чисел и не пересекается с id memrise.
+    """
+
+    original_id = models.IntegerField("Memrise's word ID")
+    level_id = models.IntegerField("Memrise's level ID of the duplicate")
+
+    class Meta:
+        unique_together = [("original_id", "level_id")]
+
+    @property
+    def word_id(self) -> int:
+        return alias_word_id(self.pk)
+
+    def __str__(self) -> str:
+        return f"{self.original_id} [Level-{self.level_id}] --> {self.word_id}"
@@ -14,7 +14,8 @@ class CourseSerializer(serializers.ModelSerializer):
 class LevelSerializer(serializers.ModelSerializer):
     class Meta:
         model = Level
-        fields = "__all__"
+        # Дайджест служебный, нужен только для обновления данных.
+        exclude = ["digest"]
 
 
 class LevelRelatedCourseField(serializers.RelatedField):
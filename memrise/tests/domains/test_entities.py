@@ -1,5 +1,6 @@
 # type: ignore
 
+import pickle
 import random
 
 from django.test import TestCase
@@ -31,6 +32,32 @@ class TestWordEntity(TestCase):
         }
         self.assertDictEqual(word_as_dict, expected)
 
+    def test_fingerprint(self):
+        word_entity = WordEntity(id=816, level_id=14, word_a="main", word_b="second")
+        same_entity = WordEntity(id=816, level_id=14, word_a="main", word_b="second")
+        self.assertEqual(word_entity.fingerprint, same_entity.fingerprint)
+        # Отпечаток не зависит от процесса.
+        self.assertEqual(word_entity.fingerprint, "7af3dcffcf08f3303067196f12baade9")
+
+        fingerprint = word_entity.fingerprint
+        word_entity.is_learned = True
+        self.assertNotEqual(word_entity.fingerprint, fingerprint)
+        self.assertNotEqual(word_entity.fingerprint, same_entity.fingerprint)
+
+        copied_entity = same_entity.copy(update={"is_learned": True})
+        self.assertEqual(copied_entity.fingerprint, word_entity.fingerprint)
+
+    def test_slots(self):
+        word_entity = WordEntity(id=816, level_id=14, word_a="main", word_b="second")
+        self.assertFalse(hasattr(word_entity, "__dict__"))
+        with self.assertRaises(AttributeError):
+            word_entity.unknown = True
+
+        # Сущности передаются в процессы парсинга, отпечаток считается заново.
+        restored = pickle.loads(pickle.dumps(word_entity))
+        self.assertEqual(restored, word_entity)
+        self.assertEqual(restored.fingerprint, word_entity.fingerprint)
+
 
 class TestLevelEntity(TestCase):
     def test_entity(self):
@@ -52,6 +79,30 @@ class TestLevelEntity(TestCase):
         }
         self.assertDictEqual(level_as_dict, expected)
 
+    def test_fingerprint_excludes_words(self):
+        le = LevelEntity(number=3, course_id=14543, name="TestLevel", id=1)
+        fingerprint = le.fingerprint
+        le.add_words([WordEntity(id=1, word_a="a", word_b="b", level_id=le.id)])
+        self.assertEqual(le.fingerprint, fingerprint)
+
+        le.name = "Renamed"
+        self.assertNotEqual(le.fingerprint, fingerprint)
+
+    def test_digest(self):
+        words = [
+            WordEntity(id=1, word_a="a", word_b="b", level_id=1),
+            WordEntity(id=2, word_a="c", word_b="d", level_id=1),
+        ]
+        le = LevelEntity(number=3, course_id=14543, name="TestLevel", id=1, words=words)
+        reversed_le = LevelEntity(
+            number=3, course_id=14543, name="TestLevel", id=1, words=words[::-1]
+        )
+        self.assertEqual(le.digest, reversed_le.digest)
+
+        digest = le.digest
+        le.words[0].is_learned = True
+        self.assertNotEqual(le.digest, digest)
+
     def test_add_word(self):
         """Добавление по одной сущности слова WordEntity в объект черзе метод add_word"""
         le = LevelEntity(number=3, course_id=14543, name="TestLevel", id=1)
@@ -116,9 +167,28 @@ class TestCourseEntity(TestCase):
             "levels_url": [],
             "levels": [],
             "is_disable": True,
+            "dashboard_digest": "",
         }
         self.assertDictEqual(course_as_dict, expected)
 
+    def test_fingerprint_excludes_levels(self):
+        ce = CourseEntity(
+            id=1,
+            name="Course 1",
+            url="/path/to/course",
+            difficult=234,
+            num_words=123,
+            num_levels=2,
+            difficult_url="/path/to/difficult/words",
+        )
+        fingerprint = ce.fingerprint
+        ce.add_levels([LevelEntity(number=1, course_id=ce.id, name="Level", id=1)])
+        ce.generate_levels_url()
+        self.assertEqual(ce.fingerprint, fingerprint)
+
+        ce.is_disable = True
+        self.assertNotEqual(ce.fingerprint, fingerprint)
+
     def test_add_level(self):
         course_id = 1
         ce = CourseEntity(
@@ -0,0 +1,75 @@
+# type: ignore
+
+import pickle
+
+from django.test import TestCase
+
+from memrise.core.domains.entities import WordEntity
+from memrise.core.domains.word_columns import WordColumns
+from memrise.tests.synthetic import course_entities
+
+
+class TestWordColumns(TestCase):
+    def setUp(self) -> None:
+        courses = course_entities(1, levels_per_course=3, words_per_level=20)
+        self.levels = courses[0].levels
+        self.words = [word for level in self.levels for word in level.words]
+        self.columns = WordColumns.from_entities(self.words)
+
+    def test_entities(self):
+        self.assertEqual(len(self.columns), len(self.words))
+        self.assertEqual(list(self.columns), self.words)
+        self.assertEqual(self.columns[5], self.words[5])
+        self.assertEqual(self.columns[-1], self.words[-1])
+        self.assertEqual(list(self.columns[10:15]), self.words[10:15])
+
+    def test_interned_strings(self):
+        columns = WordColumns.from_entities(
+            [
+                WordEntity(id=1, level_id=1, word_a="".join(["du", "plicate"]), word_b="b"),
+                WordEntity(id=2, level_id=2, word_a="".join(["dup", "licate"]), word_b="b"),
+            ]
+        )
+        self.assertIs(columns.words_a[0], columns.words_a[1])
+
+    def test_fingerprints(self):
+        self.assertEqual(
+            self.columns.fingerprints(), [word.fingerprint for word in self.words]
+        )
+
+    def test_counters(self):
+        learned = [word for word in self.words if word.is_learned]
+        self.assertEqual(self.columns.count_learned(), len(learned))
+        self.assertEqual(
+            self.columns.count_by_level(), {level.id: 20 for level in self.levels}
+        )
+        self.assertEqual(
+            self.columns.count_learned_by_level(),
+            {
+                level.id: sum(word.is_learned for word in level.words)
+                for level in self.levels
+            },
+        )
+
+    def test_select_levels_and_merge(self):
+        first, second, third = self.levels
+        selected = self.columns.select_levels({first.id, third.id})
+        self.assertEqual(list(selected), first.words + third.words)
+
+        selected.merge(WordColumns.from_entities(second.words))
+        self.assertEqual(list(selected), first.words + third.words + second.words)
+
+    def test_level_words(self):
+        """Колонки подставляются вместо списка слов уровня"""
+        level = self.levels[0]
+        packed = level.copy(update={"words": WordColumns.from_entities(level.words)})
+        self.assertEqual(packed.digest, level.digest)
+        self.assertEqual(packed.dict(), level.dict())
+
+        restored = pickle.loads(pickle.dumps(packed))
+        self.assertEqual(restored.words, packed.words)
+
+        word = WordEntity(id=10 ** 6, level_id=level.id, word_a="new", word_b="new")
+        packed.add_word(word)
+        self.assertEqual(packed.words[-1], word)
+        self.assertIsInstance(packed.words, WordColumns)
@@ -0,0 +1,58 @@
+from operator import attrgetter
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import List
+from unittest import TestCase
+from unittest.mock import patch
+
+from django.test.utils import override_settings
+
+from memrise.core.domains.entities import CourseEntity, LevelEntity
+from memrise.core.modules.api import api, async_api
+from memrise.core.modules.api.page_validators import default_page_validators
+from memrise.core.modules.factories.factories import factory_mapper
+from memrise.models import Course
+
+
+def isolate_storage(test: TestCase) -> Path:
+    """Файлы обхода теста (контрольная точка, валидаторы страниц) во временной папке, не в STORAGE.
+
+    Валидаторы у каждого теста свои, иначе уровни, стянутые одним тестом, приходили бы в следующий
+    неизмененными.
+    """
+    tmp = TemporaryDirectory()
+    test.addCleanup(tmp.cleanup)
+    root = Path(tmp.name)
+    storage_settings = override_settings(
+        MEMRISE_CRAWL_CHECKPOINT_PATH=root / "crawl_checkpoint.jsonl",
+        MEMRISE_PAGE_VALIDATORS_DIR=root / "page_validators",
+    )
+    storage_settings.enable()
+    test.addCleanup(storage_settings.disable)
+    for client in (api, async_api):
+        patcher = patch.object(client, "validators", default_page_validators())
+        patcher.start()
+        test.addCleanup(patcher.stop)
+
+    return root
+
+
+def legacy_get_levels(courses: List[CourseEntity]) -> List[LevelEntity]:
+    """Прежний способ: модели курсов, уровней и слов через prefetch, сущности через фабрики"""
+    course_records = (
+        Course.objects.filter(id__in=[course.id for course in courses])
+        .prefetch_related("levels")
+        .prefetch_related("levels__words")
+    )
+
+    level_records_with_words = []
+    for course in course_records:
+        for level in course.levels.all():
+            word_records = level.words.all()
+            level.entity_words = factory_mapper.seek(word_records) if word_records else []
+            level_records_with_words.append(level)
+
+    if not level_records_with_words:
+        return []
+
+    return sorted(factory_mapper.seek(level_records_with_words), key=attrgetter("id"))
@@ -1,4 +1,7 @@
-from django.test import TestCase
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase, override_settings
 
 from memrise.core.domains.entities import CourseEntity, LevelEntity, WordEntity
 from memrise.core.modules.actions.action_reporter import (
@@ -6,11 +9,25 @@ from memrise.core.modules.actions.action_reporter import (
     LevelReporter,
     WordReporter,
 )
+from memrise.core.modules.actions.copy_actions import (
+    CopyCourseActions,
+    CopyLevelActions,
+    CopyReader,
+    CopyWordActions,
+    copy_load,
+    copy_value,
+)
 from memrise.core.modules.actions.db_actions import (
     DBCourseActions,
     DBLevelActions,
     DBWordActions,
 )
+from memrise.core.modules.actions.upsert_actions import (
+    UpsertCourseActions,
+    UpsertLevelActions,
+    UpsertWordActions,
+)
+from memrise.core.modules.word_ids import word_aliases
 from memrise.models import Course, Level, Word
 from memrise.tests.data_for_test import (
     fresh_course_entities,
@@ -216,6 +233,32 @@ class TestDBWordActions(TestCase):
         expected_after_num_words = expected_before_num_words + len(fresh_entities)
         self.assertEqual(len(after_words), expected_after_num_words)
 
+    @override_settings(MEMRISE_DB_BATCH_SIZE=2)
+    def test_create_duplicates_with_batched_queries(self):
+        """Дубликаты ищутся одним запросом на пачку id, в том числе внутри самой пачки"""
+        fresh_entities = [
+            # id уже есть в БД.
+            WordEntity(id=204850790, level_id=2, word_a="fair", word_b="translate"),
+            WordEntity(id=1, level_id=1, word_a="test a 1", word_b="translate b 1"),
+            WordEntity(id=1, level_id=2, word_a="test a 1", word_b="translate b 1"),
+            WordEntity(id=2, level_id=2, word_a="test a 2", word_b="translate b 2"),
+        ]
+        dca = DBWordActions(reporter=WordReporter())
+        # 2 запроса на проверку id, 3 на выдачу постоянных id дубликатам и 2 на вставку пачками.
+        with self.assertNumQueries(7):
+            dca.create(fresh_entities)
+
+        self.assertEqual(Word.objects.count(), 70 + len(fresh_entities))
+        self.assertEqual(Word.objects.filter(id=1).count(), 1)
+        self.assertEqual(Word.objects.filter(id=204850790).get().level_id, 1)
+        self.assertEqual(Word.objects.filter(word_a="test a 1").count(), 2)
+        # Дубликаты получают id из резервного диапазона, одинаковые при повторной выдаче.
+        duplicate_ids = set(Word.objects.filter(id__lt=0).values_list("id", flat=True))
+        self.assertEqual(len(duplicate_ids), 2)
+        self.assertEqual(
+            set(word_aliases([(1, 2), (204850790, 2)]).values()), duplicate_ids
+        )
+
     def test_update(self):
         update_ids = [x.id for x in fresh_word_entities]
         before_words = Word.objects.all().filter(id__in=update_ids)
@@ -254,6 +297,20 @@ class TestDBWordActions(TestCase):
             ],
         )
 
+    def test_update_is_learned(self):
+        """Изменение статуса изучения сохраняется, иначе слово обновлялось бы при каждом обходе"""
+        word = Word.objects.get(id=204850790)
+        entity = WordEntity(
+            id=word.id,
+            level_id=word.level_id,
+            word_a=word.word_a,
+            word_b=word.word_b,
+            is_learned=not word.is_learned,
+        )
+        DBWordActions(reporter=WordReporter()).update([entity])
+
+        self.assertEqual(Word.objects.get(id=204850790).is_learned, entity.is_learned)
+
     def test_equal(self):
         before_words = Word.objects.all()
         dca = DBWordActions(reporter=WordReporter())
@@ -268,3 +325,175 @@ class TestDBWordActions(TestCase):
         dca.delete(fresh_word_entities)
         after_words = Word.objects.all()
         self.assertEqual(len(after_words), 60)
+
+
+class TestUpsertActions(TestCase):
+    """Обновляются только сущности, которые есть в БД: upsert добавил бы недостающие записи"""
+
+    fixtures = ["db"]
+
+    def existing(self, entities, model):
+        ids = set(model.objects.values_list("id", flat=True))
+        return [entity for entity in entities if entity.id in ids]
+
+    def test_course_update_keeps_sync_state(self):
+        Course.objects.update(digest="digest", crawled_at="2021-01-01T00:00:00Z")
+        uca = UpsertCourseActions(reporter=CourseReporter())
+        uca.update(self.existing(fresh_course_entities, Course))
+
+        self.assertEqual(
+            [x.name for x in Course.objects.all()],
+            [
+                "Adjective Complex",
+                "Verbs New Name verb of clothes",
+                "Noun Complex",
+                "Verb Complex",
+                "Animals",
+            ],
+        )
+        self.assertFalse(Course.objects.exclude(digest="digest").exists())
+        self.assertFalse(Course.objects.filter(crawled_at=None).exists())
+
+    def test_course_create(self):
+        fresh_entities = [
+            CourseEntity(
+                id=1,
+                name="course 1",
+                url="/course/1",
+                difficult=1,
+                num_words=1,
+                num_levels=1,
+                difficult_url="/difficult/1",
+            ),
+        ]
+        uca = UpsertCourseActions(reporter=CourseReporter())
+        uca.create(fresh_entities)
+
+        course = Course.objects.get(id=1)
+        self.assertEqual((course.name, course.digest, course.is_disable), ("course 1", "", False))
+
+    def test_level_update(self):
+        ula = UpsertLevelActions(reporter=LevelReporter())
+        ula.update(self.existing(fresh_level_entities, Level))
+
+        update_ids = [x.id for x in fresh_level_entities]
+        self.assertEqual(
+            [f"{x.id} -- {x.name}" for x in Level.objects.filter(id__in=update_ids)],
+            [
+                "1 -- New level",
+                "2 -- New level",
+                "3 -- New level",
+                "52 -- New level",
+                "137 -- Level 123-346",
+                "138 -- New level",
+            ],
+        )
+        self.assertEqual(Level.objects.count(), 29)
+
+    @override_settings(MEMRISE_DB_BATCH_SIZE=4)
+    def test_word_update_in_chunks(self):
+        entities = self.existing(fresh_word_entities, Word)
+        uwa = UpsertWordActions(reporter=WordReporter())
+        # Одна вставка с обновлением на пачку вместо UPDATE с CASE WHEN.
+        with self.assertNumQueries(3):
+            uwa.update(entities)
+
+        update_ids = [x.id for x in fresh_word_entities]
+        self.assertEqual(
+            [x.word_b for x in Word.objects.filter(id__in=update_ids)][-3:],
+            ["blah-blah", "blah-blah", "blah-blah"],
+        )
+        self.assertEqual(Word.objects.count(), 70)
+
+    @override_settings(MEMRISE_DB_BATCH_SIZE=2)
+    def test_word_create_keeps_duplicates(self):
+        fresh_entities = [
+            # id уже есть в БД в другом уровне, слово того уровня не перезаписывается.
+            WordEntity(id=204850790, level_id=2, word_a="fair", word_b="translate"),
+            WordEntity(id=1, level_id=1, word_a="test a 1", word_b="translate b 1"),
+            WordEntity(id=1, level_id=2, word_a="test a 1", word_b="translate b 1"),
+        ]
+        uwa = UpsertWordActions(reporter=WordReporter())
+        uwa.create(fresh_entities)
+
+        self.assertEqual(Word.objects.count(), 70 + len(fresh_entities))
+        original = Word.objects.get(id=204850790)
+        self.assertEqual((original.level_id, original.word_b), (1, "справедливый, честный"))
+        self.assertEqual(Word.objects.filter(id__lt=0).count(), 2)
+
+
+class TestCopyActions(TestCase):
+    fixtures = ["db"]
+
+    def test_copy_value(self):
+        self.assertEqual(copy_value(None), "\\N")
+        self.assertEqual(copy_value(True), "t")
+        self.assertEqual(copy_value(12), "12")
+        self.assertEqual(copy_value("a\tb\nc\\d"), "a\\tb\\nc\\\\d")
+
+    def test_copy_reader(self):
+        reader = CopyReader(iter(["1\ta\n", "2\tb\n", "3\tc\n"]))
+        self.assertEqual(reader.read(5), "1\ta\n2\tb\n")
+        self.assertEqual(reader.read(-1), "3\tc\n")
+        self.assertEqual(reader.read(5), "")
+
+    @override_settings(MEMRISE_DB_BATCH_SIZE=2)
+    def test_load(self):
+        courses = [
+            CourseEntity(
+                id=course_id,
+                name=f"course {course_id}",
+                url=f"/course/{course_id}",
+                difficult=0,
+                num_words=2,
+                num_levels=1,
+                difficult_url=f"/difficult/{course_id}",
+            )
+            for course_id in (1, 2, 3)
+        ]
+        levels = [
+            LevelEntity(id=9000 + course_id, number=1, course_id=course_id, name="level")
+            for course_id in (1, 2, 3)
+        ]
+        words = [
+            WordEntity(id=1, level_id=9001, word_a="tab\there", word_b="new\nline"),
+            WordEntity(id=2, level_id=9002, word_a="back\\slash", word_b=""),
+            WordEntity(id=1, level_id=9003, word_a="tab\there", word_b="new\nline"),
+            # id уже есть в БД в другом уровне.
+            WordEntity(id=204850790, level_id=9003, word_a="fair", word_b="translate"),
+        ]
+
+        CopyCourseActions(reporter=CourseReporter()).create(courses)
+        CopyLevelActions(reporter=LevelReporter()).create(levels)
+        CopyWordActions(reporter=WordReporter()).create(words)
+
+        self.assertEqual(Course.objects.filter(id__in=[1, 2, 3]).count(), 3)
+        self.assertEqual(Level.objects.filter(course_id__in=[1, 2, 3]).count(), 3)
+        self.assertEqual(Word.objects.count(), 70 + len(words))
+        self.assertEqual(Word.objects.get(id=1).word_a, "tab\there")
+        self.assertEqual(Word.objects.get(id=2).word_a, "back\\slash")
+        self.assertEqual(Word.objects.get(id=204850790).level_id, 1)
+        self.assertEqual(Word.objects.filter(id__lt=0).count(), 2)
+
+    @skipUnless(connection.vendor == "postgresql", "COPY FROM STDIN есть только в PostgreSQL")
+    def test_copy_load_merges_existing(self):
+        course = Course.objects.get(id=1987730)
+        course.name = "merged"
+        copy_load(Course, iter([course]), ["name"])
+
+        self.assertEqual(Course.objects.get(id=1987730).name, "merged")
+        self.assertEqual(Course.objects.count(), 5)
+
+    @skipUnless(connection.vendor == "postgresql", "COPY FROM STDIN есть только в PostgreSQL")
+    def test_copy_load_twice_in_transaction(self):
+        """Временная таблица удаляется сразу, TestCase держит все загрузки в одной транзакции"""
+        words = [
+            WordEntity(id=1, level_id=1, word_a="first", word_b="load"),
+            WordEntity(id=2, level_id=1, word_a="second", word_b="load"),
+        ]
+        actions = CopyWordActions(reporter=WordReporter())
+        actions.create(words[:1])
+        actions.create(words[1:])
+
+        self.assertEqual(Word.objects.count(), 70 + len(words))
+        self.assertEqual(Word.objects.get(id=2).word_a, "second")
@@ -0,0 +1,292 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import time
+from typing import List, Optional
+from unittest.mock import patch
+
+from aiohttp import ClientResponseError, ServerDisconnectedError
+from asynctest import CoroutineMock
+from django.test import TestCase
+
+from memrise.core.modules.api.async_api import AsyncAPI
+from memrise.core.modules.api.base import API
+from memrise.core.modules.api.errors import APIError
+from memrise.core.modules.api.html_cache import HTMLCache
+from memrise.core.modules.api.rate_limiter import RateLimiter, shared_rate_limiter
+from memrise.core.modules.api.retry import RetryPolicy
+from memrise.core.responses.structs import LevelStruct
+from memrise.tests.helpers import isolate_storage
+
+LEVEL = LevelStruct(1, 1, 1, "level", [[10, "word", "слово", True]])
+
+
+class ResponseStub:
+    status = 200
+    content = b""
+    headers = {"ETag": '"v1"'}
+    requested = 0
+    in_flight = 0
+    max_in_flight = 0
+
+    def raise_for_status(self) -> None:
+        pass
+
+    async def text(self) -> str:
+        return "<html></html>"
+
+    async def __aenter__(self) -> "ResponseStub":
+        cls = type(self)
+        cls.requested += 1
+        cls.in_flight += 1
+        cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        await asyncio.sleep(0.01)
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        type(self).in_flight -= 1
+
+
+class TestAsyncAPI(TestCase):
+    def setUp(self) -> None:
+        ResponseStub.in_flight = 0
+        ResponseStub.requested = 0
+        ResponseStub.max_in_flight = 0
+        # AsyncAPI() берет общий ограничитель, его состояние не переносится между тестами.
+        if (limiter := shared_rate_limiter()) is not None:
+            limiter.reset()
+        isolate_storage(self)
+
+    @patch("aiohttp.ClientSession.request", lambda *_, **__: ResponseStub())
+    def test_crawl_session_bounds_concurrency(self):
+        api = AsyncAPI(concurrency=3, limit_per_host=3)
+
+        async def crawl():
+            async with api.crawl_session() as session:
+                self.assertIs(api._session, session)
+                return await asyncio.gather(
+                    *[api.get_level(f"/course/1/level/{idx}") for idx in range(20)]
+                )
+
+        result = asyncio.run(crawl())
+        self.assertEqual(len(result), 20)
+        self.assertEqual(ResponseStub.max_in_flight, 3)
+        self.assertIsNone(api._session)
+
+    @patch("aiohttp.ClientSession.request", lambda *_, **__: ResponseStub())
+    def test_get_level_without_crawl_session(self):
+        api = AsyncAPI()
+        result = asyncio.run(api.get_level("/course/1/level/1"))
+        self.assertEqual(result, "<html></html>")
+        self.assertIsNone(api._session)
+
+    @patch("aiohttp.ClientSession.request", lambda *_, **__: ResponseStub())
+    def test_get_level_from_html_cache(self):
+        with TemporaryDirectory() as tmp:
+            api = AsyncAPI(cache=HTMLCache(root=Path(tmp)))
+            first = asyncio.run(api.get_level("/course/1/level/1"))
+            second = asyncio.run(api.get_level("/course/1/level/1"))
+
+            self.assertEqual(first, second)
+            self.assertEqual(ResponseStub.requested, 1)
+            validator = api.validators.get("https://app.memrise.com/course/1/level/1")
+            self.assertEqual(validator.etag, '"v1"')
+
+    @patch("aiohttp.ClientSession.request", lambda *_, **__: ResponseStub())
+    def test_same_content_is_not_modified(self):
+        with TemporaryDirectory() as tmp:
+            api = AsyncAPI(cache=HTMLCache(root=Path(tmp), ttl=60))
+            first = asyncio.run(api.get_level_page("/course/1/level/1"))
+            self.assertFalse(first.not_modified)
+            api.validators.put_level(first.url, first.digest, LEVEL)
+
+            # Запись устарела, memrise отдал ту же страницу целиком.
+            with patch("memrise.core.modules.api.html_cache.time", return_value=time() + 61):
+                second = asyncio.run(api.get_level_page("/course/1/level/1"))
+            self.assertTrue(second.not_modified)
+            self.assertEqual(second.digest, first.digest)
+            self.assertEqual(second.level, LEVEL)
+            self.assertEqual(ResponseStub.requested, 2)
+
+    def test_conditional_request_without_html_cache(self):
+        """Условный запрос уровня идет и с выключенным кешем страниц"""
+        api = AsyncAPI(cache=None)
+        request_headers = []
+
+        def request(*_, headers, **__):
+            request_headers.append(headers)
+            stub = ResponseStub()
+            stub.status = 304 if headers else 200
+            return stub
+
+        with patch("aiohttp.ClientSession.request", request):
+            first = asyncio.run(api.get_level_page("/course/1/level/1"))
+            # Уровень еще не разобран, по ответу 304 отдать нечего: запрос безусловный.
+            asyncio.run(api.get_level_page("/course/1/level/1"))
+            api.validators.put_level(first.url, first.digest, LEVEL)
+            second = asyncio.run(api.get_level_page("/course/1/level/1"))
+
+        self.assertEqual(request_headers, [{}, {}, {"If-None-Match": '"v1"'}])
+        self.assertTrue(second.not_modified)
+        self.assertEqual(second.level, LEVEL)
+
+
+class SyncResponseStub:
+    def __init__(self, status_code: int, text: str = "") -> None:
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode()
+        self.headers = {"ETag": '"v1"', "Last-Modified": "Mon, 01 Feb 2021 00:00:00 GMT"}
+
+
+class TestAPI(TestCase):
+    def setUp(self) -> None:
+        isolate_storage(self)
+
+    def test_dashboard_conditional_request(self):
+        responses = [SyncResponseStub(200, '{"courses": []}'), SyncResponseStub(304)]
+        with TemporaryDirectory() as tmp, patch.object(
+            API, "request", side_effect=lambda *_, **__: responses.pop(0)
+        ) as request:
+            api = API(cache=HTMLCache(root=Path(tmp), ttl=60))
+            self.assertEqual(api.load_dashboard_courses({"page": 1}), {"courses": []})
+            # Dashboard не отдается из кеша без запроса, даже если запись свежая.
+            self.assertEqual(api.load_dashboard_courses({"page": 1}), {"courses": []})
+
+        self.assertEqual(request.call_count, 2)
+        self.assertEqual(
+            request.call_args[1]["headers"],
+            {
+                "If-None-Match": '"v1"',
+                "If-Modified-Since": "Mon, 01 Feb 2021 00:00:00 GMT",
+            },
+        )
+
+    def test_get_level_from_html_cache(self):
+        with TemporaryDirectory() as tmp, patch.object(
+            API, "request", return_value=SyncResponseStub(200, "<html></html>")
+        ) as request:
+            api = API(cache=HTMLCache(root=Path(tmp), ttl=60))
+            self.assertEqual(api.get_level("/course/1/level/1"), "<html></html>")
+            self.assertEqual(api.get_level("/course/1/level/1"), "<html></html>")
+
+        self.assertEqual(request.call_count, 1)
+
+    def test_session_per_thread(self):
+        api = API(cache=None)
+        session = api._session
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            self.assertFalse(pool.submit(lambda: api._session is session).result())
+        self.assertIs(api._session, session)
+
+
+class FlakyResponseStub(ResponseStub):
+    """Ответы по очереди из `statuses`, `None` - обрыв соединения"""
+
+    statuses: List[Optional[int]] = []
+    retry_after: Optional[str] = None
+
+    async def __aenter__(self) -> "FlakyResponseStub":
+        cls = type(self)
+        cls.requested += 1
+        self.status = cls.statuses.pop(0) if cls.statuses else 200
+        if self.status is None:
+            raise ServerDisconnectedError()
+        self.headers = {"Retry-After": cls.retry_after} if cls.retry_after else {}
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        pass
+
+    def raise_for_status(self) -> None:
+        if self.status >= 400:
+            raise ClientResponseError(None, (), status=self.status)
+
+
+@patch("aiohttp.ClientSession.request", lambda *_, **__: FlakyResponseStub())
+@patch("asyncio.sleep", new_callable=CoroutineMock)
+class TestAsyncAPIRetry(TestCase):
+    def setUp(self) -> None:
+        FlakyResponseStub.requested = 0
+        FlakyResponseStub.retry_after = None
+        isolate_storage(self)
+        self.api = AsyncAPI(
+            retry=RetryPolicy(retries=2, backoff=0.5, max_delay=30), limiter=None
+        )
+
+    def test_retry_server_error(self, sleep):
+        FlakyResponseStub.statuses = [502, None]
+        result = asyncio.run(self.api.get_level("/course/1/level/1"))
+        self.assertEqual(result, "<html></html>")
+        self.assertEqual(FlakyResponseStub.requested, 3)
+        self.assertEqual(sleep.call_count, 2)
+        self.assertTrue(all(0 <= call[0][0] <= 1 for call in sleep.call_args_list))
+
+    def test_retry_after(self, sleep):
+        FlakyResponseStub.statuses = [429]
+        FlakyResponseStub.retry_after = "7"
+        asyncio.run(self.api.get_level("/course/1/level/1"))
+        sleep.assert_called_once_with(7.0)
+
+    def test_retries_exhausted(self, sleep):
+        FlakyResponseStub.statuses = [503, 503, 503]
+        with self.assertRaises(ClientResponseError):
+            asyncio.run(self.api.get_level("/course/1/level/1"))
+        self.assertEqual(FlakyResponseStub.requested, 3)
+
+    def test_client_error_not_retried(self, sleep):
+        FlakyResponseStub.statuses = [404]
+        with self.assertRaises(ClientResponseError):
+            asyncio.run(self.api.get_level("/course/1/level/1"))
+        self.assertEqual(FlakyResponseStub.requested, 1)
+        sleep.assert_not_called()
+
+    def test_rate_limiter_observes_attempts(self, sleep):
+        FlakyResponseStub.statuses = [502]
+        self.api.limiter = RateLimiter(rate=10, burst=10)
+        asyncio.run(self.api.get_level("/course/1/level/1"))
+        stats = self.api.limiter.stats()
+        self.assertEqual((stats.requests, stats.throttled), (2, 1))
+        self.assertEqual(stats.rate, 5.2)
+
+
+@patch("memrise.core.modules.api.base.sleep")
+class TestAPIRetry(TestCase):
+    def setUp(self) -> None:
+        isolate_storage(self)
+        self.api = API(
+            cache=None,
+            retry=RetryPolicy(retries=2, backoff=0.5, max_delay=30),
+            limiter=RateLimiter(rate=10, burst=10),
+        )
+
+    def request(self, *statuses: int, retry_after: Optional[str] = None):
+        responses = [SyncResponseStub(status) for status in statuses]
+        if retry_after is not None:
+            responses[0].headers["Retry-After"] = retry_after
+        return patch("requests.Session.request", side_effect=lambda *_, **__: responses.pop(0))
+
+    def test_retry_server_error(self, sleep):
+        with self.request(502, 200) as request:
+            response = self.api.request("GET", "/course/1/level/1")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(request.call_count, 2)
+        sleep.assert_called_once()
+
+    def test_retry_after(self, sleep):
+        with self.request(429, 200, retry_after="7"):
+            self.api.request("GET", "/course/1/level/1")
+        sleep.assert_called_once_with(7.0)
+
+    def test_retries_exhausted(self, sleep):
+        with self.request(503, 503, 503) as request, self.assertRaises(APIError):
+            self.api.request("GET", "/course/1/level/1")
+        self.assertEqual(request.call_count, 3)
+
+    def test_rate_limiter_observes_attempts(self, sleep):
+        with self.request(502, 200):
+            self.api.request("GET", "/course/1/level/1")
+        stats = self.api.limiter.stats()
+        self.assertEqual((stats.requests, stats.throttled), (2, 1))
+        self.assertEqual(stats.rate, 5.2)
@@ -0,0 +1,87 @@
+from contextlib import contextmanager
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase
+
+from memrise.models import Word
+from memrise.tests.helpers import isolate_storage
+
+# Набор замеров, размер и строки, которые должны быть в отчете.
+SUITES = (
+    ("parsers", 10, ("RegularLXML [fixture]", "SinglePassLXML [synthetic-10]", "words/s")),
+    (
+        "selectors",
+        1000,
+        ("WordSelector legacy dict [1000]", "WordSelector values [1000]", "courses/s"),
+    ),
+    (
+        "word_actions",
+        200,
+        (
+            "DBWordActions.create legacy [sqlite-200]",
+            "DBWordActions.create batched [sqlite-200]",
+            "UpsertWordActions.create [sqlite-200]",
+            "UpsertWordActions.update [sqlite-200]",
+        ),
+    ),
+    (
+        "bulk_load",
+        200,
+        ("DBActionsBatch load [sqlite-200]", "CopyActionsBatch load [sqlite-200]"),
+    ),
+    (
+        "db_levels",
+        200,
+        ("DBRep.get_levels legacy [sqlite-200]", "DBRep.get_levels values_list [sqlite-200]"),
+    ),
+    ("entities", 200, ("WordEntity create [200]", "LegacyWord (pydantic) create [200]")),
+    (
+        "word_columns",
+        1000,
+        ("WordColumns snapshot [1000]", "WordColumnsSelector match [1000]"),
+    ),
+    (
+        "factories",
+        200,
+        ("FactoryHandler legacy [sqlite-200]", "FactoryHandler dispatch [sqlite-200]"),
+    ),
+    (
+        "update",
+        2,
+        ("UpdateManager.update cold [sqlite-2]", "UpdateManager.update incremental [sqlite-2]"),
+    ),
+)
+
+
+@contextmanager
+def current_database():
+    """Тесты уже идут в тестовой БД, отдельная БД для замеров не нужна"""
+    yield connection.vendor
+
+
+class TestBenchmarkCommand(TestCase):
+    def setUp(self) -> None:
+        isolate_storage(self)
+
+    def test_suites(self):
+        for suite, size, expected in SUITES:
+            with self.subTest(suite=suite):
+                out = StringIO()
+                # Замеры без своей БД не трогают isolated_database, патч его просто добавляет.
+                with patch(
+                    f"memrise.benchmarks.{suite}.isolated_database", current_database, create=True
+                ):
+                    call_command("benchmark", suite, repeat=1, size=size, stdout=out)
+                output = out.getvalue()
+                for line in expected:
+                    self.assertIn(line, output)
+
+        # Замер обновления, последний в списке, оставляет импортированные слова в БД.
+        self.assertEqual(Word.objects.filter(level__course_id__in=[1, 2]).count(), 500)
+
+    def test_unknown_suite(self):
+        with self.assertRaises(CommandError):
+            call_command("benchmark", "unknown", repeat=1, stdout=StringIO())
@@ -0,0 +1,50 @@
+import asyncio
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from memrise.core.modules.api.async_api import AsyncAPI
+from memrise.core.modules.api.cassette import Cassette, request_key
+from memrise.tests.helpers import isolate_storage
+from memrise.tests.modules.test_api import ResponseStub
+
+
+class TestCassette(TestCase):
+    def setUp(self) -> None:
+        self.tmp = TemporaryDirectory()
+        self.cassette = Cassette(path=Path(self.tmp.name) / "cassette.jsonl")
+        isolate_storage(self)
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_request_key(self):
+        self.assertEqual(
+            request_key("get", "https://app.memrise.com/ajax/courses/dashboard?offset=5"),
+            ("GET", "/ajax/courses/dashboard?offset=5"),
+        )
+        self.assertEqual(request_key("GET", "/course/1/level/1"), ("GET", "/course/1/level/1"))
+
+    def test_record_and_load(self):
+        url = "https://app.memrise.com/course/1/level/1"
+        self.cassette.record("GET", url, 200, {"ETag": '"v1"', "Set-Cookie": "x"}, "<html>")
+        self.cassette.record("GET", url, 304, {"ETag": '"v1"'}, "")
+        self.cassette.record("GET", f"{url}0", 200, {}, "<html>0")
+
+        recordings = self.cassette.load()
+        recording = recordings[("GET", "/course/1/level/1")]
+        # Ответ 304 не заменяет записанную страницу, заголовки вне RECORDED_HEADERS не пишутся.
+        self.assertEqual((recording.status, recording.body), (200, "<html>"))
+        self.assertEqual(recording.headers, {"ETag": '"v1"'})
+        self.assertEqual(len(recordings), 2)
+
+    @patch("aiohttp.ClientSession.request", lambda *_, **__: ResponseStub())
+    def test_async_api_records_responses(self):
+        api = AsyncAPI(cassette=self.cassette, limiter=None)
+        asyncio.run(api.get_level("/course/1/level/1"))
+
+        recording = self.cassette.load()[("GET", "/course/1/level/1")]
+        self.assertEqual(recording.body, "<html></html>")
+        self.assertEqual(recording.headers, {"ETag": '"v1"'})
@@ -15,3 +15,9 @@ class TestDashboardCounter(TestCase):
         dc.reset()
         dc.next()
         self.assertEqual(dc.offset, 0)
+
+    def test_page(self):
+        dc = MemriseRequestCounter()
+        self.assertEqual(dc.page(3)["offset"], 3 * STEP)
+        self.assertEqual(dc.page(3)["limit"], dc.limit)
+        self.assertEqual(dc.offset, START_OFFSET)
@@ -0,0 +1,78 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import time
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from memrise.core.domains.entities import LevelEntity, WordEntity
+from memrise.core.modules.crawl_checkpoint import CrawlCheckpoint
+from memrise.core.modules.parsing.executor import level_from_struct
+
+URL = "https://app.memrise.com/course/1/level/1"
+DIGEST = "digest"
+
+
+def make_level(level_id: int) -> LevelEntity:
+    level = LevelEntity(id=level_id, number=level_id, course_id=1, name=f"level {level_id}")
+    level.add_words([WordEntity(id=level_id * 10, level_id=level_id, word_a="a", word_b="б")])
+    return level
+
+
+class TestCrawlCheckpoint(TestCase):
+    def setUp(self) -> None:
+        self.tmp = TemporaryDirectory()
+        self.checkpoint = CrawlCheckpoint(path=Path(self.tmp.name) / "checkpoint.jsonl")
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_save_and_load(self):
+        self.assertEqual(self.checkpoint.load(), {})
+        self.checkpoint.save(URL, DIGEST, make_level(1))
+        self.checkpoint.save(f"{URL}0", DIGEST, make_level(2))
+
+        levels = self.checkpoint.load()
+        self.assertEqual(list(levels), [URL, f"{URL}0"])
+        self.assertEqual(levels[URL].dashboard_digest, DIGEST)
+        self.assertEqual(level_from_struct(levels[URL].level), make_level(1))
+        run_id = self.checkpoint.run_id
+        self.assertTrue(run_id)
+
+        # Продолжение обхода дописывает уровни под заголовком того же обхода.
+        self.checkpoint.save(f"{URL}00", DIGEST, make_level(3))
+        self.assertEqual(len(self.checkpoint.load()), 3)
+        self.assertEqual(self.checkpoint.run_id, run_id)
+
+    def test_broken_line_rewritten(self):
+        self.checkpoint.save(URL, DIGEST, make_level(1))
+        with self.checkpoint.path.open("a") as f:
+            f.write('["https://app.memrise.com/course/1/level/2", [2, 2')
+
+        self.assertEqual(list(self.checkpoint.load()), [URL])
+        self.checkpoint.save(f"{URL}0", DIGEST, make_level(2))
+        self.assertEqual(list(self.checkpoint.load()), [URL, f"{URL}0"])
+
+    def test_max_age(self):
+        self.checkpoint.max_age = 60
+        self.checkpoint.save(URL, DIGEST, make_level(1))
+        self.assertEqual(list(self.checkpoint.load()), [URL])
+
+        # Дозапись не продлевает срок: он отсчитывается от начала обхода.
+        with patch("memrise.core.modules.crawl_checkpoint.time", return_value=time() + 50):
+            self.checkpoint.save(f"{URL}0", DIGEST, make_level(2))
+        with patch("memrise.core.modules.crawl_checkpoint.time", return_value=time() + 61):
+            self.assertEqual(self.checkpoint.load(), {})
+        self.assertFalse(self.checkpoint.path.exists())
+
+    def test_without_header(self):
+        self.checkpoint.path.write_text('["https://app.memrise.com/course/1/level/1", [1]]\n')
+        self.assertEqual(self.checkpoint.load(), {})
+        self.assertFalse(self.checkpoint.path.exists())
+
+    def test_clear(self):
+        self.checkpoint.clear()
+        self.checkpoint.save(URL, DIGEST, make_level(1))
+        self.checkpoint.clear()
+        self.assertFalse(self.checkpoint.path.exists())
+        self.assertEqual(self.checkpoint.run_id, "")
@@ -0,0 +1,92 @@
+# type: ignore
+
+from django.test import TestCase
+
+from memrise.core.domains.entities import CourseEntity, LevelEntity
+from memrise.core.modules.factories.factories import (
+    CourseFactory,
+    LevelFactory,
+    WordFactory,
+    factory_mapper,
+)
+from memrise.core.modules.factories.factory_registry import FactoryHandler
+from memrise.core.responses.structs import LevelStruct
+from memrise.models import Course, Word
+
+
+class NamedLevelStruct(LevelStruct):
+    pass
+
+
+class TestFactoryHandler(TestCase):
+    fixtures = ["db"]
+
+    def test_dispatch_by_type(self):
+        courses = factory_mapper.seek(Course.objects.all())
+        self.assertEqual(len(courses), Course.objects.count())
+        self.assertTrue(all(isinstance(course, CourseEntity) for course in courses))
+
+        words = factory_mapper.seek(Word.objects.all())
+        self.assertEqual(
+            sorted(word.id for word in words),
+            sorted(Word.objects.values_list("id", flat=True)),
+        )
+
+    def test_subclass_dispatch(self):
+        levels = factory_mapper.seek(
+            [NamedLevelStruct(id=1, number=1, course_id=1, name="level", words=[])]
+        )
+        self.assertEqual(len(levels), 1)
+        self.assertIsInstance(levels[0], LevelEntity)
+
+    def test_empty_items(self):
+        with self.assertRaises(ValueError):
+            factory_mapper.seek(Word.objects.none())
+        with self.assertRaises(ValueError):
+            factory_mapper.seek([])
+        # Ленивый обход пустых данных просто ничего не отдает.
+        self.assertEqual(list(factory_mapper.iterate([])), [])
+
+    def test_unknown_type(self):
+        with self.assertRaises(ValueError):
+            factory_mapper.seek(["word"])
+
+    def test_lazy_iterate(self):
+        """Сущности создаются по мере обхода, генератор не копируется в список"""
+        consumed = []
+
+        def records():
+            for word in Word.objects.all():
+                consumed.append(word.id)
+                yield word
+
+        entities = factory_mapper.iterate(records())
+        self.assertEqual(len(consumed), 1)
+        first = next(entities)
+        self.assertEqual(first.id, consumed[0])
+        self.assertEqual(len(consumed), 1)
+        self.assertEqual(len(list(entities)) + 1, Word.objects.count())
+
+    def test_strict(self):
+        strict_mapper = FactoryHandler(strict=True)
+        for factory in (CourseFactory, LevelFactory, WordFactory):
+            strict_mapper.register(factory)
+
+        mixed = list(Word.objects.all()[:2]) + [Course.objects.first()]
+        # Без строгого режима проверяется только первый элемент.
+        with self.assertRaises(AttributeError):
+            factory_mapper.seek(mixed)
+        with self.assertRaises(ValueError):
+            strict_mapper.seek(mixed)
+
+    def test_register_conflicts(self):
+        handler = FactoryHandler()
+        handler.register(WordFactory)
+        with self.assertRaises(ValueError):
+            handler.register(WordFactory)
+
+        class OtherWordFactory(WordFactory):
+            pass
+
+        with self.assertRaises(ValueError):
+            handler.register(OtherWordFactory)
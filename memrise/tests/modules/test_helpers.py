@@ -0,0 +1,50 @@
+import asyncio
+import threading
+from time import perf_counter, sleep
+
+from django.test import TestCase
+
+from memrise.core.helpers import iterate_async
+
+
+class TestIterateAsync(TestCase):
+    def test_overlap_with_consumer(self):
+        async def produce():
+            for item in range(5):
+                await asyncio.sleep(0.05)
+                yield item
+
+        start = perf_counter()
+        items = []
+        for item in iterate_async(produce()):
+            # Пока потребитель занят, event loop готовит следующий элемент.
+            sleep(0.05)
+            items.append(item)
+
+        self.assertEqual(items, list(range(5)))
+        self.assertLess(perf_counter() - start, 0.45)
+
+    def test_error_raised_to_consumer(self):
+        async def produce():
+            yield 1
+            raise ValueError("broken")
+
+        stream = iterate_async(produce())
+        self.assertEqual(next(stream), 1)
+        with self.assertRaisesRegex(ValueError, "broken"):
+            next(stream)
+
+    def test_closed_early(self):
+        closed = threading.Event()
+
+        async def produce():
+            try:
+                for item in range(100):
+                    yield item
+            finally:
+                closed.set()
+
+        stream = iterate_async(produce(), maxsize=2)
+        self.assertEqual(next(stream), 0)
+        stream.close()
+        self.assertTrue(closed.is_set())
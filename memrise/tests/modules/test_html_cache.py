@@ -0,0 +1,101 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import time
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from memrise.core.modules.api.html_cache import HTMLCache
+
+URL = "https://app.memrise.com/course/1/level/1"
+
+
+class TestHTMLCache(TestCase):
+    def setUp(self) -> None:
+        self.tmp = TemporaryDirectory()
+        self.cache = HTMLCache(root=Path(self.tmp.name))
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_put_and_lookup(self):
+        self.assertIsNone(self.cache.lookup(URL))
+        self.cache.put(URL, "<html>уровень</html>")
+
+        self.assertEqual(self.cache.lookup(URL), "<html>уровень</html>")
+
+    def test_content_addressed(self):
+        first = self.cache.put(URL, "<html></html>")
+        second = self.cache.put(f"{URL}0", "<html></html>")
+        self.assertEqual(first.digest, second.digest)
+        self.assertEqual(len(list(self.cache.root.glob("objects/*/*.gz"))), 1)
+        self.assertEqual(
+            sorted(url for url, _ in self.cache.pages()), [URL, f"{URL}0"]
+        )
+
+    def test_ttl(self):
+        self.cache.ttl = 60
+        self.cache.put(URL, "<html></html>")
+        self.assertIsNotNone(self.cache.lookup(URL))
+
+        with patch("memrise.core.modules.api.html_cache.time", return_value=time() + 61):
+            self.assertIsNone(self.cache.lookup(URL))
+            # Устаревшая запись остается на диске.
+            self.assertIsNotNone(self.cache.get(URL))
+
+    def test_lru_eviction(self):
+        pages = {f"{URL}{idx}": os.urandom(2000).hex() for idx in range(3)}
+        for idx, (url, html) in enumerate(pages.items()):
+            entry = self.cache.put(url, html)
+            path = self.cache.object_path(entry.digest)
+            os.utime(path, (idx, idx))
+        object_size = path.stat().st_size
+
+        # Первая страница прочитана последней, вытесняется вторая.
+        first_url = next(iter(pages))
+        self.cache.read(self.cache.get(first_url))
+        self.cache.max_size = object_size * 2 + object_size // 2
+        self.cache.put(f"{URL}new", "<html></html>")
+
+        # Запись вытесненной страницы удаляется вместе с объектом.
+        self.assertFalse(self.cache.entry_path(f"{URL}1").exists())
+        self.assertIsNotNone(self.cache.lookup(first_url))
+        self.assertIsNone(self.cache.lookup(f"{URL}1"))
+        self.assertIsNone(self.cache.get(f"{URL}1"))
+        self.assertIsNotNone(self.cache.lookup(f"{URL}new"))
+
+    def test_evict_to_low_water(self):
+        """Объекты просматриваются только при переходе через `max_size`, а не на каждой записи"""
+        pages = [os.urandom(1000).hex() for _ in range(30)]
+        self.cache.put(f"{URL}0", pages[0])
+        object_size = next(self.cache._objects())[1]
+        self.cache.max_size = object_size * 20 + object_size // 2
+
+        with patch.object(self.cache, "_objects", wraps=self.cache._objects) as scan:
+            for idx, html in enumerate(pages[1:], start=1):
+                self.cache.put(f"{URL}{idx}", html)
+
+        # Первый просмотр считает размер. Дальше 21-я страница вытесняет три старых, до 90%
+        # от `max_size`, и следующий просмотр нужен только через три записи: 21, 24, 27 и 30.
+        self.assertEqual(scan.call_count, 5)
+        self.assertEqual(len(list(self.cache.root.glob("entries/*.json"))), 18)
+        self.assertLessEqual(self.cache._size, self.cache.max_size)
+        self.assertEqual(self.cache._size, sum(size for _, size, _ in self.cache._objects()))
+
+    def test_concurrent_put_size(self):
+        self.cache.max_size = 10 ** 9
+        self.cache.evict()
+        pages = [f"<html>{idx % 20}</html>" for idx in range(200)]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda idx: self.cache.put(f"{URL}{idx}", pages[idx]), range(200)))
+
+        # Одинаковые страницы из разных потоков учитываются в размере один раз.
+        self.assertEqual(self.cache._size, sum(size for _, size, _ in self.cache._objects()))
+
+    def test_broken_entry(self):
+        self.cache.put(URL, "<html></html>")
+        self.cache.entry_path(URL).write_text("{")
+        self.assertIsNone(self.cache.lookup(URL))
+        self.assertFalse(self.cache.entry_path(URL).exists())
@@ -0,0 +1,71 @@
+import asyncio
+
+from django.conf import settings
+from django.test import TestCase
+
+from memrise.core.modules.parsing.base import parser_registry
+from memrise.core.modules.parsing.executor import ParseExecutor
+from memrise.core.modules.parsing.regular_lxml import RegularLXML
+from memrise.core.modules.parsing.single_pass_lxml import SinglePassLXML
+from memrise.tests.synthetic import level_page
+
+LEVEL_TEXT_FIXTURE = settings.RESOURSES / "fixtures/level_text_response.html"
+
+
+class TestParseExecutor(TestCase):
+    def setUp(self) -> None:
+        with LEVEL_TEXT_FIXTURE.open() as f:
+            self.response = f.read()
+
+    def test_parse_in_loop_for_small_crawl(self):
+        executor = ParseExecutor(RegularLXML(), workers=2, threshold=10)
+        with executor.pool(num_pages=1):
+            self.assertIsNone(executor._pool)
+            level = asyncio.run(executor.parse(self.response, 1))
+
+        self.assertEqual(level.id, 7365190)
+        self.assertEqual(len(level.words), 20)
+
+    def test_parse_in_process_pool(self):
+        expected = RegularLXML().parse(self.response, 3)
+        executor = ParseExecutor(RegularLXML(), workers=2, threshold=1)
+        with executor.pool(num_pages=1):
+            self.assertIsNotNone(executor._pool)
+            level = asyncio.run(executor.parse(self.response, 3))
+
+        self.assertIsNone(executor._pool)
+        self.assertEqual(level, expected)
+
+
+class TestSinglePassLXML(TestCase):
+    def setUp(self) -> None:
+        with LEVEL_TEXT_FIXTURE.open() as f:
+            self.response = f.read()
+
+    def test_parse_same_as_regular(self):
+        expected = RegularLXML().parse(self.response, 1)
+        level = SinglePassLXML().parse(self.response, 1)
+        self.assertEqual(level, expected)
+        self.assertEqual(len(level.words), 20)
+
+    def test_parse_missing_word_column(self):
+        response = self.response.replace(
+            '<div class="col_b col text">\n                <div class="text">справедливый, честный</div>',
+            '<div class="col_b">\n                <div class="text">справедливый, честный</div>',
+        )
+        level = SinglePassLXML().parse(response, 1)
+        self.assertEqual(level.words[0].word_a, "fair")
+        self.assertEqual(level.words[0].word_b, "N/A")
+
+    def test_parse_synthetic_page(self):
+        response = level_page(30, level_id=11, course_id=22, first_word_id=100)
+        level = SinglePassLXML().parse(response, 4)
+        self.assertEqual((level.id, level.course_id, level.number), (11, 22, 4))
+        self.assertEqual([word.id for word in level.words], list(range(100, 130)))
+        self.assertEqual(level, RegularLXML().parse(response, 4))
+
+
+class TestParserRegistry(TestCase):
+    def test_registered_parsers(self):
+        self.assertIs(parser_registry["RegularLXML"], RegularLXML)
+        self.assertIs(parser_registry["SinglePassLXML"], SinglePassLXML)
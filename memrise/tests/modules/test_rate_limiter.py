@@ -0,0 +1,57 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from memrise.core.modules.api.rate_limiter import RateLimiter, RateStats
+
+
+class TestRateLimiter(TestCase):
+    def setUp(self) -> None:
+        self.limiter = RateLimiter(
+            rate=10, min_rate=1, max_rate=12, burst=2, target_latency=1, cooldown=60
+        )
+
+    def test_burst_then_rate(self):
+        self.assertEqual([self.limiter.reserve() for _ in range(2)], [0, 0])
+        self.assertAlmostEqual(self.limiter.reserve(), 0.1, delta=0.01)
+        self.assertAlmostEqual(self.limiter.reserve(), 0.2, delta=0.01)
+
+    def test_additive_increase(self):
+        self.limiter.observe(200, 0.1)
+        self.assertAlmostEqual(self.limiter.rate, 10.1)
+        for _ in range(100):
+            self.limiter.observe(200, 0.1)
+        self.assertEqual(self.limiter.rate, 12)
+
+    def test_multiplicative_decrease_once_per_cooldown(self):
+        for status in (429, 502, None):
+            self.limiter.observe(status, 0.1)
+        self.assertEqual(self.limiter.rate, 5)
+
+        with patch(
+            "memrise.core.modules.api.rate_limiter.monotonic",
+            return_value=self.limiter._decreased_at + 61,
+        ):
+            self.limiter.observe(200, 3)
+        self.assertEqual(self.limiter.rate, 2.5)
+        self.assertEqual(self.limiter.stats().throttled, 2)
+        self.assertEqual(self.limiter.stats().requests, 4)
+
+    def test_min_rate(self):
+        self.limiter.cooldown = 0
+        for _ in range(10):
+            self.limiter.observe(503, 0.1)
+        self.assertEqual(self.limiter.rate, 1)
+
+    def test_retry_after_pauses_requests(self):
+        self.limiter.observe(429, 0.1, retry_after="5")
+        self.assertAlmostEqual(self.limiter.reserve(), 5, delta=0.01)
+
+    def test_reset(self):
+        self.limiter.observe(429, 0.1, retry_after="30")
+        self.limiter.reset()
+        self.assertEqual(self.limiter.rate, 10)
+        self.assertEqual(
+            self.limiter.stats(), RateStats(rate=10, latency=0, requests=0, throttled=0)
+        )
+        self.assertEqual(self.limiter.reserve(), 0)
@@ -0,0 +1,29 @@
+from email.utils import formatdate
+from time import time
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from memrise.core.modules.api.retry import RetryPolicy, parse_retry_after
+
+
+class TestRetryPolicy(TestCase):
+    def test_parse_retry_after(self):
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after("soon"))
+        self.assertEqual(parse_retry_after("12"), 12.0)
+        self.assertEqual(parse_retry_after("-1"), 0.0)
+        self.assertAlmostEqual(
+            parse_retry_after(formatdate(time() + 60, usegmt=True)), 60, delta=2
+        )
+
+    def test_exponential_delay(self):
+        policy = RetryPolicy(retries=5, backoff=0.5, max_delay=3)
+        with patch("memrise.core.modules.api.retry.random.uniform", lambda _, high: high):
+            self.assertEqual([policy.delay(attempt) for attempt in range(1, 6)], [0.5, 1, 2, 3, 3])
+
+    def test_retry_after_overrides_backoff(self):
+        policy = RetryPolicy(retries=1, backoff=0.5, max_delay=3)
+        self.assertEqual(policy.delay(1, "10"), 10.0)
+        self.assertTrue(policy.is_retryable(429))
+        self.assertFalse(policy.is_retryable(404))
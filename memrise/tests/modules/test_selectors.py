@@ -1,12 +1,15 @@
 from django.test import TestCase
 
 from memrise.core.domains.entities import WordEntity, LevelEntity, CourseEntity
+from memrise.core.domains.word_columns import WordColumns
 from memrise.core.modules.selectors import (
     DiffContainer,
     CourseSelector,
+    WordColumnsSelector,
     WordSelector,
     LevelSelector,
 )
+from memrise.tests.synthetic import course_entities
 
 
 class TestDiffContainer(TestCase):
@@ -169,3 +172,56 @@ class TestSelectors(TestCase):
         self.assertEqual(len(diff.delete), 1)
         self.assertEqual(len(diff.equal), 2)
         self.assertEqual(len(diff.update), 1)
+
+    def test_values_match_same_as_dict_match(self):
+        """Сравнение кортежей значений дает ту же дельту, что и сравнение словарей полей"""
+        actual_courses = course_entities(2, levels_per_course=3, words_per_level=50)
+        fresh_courses = course_entities(
+            2, levels_per_course=3, words_per_level=50, changed_ratio=0.2
+        )
+        actual_words = [w for c in actual_courses for lvl in c.levels for w in lvl.words]
+        fresh_words = [w for c in fresh_courses for lvl in c.levels for w in lvl.words]
+        actual_words.append(
+            WordEntity(id=1000, level_id=1, word_a="removed", word_b="removed")
+        )
+        fresh_words.append(WordEntity(id=1001, level_id=1, word_a="new", word_b="new"))
+
+        diff = WordSelector.match(fresh_words, actual_words)
+        actual_dicts = {word.id: word.dict() for word in actual_words}
+        self.assertEqual(
+            [word.id for word in diff.update],
+            [
+                word.id
+                for word in fresh_words
+                if word.id in actual_dicts and actual_dicts[word.id] != word.dict()
+            ],
+        )
+        self.assertTrue(diff.update)
+        self.assertEqual(len(diff.create), 1)
+        self.assertEqual(len(diff.delete), 1)
+
+    def test_word_columns_match_same_as_word_match(self):
+        """Сравнение колонок дает ту же дельту, что и сравнение сущностей"""
+        actual_courses = course_entities(2, levels_per_course=3, words_per_level=50)
+        fresh_courses = course_entities(
+            2, levels_per_course=3, words_per_level=50, changed_ratio=0.2
+        )
+        actual_words = [w for c in actual_courses for lvl in c.levels for w in lvl.words]
+        fresh_words = [w for c in fresh_courses for lvl in c.levels for w in lvl.words]
+        actual_words.append(
+            WordEntity(id=1000, level_id=1, word_a="removed", word_b="removed")
+        )
+        fresh_words.append(WordEntity(id=1001, level_id=1, word_a="new", word_b="new"))
+        fresh_words[0] = fresh_words[0].copy(
+            update={"is_learned": not fresh_words[0].is_learned}
+        )
+
+        diff = WordColumnsSelector.match(
+            WordColumns.from_entities(fresh_words), WordColumns.from_entities(actual_words)
+        )
+        expected = WordSelector.match(fresh_words, actual_words)
+        for (action, entities), (_, expected_entities) in zip(diff, expected):
+            self.assertEqual(entities, expected_entities, action)
+        self.assertIn(fresh_words[0], diff.update)
+        self.assertEqual(len(diff.create), 1)
+        self.assertEqual(len(diff.delete), 1)
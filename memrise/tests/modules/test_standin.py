@@ -0,0 +1,72 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import requests
+from django.test import TestCase
+
+from memrise.benchmarks.standin import (
+    CassetteSource,
+    StandInServer,
+    SyntheticSource,
+    serve,
+)
+from memrise.core.modules.api.cassette import Cassette
+from memrise.core.modules.parsing.single_pass_lxml import SinglePassLXML
+from memrise.core.responses.course_response import CoursesResponse
+from memrise.shares.contants import DASHBOARD_URL
+
+
+class TestStandInServer(TestCase):
+    def setUp(self) -> None:
+        self.source = SyntheticSource(num_courses=7, levels_per_course=2, words_per_level=3)
+
+    def test_dashboard_pages(self):
+        with serve(StandInServer(self.source)) as host:
+            pages = [
+                requests.get(f"{host}{DASHBOARD_URL}", params={"offset": offset, "limit": 4})
+                for offset in (0, 5)
+            ]
+
+        first, second = [CoursesResponse(**page.json()) for page in pages]
+        self.assertEqual([course.id for course in first.courses], [1, 2, 3, 4, 5])
+        self.assertTrue(first.has_more_courses)
+        self.assertEqual([course.id for course in second.courses], [6, 7])
+        self.assertFalse(second.has_more_courses)
+
+    def test_level_page(self):
+        with serve(StandInServer(self.source)) as host:
+            response = requests.get(f"{host}/course/2/synthetic/2")
+            not_modified = requests.get(
+                f"{host}/course/2/synthetic/2",
+                headers={"If-None-Match": response.headers["ETag"]},
+            )
+            missing = requests.get(f"{host}/course/2/synthetic/3")
+
+        level = SinglePassLXML().parse(response.text, 2)
+        self.assertEqual((level.id, level.course_id, len(level.words)), (2002, 2, 3))
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(missing.status_code, 404)
+
+    def test_error_rate(self):
+        server = StandInServer(self.source, error_rate=1.0)
+        with serve(server) as host:
+            response = requests.get(f"{host}/course/1/synthetic/1")
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(server.responses, {503: 1})
+
+    def test_replay_cassette(self):
+        with TemporaryDirectory() as tmp:
+            cassette = Cassette(path=Path(tmp) / "cassette.jsonl")
+            cassette.record(
+                "GET",
+                "https://app.memrise.com/course/1/level/1",
+                200,
+                {"Content-Type": "text/html; charset=utf-8"},
+                "<html>уровень</html>",
+            )
+            with serve(StandInServer(CassetteSource(cassette))) as host:
+                response = requests.get(f"{host}/course/1/level/1")
+                missing = requests.get(f"{host}/course/1/level/2")
+
+        self.assertEqual(response.text, "<html>уровень</html>")
+        self.assertEqual(missing.status_code, 404)
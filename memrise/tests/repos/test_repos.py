@@ -1,5 +1,10 @@
+import asyncio
 import json
-from typing import Dict
+import threading
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import sleep
+from typing import Dict, List
 from unittest.mock import patch
 
 from aiohttp import web
@@ -10,6 +15,10 @@ from django.test import TestCase
 
 from memrise.core.domains.entities import WordEntity, CourseEntity, LevelEntity
 from memrise.core.modules.actions.actions_batch import DBActionsBatch, JsonActionsBatch
+from memrise.core.modules.api import api, async_api
+from memrise.core.modules.api.rate_limiter import shared_rate_limiter
+from memrise.core.modules.api.retry import RetryPolicy
+from memrise.core.modules.crawl_checkpoint import CrawlCheckpoint
 from memrise.core.modules.factories.factories import factory_mapper
 from memrise.core.modules.selectors import (
     CourseSelector,
@@ -27,12 +36,14 @@ from memrise.tests.data_for_test import (
     fresh_level_entities,
     fresh_word_entities,
 )
+from memrise.tests.helpers import isolate_storage, legacy_get_levels
 
 LEVEL_TEXT_FIXTURE = settings.RESOURSES / "fixtures/level_text_response.html"
 
 
 class ResponseCourseMock:
     status_code = 200
+    headers: Dict = {}
 
     def json(self) -> Dict:
         with DASHBOARD_FIXTURE.open() as f:
@@ -118,9 +129,31 @@ class TestDBRep(TestCase):
         self.assertEqual([len(x.words) for x in level_entities], expected_num_words)
         # fmt: on
 
-    def test__get_word_entities(self):
+    def test_fetch_levels_matches_model_factories(self) -> None:
+        courses = self.repo.get_courses()
+        self.assertEqual(
+            [level.dict() for level in self.repo.get_levels(courses)],
+            [level.dict() for level in legacy_get_levels(courses)],
+        )
+
+    def test_fetch_levels_of_selected_courses(self) -> None:
+        courses = [course for course in self.repo.get_courses() if course.id == 2147115]
+        level_entities = self.repo.get_levels(courses)
+        self.assertEqual({level.course_id for level in level_entities}, {2147115})
+        self.assertEqual(
+            len(level_entities), Level.objects.filter(course_id=2147115).count()
+        )
+
+    def get_level_words(self, level_record: Level) -> List[WordEntity]:
+        courses = [
+            course for course in self.repo.get_courses() if course.id == level_record.course_id
+        ]
+        (level,) = [level for level in self.repo.get_levels(courses) if level.id == level_record.id]
+        return level.words
+
+    def test_get_level_words(self):
         level_record = Level.objects.all().first()
-        word_entities = self.repo._get_word_entities(level_record)
+        word_entities = self.get_level_words(level_record)
         expected = [
             WordEntity(
                 id=204850790, level_id=1, word_a="fair", word_b="справедливый, честный"
@@ -138,10 +171,10 @@ class TestDBRep(TestCase):
         ]
         self.assertEqual(word_entities, expected)
 
-    def test__get_word_if_word_record_is_none(self):
+    def test_get_level_without_words(self):
         level_record = Level.objects.all().first()
         level_record.words.all().delete()
-        word_entities = self.repo._get_word_entities(level_record)
+        word_entities = self.get_level_words(level_record)
         self.assertListEqual(word_entities, [])
 
     def test_save_course(self) -> None:
@@ -212,11 +245,49 @@ class TestDBRep(TestCase):
         self.assertEqual(len(words_after), 20)
         self.assertEqual([x.id for x in words_after], [x for x in range(1, 21)])
 
+    def test_apply_diff_in_chunks(self) -> None:
+        repo = DBRep(DBActionsBatch(), batch_size=3)
+        level = Level.objects.first()
+        actual_word_entities = factory_mapper.seek(Word.objects.filter(level=level))
+        diff = WordSelector.match(fresh_word_entities[:20], actual_word_entities)
+
+        with patch.object(
+            repo.batch.word.__class__, "create", autospec=True
+        ) as create, self.assertLogs("memrise", level="DEBUG") as logs:
+            repo.update_words(diff)
+
+        self.assertEqual([len(call.args[1]) for call in create.call_args_list], [3] * 6 + [2])
+        timings = [line for line in logs.output if "DBWordActions." in line]
+        self.assertEqual(len(timings), 7 + 2)
+        self.assertTrue(timings[6].endswith("DBWordActions.create [2]"))
+
+    def test_apply_diff_rolls_back_on_error(self) -> None:
+        level = Level.objects.first()
+        actual_word_entities = factory_mapper.seek(Word.objects.filter(level=level))
+        diff = WordSelector.match(fresh_word_entities[:20], actual_word_entities)
+
+        with patch.object(
+            self.repo.batch.word.__class__, "delete", side_effect=RuntimeError
+        ), self.assertRaises(RuntimeError):
+            self.repo.update_words(diff)
+
+        # Новые слова, добавленные до ошибки, откатываются вместе со всей транзакцией.
+        self.assertEqual(
+            [x.id for x in Word.objects.filter(level=level)],
+            [204850790, 204850795, 204850798, 204850807],
+        )
+
 
 class TestMemriseRep(AioHTTPTestCase):
     async def get_application(self):
         return web.Application()
 
+    def setUp(self) -> None:
+        super().setUp()
+        isolate_storage(self)
+        if (limiter := shared_rate_limiter()) is not None:
+            limiter.reset()
+
     def set_get_mock_response(self, mock_get, status, json_data):
         mock_get.return_value.__aenter__.return_value.status = status
         mock_get.return_value.__aenter__.return_value.json = CoroutineMock(
@@ -225,9 +296,10 @@ class TestMemriseRep(AioHTTPTestCase):
         mock_get.return_value.__aenter__.return_value.text = CoroutineMock(
             return_value=test_text_response()
         )
+        mock_get.return_value.__aenter__.return_value.headers = {}
 
     @patch(
-        "memrise.core.modules.api.base.api._session.request",
+        "requests.Session.request",
         lambda *_, **__: ResponseCourseMock(),
     )
     def test_get_courses(self) -> None:
@@ -237,6 +309,43 @@ class TestMemriseRep(AioHTTPTestCase):
         expected = [1987730, 2014031, 2014042, 2147115, 5605650]
         self.assertEqual([x.id for x in courses], expected)
 
+    def test_get_courses_prefetch_dashboard_pages(self) -> None:
+        with DASHBOARD_FIXTURE.open() as f:
+            dashboard = json.loads(f.read())
+        courses = dashboard["courses"]
+        requested = []
+        in_flight = [0, 0]
+        lock = threading.Lock()
+
+        def load_dashboard_courses(params):
+            number = params["offset"] // (params["limit"] + 1)
+            with lock:
+                requested.append(number)
+                in_flight[0] += 1
+                in_flight[1] = max(in_flight)
+            sleep(0.02)
+            with lock:
+                in_flight[0] -= 1
+            return {
+                "courses": courses[number : number + 1],
+                "has_more_courses": number < len(courses) - 1,
+            }
+
+        repo = UpdateMemriseContainer.origin_repo
+        with patch.object(api, "load_dashboard_courses", load_dashboard_courses):
+            for prefetch in (1, 3):
+                requested.clear()
+                with patch.object(repo, "dashboard_prefetch", prefetch):
+                    result = repo.get_courses()
+                self.assertEqual(
+                    [x.id for x in result], [1987730, 2014031, 2014042, 2147115, 5605650]
+                )
+                # Запрошены все страницы и не больше `prefetch - 1` лишних.
+                self.assertEqual(sorted(requested)[:5], list(range(5)))
+                self.assertLessEqual(len(requested), 5 + prefetch - 1)
+
+        self.assertEqual(in_flight[1], 3)
+
     @patch("aiohttp.ClientSession.request")
     def test_fetch_levels(self, mock_get) -> None:
         courses = [
@@ -406,6 +515,218 @@ class TestMemriseRep(AioHTTPTestCase):
         ]
         self.assertEqual(result, expected)
 
+    @patch("aiohttp.ClientSession.request")
+    def test_stream_levels(self, mock_get) -> None:
+        num_levels = 45
+        course = CourseEntity(
+            id=1987730,
+            name="Adjective Complex",
+            url="/course/1987730/adjective-complex/",
+            difficult=6,
+            num_words=19,
+            num_levels=num_levels,
+            difficult_url="/course/1987730/adjective-complex/difficult-items/",
+        )
+        course.generate_levels_url()
+        repo = UpdateMemriseContainer.origin_repo
+        self.set_get_mock_response(mock_get, 200, {"test": True})
+        stream = repo.stream_levels([course])
+        first_level = next(stream)
+        self.assertEqual(len(first_level.words), 20)
+        numbers = [first_level.number] + [level.number for level in stream]
+        self.assertEqual(sorted(numbers), list(range(1, num_levels + 1)))
+
+    @patch("aiohttp.ClientSession.request")
+    def test_stream_levels_while_courses_discovered(self, mock_get) -> None:
+        first, second = [
+            CourseEntity(
+                id=course_id,
+                name="Adjective Complex",
+                url=f"/course/{course_id}/adjective-complex/",
+                difficult=6,
+                num_words=19,
+                num_levels=2,
+                difficult_url=f"/course/{course_id}/adjective-complex/difficult-items/",
+            )
+            for course_id in (1987730, 1987731)
+        ]
+        first.generate_levels_url()
+        second.generate_levels_url()
+        repo = UpdateMemriseContainer.origin_repo
+        self.set_get_mock_response(mock_get, 200, {"test": True})
+        level_requested = threading.Event()
+        get_level_page = async_api.get_level_page
+
+        async def level_page(url):
+            level_requested.set()
+            return await get_level_page(url)
+
+        def discover_courses():
+            yield first
+            # Второй курс разбирается, когда уровни первого уже стягиваются.
+            self.assertTrue(level_requested.wait(timeout=5))
+            yield second
+
+        with patch.object(async_api, "get_level_page", level_page):
+            levels = list(repo.stream_levels(discover_courses()))
+        self.assertEqual(len(levels), 4)
+
+    @patch("aiohttp.ClientSession.request")
+    def test_stream_levels_closed_early(self, mock_get) -> None:
+        courses = [
+            CourseEntity(
+                id=course_id,
+                name="Adjective Complex",
+                url=f"/course/{course_id}/adjective-complex/",
+                difficult=6,
+                num_words=19,
+                num_levels=2,
+                difficult_url=f"/course/{course_id}/adjective-complex/difficult-items/",
+            )
+            for course_id in (1987730, 1987731, 1987732)
+        ]
+        for course in courses:
+            course.generate_levels_url()
+        repo = UpdateMemriseContainer.origin_repo
+        self.set_get_mock_response(mock_get, 200, {"test": True})
+        closed = threading.Event()
+
+        def discover_courses():
+            try:
+                for course in courses:
+                    yield course
+                    sleep(0.01)
+            finally:
+                closed.set()
+
+        stream = repo.stream_levels(discover_courses())
+        next(stream)
+        # Потребитель бросил обход: поиск курсов дожидается и закрывается вместе с обходом.
+        stream.close()
+        self.assertTrue(closed.is_set())
+
+    @patch("aiohttp.ClientSession.request")
+    def test_reuse_parsed_level_not_modified(self, mock_get) -> None:
+        course = CourseEntity(
+            id=1987730,
+            name="Adjective Complex",
+            url="/course/1987730/adjective-complex/",
+            difficult=6,
+            num_words=19,
+            num_levels=1,
+            difficult_url="/course/1987730/adjective-complex/difficult-items/",
+            levels_url=["/course/1987730/adjective-complex/1"],
+        )
+        repo = UpdateMemriseContainer.origin_repo
+        self.set_get_mock_response(mock_get, 200, {"test": True})
+        mock_get.return_value.__aenter__.return_value.headers = {"ETag": '"v1"'}
+        # Кеш HTML страниц выключен, как по умолчанию.
+        with patch.object(async_api, "cache", None):
+            levels = repo.get_levels([course])
+            self.assertEqual(mock_get.call_count, 1)
+
+            # memrise отвечает 304: разобранный уровень берется из валидаторов без парсинга.
+            self.set_get_mock_response(mock_get, 304, {})
+            with patch.object(
+                repo.parse_executor, "parse", CoroutineMock(side_effect=AssertionError)
+            ):
+                self.assertEqual(repo.get_levels([course]), levels)
+
+            self.assertEqual(mock_get.call_count, 2)
+            self.assertEqual(mock_get.call_args[1]["headers"], {"If-None-Match": '"v1"'})
+
+    @patch("aiohttp.ClientSession.request")
+    def test_resume_crawl_from_checkpoint(self, mock_get) -> None:
+        course = CourseEntity(
+            id=1987730,
+            name="Adjective Complex",
+            url="/course/1987730/adjective-complex/",
+            difficult=6,
+            num_words=19,
+            num_levels=3,
+            difficult_url="/course/1987730/adjective-complex/difficult-items/",
+        )
+        course.generate_levels_url()
+        broken_url = course.levels_url[1]
+        repo = UpdateMemriseContainer.origin_repo
+        self.set_get_mock_response(mock_get, 200, {"test": True})
+        get_level_page = async_api.get_level_page
+        requested = []
+
+        async def flaky_level_page(url):
+            requested.append(url)
+            if url == broken_url:
+                raise ValueError("broken level")
+            return await get_level_page(url)
+
+        with TemporaryDirectory() as tmp, patch.object(
+            repo, "checkpoint", CrawlCheckpoint(path=Path(tmp) / "checkpoint.jsonl")
+        ), patch.object(repo, "level_retries", 1):
+            # Сломанный уровень повторяется один раз и пропускается, курс считается нестянутым.
+            with patch.object(async_api, "get_level_page", flaky_level_page):
+                levels = repo.get_levels([course])
+            self.assertEqual(sorted(level.number for level in levels), [1, 3])
+            self.assertEqual(requested.count(broken_url), 2)
+            self.assertEqual(repo.get_failed_course_ids(), {course.id})
+            self.assertEqual(len(repo.checkpoint.load()), 2)
+
+            # Следующий обход берет стянутые уровни из контрольной точки.
+            requested.clear()
+            with patch.object(async_api, "get_level_page", flaky_level_page):
+                broken_url = None
+                levels = repo.get_levels([course])
+            self.assertEqual(requested, [course.levels_url[1]])
+            self.assertEqual(sorted(level.number for level in levels), [1, 2, 3])
+            self.assertEqual(repo.get_failed_course_ids(), set())
+            self.assertFalse(repo.checkpoint.path.exists())
+
+            # Уровни курса, который изменился на dashboard, из контрольной точки не берутся.
+            broken_url = course.levels_url[1]
+            with patch.object(async_api, "get_level_page", flaky_level_page):
+                repo.get_levels([course])
+            requested.clear()
+            broken_url = None
+            changed_course = course.copy(update={"dashboard_digest": "changed"})
+            with patch.object(async_api, "get_level_page", flaky_level_page):
+                levels = repo.get_levels([changed_course])
+            self.assertEqual(sorted(requested), sorted(course.levels_url))
+            self.assertEqual(len(levels), 3)
+
+    @patch("aiohttp.ClientSession.request")
+    def test_retried_request_error_is_not_requeued(self, mock_get) -> None:
+        course = CourseEntity(
+            id=1987730,
+            name="Adjective Complex",
+            url="/course/1987730/adjective-complex/",
+            difficult=6,
+            num_words=19,
+            num_levels=3,
+            difficult_url="/course/1987730/adjective-complex/difficult-items/",
+        )
+        course.generate_levels_url()
+        broken_url = course.levels_url[1]
+        repo = UpdateMemriseContainer.origin_repo
+        self.set_get_mock_response(mock_get, 200, {"test": True})
+        get_level_page = async_api.get_level_page
+        requested = []
+
+        async def flaky_level_page(url):
+            requested.append(url)
+            if url == broken_url:
+                raise asyncio.TimeoutError
+            return await get_level_page(url)
+
+        # Таймаут уже повторен в `request`, уровень пропускается без повтора.
+        with patch.object(repo, "checkpoint", None), patch.object(
+            repo, "level_retries", 1
+        ), patch.object(async_api, "retry", RetryPolicy(retries=2)), patch.object(
+            async_api, "get_level_page", flaky_level_page
+        ):
+            levels = repo.get_levels([course])
+        self.assertEqual(sorted(level.number for level in levels), [1, 3])
+        self.assertEqual(requested.count(broken_url), 1)
+        self.assertEqual(repo.get_failed_course_ids(), {course.id})
+
     def test_save_courses(self):
         diff = DiffContainer()
         repo = UpdateMemriseContainer.origin_repo
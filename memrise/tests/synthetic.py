@@ -0,0 +1,136 @@
+"""
+Генераторы синтетических данных memrise для тестов и замеров
+============================================================
+
+Разметка страницы уровня повторяет `resources/fixtures/level_text_response.html`, что позволяет
+гонять парсеры на уровнях любого размера. Деревья сущностей курсов используются в тестах и замерах
+отборщиков, обновления и загрузки в БД.
+"""
+from __future__ import annotations
+
+from html import escape
+from random import Random
+from typing import List
+
+from memrise.core.domains.entities import CourseEntity, LevelEntity, WordEntity
+
+LEVEL_PAGE = """<!doctype html>
+<head><title>Level {number} - {name} - Synthetic - Memrise</title></head>
+<body class="rebrand reverse-header-ruled level-view" data-course-id="{course_id}" data-level-id="{level_id}">
+<div class="progress-box progress-box-level with-icon">
+    <div class="level-icon"><strong class="level-number">Level {number}</strong></div>
+    <div class="infos">
+        <a class="edit-button button mini" href="/course/{course_id}/synthetic/edit/#l_{level_id}">
+            <span class="text">Edit Level</span>
+        </a>
+        <h3 class="progress-box-title">
+            {name}
+        </h3>
+    </div>
+    <hr>
+    <div class="things clearfix" data-column-a="1" data-column-b="2">
+{things}
+    </div>
+</div>
+</body>
+</html>
+"""
+
+THING = """        <div class="thing text-text" data-learnable-id="{learnable_id}" data-thing-id="{thing_id}">
+            <div class="thinguser">{status}</div>
+            <div class="ignore-ui pull-right"><input type="checkbox"></div>
+            <div class="col_a col text">
+                <div class="text">{word_a}</div>
+            </div>
+            <div class="col_b col text">
+                <div class="text">{word_b}</div>
+            </div>
+        </div>"""
+
+LEARNED = '<i class="ico ico-water ico-blue"></i><div class="status">in 10 days</div>'
+NOT_LEARNED = '<i class="ico ico-seed ico-purple"></i>'
+
+
+def synthetic_word(rnd: Random, min_len: int = 3, max_len: int = 12) -> str:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return "".join(rnd.choice(letters) for _ in range(rnd.randint(min_len, max_len)))
+
+
+def level_page(
+    num_words: int,
+    level_id: int = 1,
+    course_id: int = 1,
+    number: int = 1,
+    first_word_id: int = 1,
+    learned_ratio: float = 0.5,
+    seed: int = 0,
+) -> str:
+    """HTML страница уровня с `num_words` словами"""
+    rnd = Random(seed)
+    things = "\n".join(
+        THING.format(
+            learnable_id=idx,
+            thing_id=first_word_id + idx,
+            status=LEARNED if rnd.random() < learned_ratio else NOT_LEARNED,
+            word_a=escape(synthetic_word(rnd)),
+            word_b=escape(f"{synthetic_word(rnd)}, {synthetic_word(rnd)}"),
+        )
+        for idx in range(num_words)
+    )
+    return LEVEL_PAGE.format(
+        number=number,
+        name=f"Level {number}",
+        course_id=course_id,
+        level_id=level_id,
+        things=things,
+    )
+
+
+def course_entities(
+    num_courses: int,
+    levels_per_course: int = 10,
+    words_per_level: int = 100,
+    changed_ratio: float = 0.0,
+    seed: int = 0,
+    first_course_id: int = 1,
+) -> List[CourseEntity]:
+    """Курсы с уровнями и словами.
+
+    При одном `seed` деревья совпадают, кроме доли слов `changed_ratio` с измененным переводом.
+    """
+    rnd = Random(seed)
+    changes = Random(seed + 1)
+    courses = []
+    for course_id in range(first_course_id, first_course_id + num_courses):
+        course = CourseEntity(
+            id=course_id,
+            name=f"Course {course_id}",
+            url=f"/course/{course_id}/synthetic/",
+            difficult=0,
+            num_words=levels_per_course * words_per_level,
+            num_levels=levels_per_course,
+            difficult_url=f"/course/{course_id}/synthetic/difficult-items/",
+        )
+        for number in range(1, levels_per_course + 1):
+            level_id = (course_id - 1) * levels_per_course + number
+            level = LevelEntity(
+                id=level_id, number=number, course_id=course_id, name=f"Level {number}"
+            )
+            first_word_id = (level_id - 1) * words_per_level + 1
+            for word_id in range(first_word_id, first_word_id + words_per_level):
+                word_b = synthetic_word(rnd)
+                if changes.random() < changed_ratio:
+                    word_b = f"{word_b} (changed)"
+                level.add_word(
+                    WordEntity(
+                        id=word_id,
+                        level_id=level_id,
+                        word_a=synthetic_word(rnd),
+                        word_b=word_b,
+                        is_learned=rnd.random() < 0.5,
+                    )
+                )
+            course.add_level(level)
+        courses.append(course)
+
+    return courses
@@ -0,0 +1,66 @@
+# type: ignore
+
+from django.test import TestCase
+
+from memrise.core.domains.word_columns import WordColumns
+from memrise.core.modules.actions.actions_batch import JsonActionsBatch
+from memrise.core.repositories.repos import JsonRep
+from memrise.core.use_cases.dashboard import Dashboard, DashboardCourseContainer
+
+
+class TestDashboard(TestCase):
+    def setUp(self) -> None:
+        self.dashboard = Dashboard(JsonRep(JsonActionsBatch()), DashboardCourseContainer())
+
+    def test_load_assets(self):
+        container = self.dashboard.load_assets()
+        levels_by_course = {
+            course.id: [level.id for level in course.levels] for course in container.courses
+        }
+        self.assertEqual(
+            levels_by_course,
+            {
+                1987730: [1, 2, 3, 4, 5, 6],
+                2147115: [47, 48, 49],
+                5605650: [],
+                2014031: [],
+                2014042: [],
+            },
+        )
+        self.assertEqual(len(self.dashboard.get_levels()), 9)
+
+    def test_load_levels_of_streamed_courses(self):
+        courses = (
+            course for course in self.dashboard.stream_courses() if course.id == 1987730
+        )
+        self.dashboard.load_levels(courses)
+        self.assertEqual(len(self.dashboard.get_courses()), 5)
+        self.assertEqual({level.course_id for level in self.dashboard.get_levels()}, {1987730})
+        self.assertEqual(len(self.dashboard.get_levels()), 6)
+
+    def test_refresh_assets_does_not_duplicate_levels(self):
+        self.dashboard.load_assets()
+        self.dashboard.refresh_assets()
+        self.assertEqual(len(self.dashboard.get_levels()), 9)
+
+    def test_columnar_words(self):
+        self.dashboard.load_assets()
+        columnar_dashboard = Dashboard(
+            JsonRep(JsonActionsBatch()), DashboardCourseContainer(columnar_words=True)
+        )
+        columnar_dashboard.load_assets()
+
+        for level in columnar_dashboard.get_levels():
+            self.assertIsInstance(level.words, WordColumns)
+        self.assertEqual(columnar_dashboard.get_words(), self.dashboard.get_words())
+        self.assertEqual(
+            [course.digest for course in columnar_dashboard.get_courses()],
+            [course.digest for course in self.dashboard.get_courses()],
+        )
+
+        columns = columnar_dashboard.get_word_columns()
+        self.assertEqual(list(columns), self.dashboard.get_words())
+        self.assertEqual(
+            columns.count_learned(),
+            sum(word.is_learned for word in self.dashboard.get_words()),
+        )
@@ -0,0 +1,205 @@
+# type: ignore
+
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import List, Set
+
+from django.test import TestCase
+from django.utils import timezone
+
+from memrise.core.domains.entities import CourseEntity, LevelEntity, make_digest
+from memrise.core.modules.actions.actions_batch import (
+    DBActionsBatch,
+    JsonActionsBatch,
+    UpsertActionsBatch,
+)
+from memrise.core.repositories.repos import DBRep, JsonRep
+from memrise.core.use_cases.dashboard import Dashboard, DashboardCourseContainer
+from memrise.core.use_cases.update_manager import UpdateManager
+from memrise.models import Course, Level, Word, WordAlias
+from memrise.tests.synthetic import course_entities
+
+
+@dataclass
+class SyntheticRep(JsonRep):
+    """Курсы со словами из синтетических данных, каждый вызов отдает новые сущности"""
+
+    changed_ratio: float = 0.0
+    # Прогресс изучения курсов, попадает в метаданные курса на dashboard.
+    learned: int = 0
+    # Количество слов первого уровня, которые повторяются в последнем уровне.
+    duplicates: int = 0
+    crawled_course_ids: List[int] = field(default_factory=list)
+    # Курсы, первый уровень которых не удалось стянуть.
+    failed_course_ids: Set[int] = field(default_factory=set)
+
+    def get_courses(self) -> List[CourseEntity]:
+        courses = self._make_courses()
+        for course in courses:
+            course.add_levels([])
+            course.dashboard_digest = make_digest([str(course.id), str(self.learned)])
+
+        return courses
+
+    def get_levels(self, courses: List[CourseEntity]) -> List[LevelEntity]:
+        self.crawled_course_ids.extend(course.id for course in courses)
+        return [
+            level
+            for course in self._make_courses()
+            for level in course.levels[course.id in self.failed_course_ids :]
+        ]
+
+    def get_failed_course_ids(self) -> Set[int]:
+        return set(self.failed_course_ids)
+
+    def _make_courses(self) -> List[CourseEntity]:
+        # id не пересекаются с курсами, уровнями и словами из fixtures.
+        courses = course_entities(
+            2,
+            levels_per_course=3,
+            words_per_level=5,
+            changed_ratio=self.changed_ratio,
+            first_course_id=1000,
+        )
+        first_level, last_level = courses[0].levels[0], courses[-1].levels[-1]
+        for word in first_level.words[: self.duplicates]:
+            last_level.add_word(word.copy(update={"level_id": last_level.id}))
+
+        return courses
+
+
+class TestUpdateManager(TestCase):
+    fixtures = ["db"]
+    actions_batch = DBActionsBatch
+
+    def make_manager(
+        self,
+        changed_ratio: float = 0.0,
+        learned: int = 0,
+        duplicates: int = 0,
+        full_crawl_interval: int = 0,
+        failed_course_ids: Set[int] = frozenset(),
+    ) -> UpdateManager:
+        self.origin_repo = SyntheticRep(
+            JsonActionsBatch(),
+            changed_ratio=changed_ratio,
+            learned=learned,
+            duplicates=duplicates,
+            failed_course_ids=set(failed_course_ids),
+        )
+        dashboard = Dashboard(self.origin_repo, DashboardCourseContainer())
+        return UpdateManager(
+            actual_repo=DBRep(self.actions_batch()),
+            dashboard=dashboard,
+            full_crawl_interval=full_crawl_interval,
+        )
+
+    def test_update_saves_digests(self):
+        ctx = self.make_manager().update()
+        course_ids = [course.id for course in ctx.changed_course_entities]
+        self.assertEqual(course_ids, [1000, 1001])
+        self.assertEqual(Word.objects.filter(level__course_id__in=course_ids).count(), 30)
+        self.assertEqual(
+            dict(Course.objects.filter(is_disable=False).values_list("id", "digest")),
+            {course.id: course.digest for course in ctx.fresh_course_entities},
+        )
+        self.assertEqual(
+            dict(Level.objects.values_list("id", "digest")),
+            {level.id: level.digest for level in ctx.fresh_level_entities},
+        )
+
+    def test_unchanged_catalog_skips_levels_and_words(self):
+        self.make_manager().update()
+        ctx = self.make_manager().update()
+        self.assertEqual(ctx.changed_course_entities, [])
+        self.assertEqual(ctx.fresh_level_entities, [])
+        self.assertEqual(ctx.actual_level_entities, [])
+        self.assertEqual(ctx.fresh_word_entities, [])
+        self.assertEqual(ctx.actual_word_entities, [])
+
+    def test_changed_words_diff_only_changed_levels(self):
+        self.make_manager().update()
+        ctx = self.make_manager(changed_ratio=0.1).update()
+
+        changed_level_ids = {word.level_id for word in ctx.fresh_word_entities}
+        self.assertTrue(changed_level_ids)
+        self.assertLess(len(changed_level_ids), len(ctx.fresh_level_entities))
+        self.assertEqual(
+            {word.level_id for word in ctx.actual_word_entities}, changed_level_ids
+        )
+        self.assertTrue(Word.objects.filter(word_b__endswith="(changed)").exists())
+
+        ctx = self.make_manager(changed_ratio=0.1).update()
+        self.assertEqual(ctx.changed_course_entities, [])
+
+    def test_disabled_course_resets_digest(self):
+        self.make_manager().update()
+        Course.objects.filter(id=1000).update(digest="")
+        Level.objects.filter(course_id=1000).delete()
+
+        ctx = self.make_manager().update()
+        self.assertEqual([course.id for course in ctx.changed_course_entities], [1000])
+        self.assertEqual(Level.objects.filter(course_id=1000).count(), 3)
+        self.assertTrue(Course.objects.get(id=2147124).is_disable)
+        self.assertEqual(Course.objects.get(id=2147124).digest, "")
+
+    def test_incremental_crawl_skips_unchanged_courses(self):
+        self.make_manager(full_crawl_interval=24).update()
+        self.assertEqual(self.origin_repo.crawled_course_ids, [1000, 1001])
+        self.assertFalse(Course.objects.filter(id=1000, crawled_at=None).exists())
+
+        ctx = self.make_manager(full_crawl_interval=24).update()
+        self.assertEqual(self.origin_repo.crawled_course_ids, [])
+        self.assertEqual(ctx.crawled_course_entities, [])
+        self.assertEqual(ctx.changed_course_entities, [])
+        # Уровни и слова не стянутых курсов остаются нетронутыми.
+        course_ids = [1000, 1001]
+        self.assertEqual(Level.objects.filter(course_id__in=course_ids).count(), 6)
+        self.assertEqual(Word.objects.filter(level__course_id__in=course_ids).count(), 30)
+
+    def test_incremental_crawl_refetches_changed_metadata(self):
+        self.make_manager(full_crawl_interval=24).update()
+        self.make_manager(changed_ratio=0.1, learned=1, full_crawl_interval=24).update()
+        self.assertEqual(self.origin_repo.crawled_course_ids, [1000, 1001])
+        self.assertTrue(Word.objects.filter(word_b__endswith="(changed)").exists())
+
+    def test_incremental_crawl_refetches_expired_courses(self):
+        self.make_manager(full_crawl_interval=24).update()
+        Course.objects.filter(id=1001).update(
+            crawled_at=timezone.now() - timedelta(hours=25)
+        )
+
+        self.make_manager(full_crawl_interval=24).update()
+        self.assertEqual(self.origin_repo.crawled_course_ids, [1001])
+
+    def test_failed_course_keeps_levels_and_words(self):
+        self.make_manager().update()
+
+        ctx = self.make_manager(changed_ratio=0.5, failed_course_ids={1000}).update()
+        self.assertEqual([course.id for course in ctx.crawled_course_entities], [1001])
+        self.assertEqual(Level.objects.filter(course_id=1000).count(), 3)
+        self.assertFalse(
+            Word.objects.filter(level__course_id=1000, word_b__endswith="(changed)").exists()
+        )
+        self.assertTrue(
+            Word.objects.filter(level__course_id=1001, word_b__endswith="(changed)").exists()
+        )
+
+    def test_duplicate_words_keep_stable_ids(self):
+        self.make_manager(duplicates=2).update()
+        word_ids = set(Word.objects.values_list("id", flat=True))
+        self.assertEqual(len([word_id for word_id in word_ids if word_id < 0]), 2)
+
+        # Сбрасываем дайджесты, чтобы слова всех уровней сравнивались заново.
+        Course.objects.update(digest="")
+        Level.objects.update(digest="")
+        ctx = self.make_manager(duplicates=2).update()
+        self.assertEqual(len(ctx.fresh_word_entities), 32)
+        self.assertEqual(set(Word.objects.values_list("id", flat=True)), word_ids)
+        self.assertEqual(WordAlias.objects.count(), 2)
+
+
+class TestUpdateManagerUpsert(TestUpdateManager):
+    """Те же сценарии обновления с записью в БД через upsert"""
+
+    actions_batch = UpsertActionsBatch